@@ -0,0 +1,101 @@
+"""Precompiled calldata encoder for a single contract method"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from eth_abi.abi import decode, encode
+from eth_typing.encoding import HexStr
+from eth_utils.abi import collapse_if_tuple, function_signature_to_4byte_selector
+
+ARRAY_TYPE = re.compile(r"^(.*)\[\d*]$")
+
+
+def normalize_arg(abi_type: str, value: Any) -> Any:
+    """
+    Converts JSON/CLI friendly values into what the ABI encoder expects:
+    hex strings for bytes types, (hex or decimal) strings for integers
+    and "true"/"false" for booleans. Other values pass through unchanged.
+    """
+    array = ARRAY_TYPE.match(abi_type)
+    if array is not None:
+        return [normalize_arg(array.group(1), item) for item in value]
+    if abi_type.startswith("bytes") and isinstance(value, str):
+        return bytes.fromhex(value.replace("0x", ""))
+    if abi_type.startswith(("uint", "int")) and isinstance(value, str):
+        return int(value, 0)
+    if abi_type == "bool" and isinstance(value, str):
+        return value.lower() == "true"
+    return value
+
+
+@dataclass(frozen=True)
+class MethodEncoder:
+    """
+    Function selector and input types resolved once from an ABI,
+    so that encoding many calls skips web3's per-call ABI lookup.
+    """
+
+    name: str
+    selector: bytes
+    input_types: tuple[str, ...]
+
+    @property
+    def signature(self) -> str:
+        """Canonical function signature e.g. transfer(address,uint256)"""
+        return f"{self.name}({','.join(self.input_types)})"
+
+    @classmethod
+    def all_from_abi(cls, abi: list[dict[str, Any]]) -> list[MethodEncoder]:
+        """Encoders of every function in contract `abi`"""
+        encoders = []
+        for entry in abi:
+            if entry.get("type") != "function":
+                continue
+            types = tuple(collapse_if_tuple(arg) for arg in entry["inputs"])
+            encoders.append(
+                cls(
+                    name=entry["name"],
+                    selector=function_signature_to_4byte_selector(
+                        f"{entry['name']}({','.join(types)})"
+                    ),
+                    input_types=types,
+                )
+            )
+        return encoders
+
+    @staticmethod
+    def resolve(encoders: Sequence[MethodEncoder], method: str) -> MethodEncoder:
+        """
+        Picks `method` (a function name or, for overloaded functions,
+        its full signature) from `encoders`.
+        """
+        candidates = [e for e in encoders if method in (e.name, e.signature)]
+        if len(candidates) != 1:
+            raise ValueError(
+                f"expected exactly one ABI function matching {method}, "
+                f"found {[c.signature for c in candidates]}"
+            )
+        return candidates[0]
+
+    @classmethod
+    def from_abi(cls, abi: list[dict[str, Any]], method: str) -> MethodEncoder:
+        """Resolves `method` from contract `abi` (see `resolve`)"""
+        return cls.resolve(cls.all_from_abi(abi), method)
+
+    def encode(self, args: Sequence[Any]) -> HexStr:
+        """Encodes call data for method with `args`"""
+        if len(args) != len(self.input_types):
+            raise ValueError(
+                f"{self.signature} expects {len(self.input_types)} arguments, "
+                f"got {len(args)}"
+            )
+        values = [normalize_arg(t, v) for t, v in zip(self.input_types, args)]
+        return HexStr("0x" + (self.selector + encode(self.input_types, values)).hex())
+
+    def decode(self, data: bytes) -> tuple[Any, ...]:
+        """Decodes the arguments of call data for this method"""
+        if data[:4] != self.selector:
+            raise ValueError(f"call data is not a call to {self.signature}")
+        return tuple(decode(self.input_types, data[4:]))
@@ -1,14 +1,99 @@
-"""Basic Contract ABI loader (from json files)"""
+"""
+Process wide registry of contract ABIs (loaded from json files).
+Each ABI is parsed once, its function selectors are precomputed and
+contract objects are cached per (web3 instance, address, ABI content hash).
+"""
+from __future__ import annotations
+
+import functools
+import hashlib
 import json
 import os
+import threading
+from collections import Counter
+from dataclasses import dataclass
 from typing import Any
 
+from eth_typing.evm import ChecksumAddress
+from web3 import Web3
+from web3.contract import Contract  # type:ignore
+
+from src.abis.encoder import MethodEncoder
 from src.constants import ABI_PATH
 
 
+@dataclass(frozen=True, eq=False)
+class ContractAbi:
+    """Parsed contract ABI along with the encoders of all its functions"""
+
+    name: str
+    digest: str
+    abi: list[dict[str, Any]]
+    encoders: tuple[MethodEncoder, ...]
+
+    @classmethod
+    def from_json(cls, name: str, content: bytes) -> ContractAbi:
+        """Parses ABI json `content` and precomputes its function encoders"""
+        abi = json.loads(content)
+        return cls(
+            name=name,
+            digest=hashlib.sha256(content).hexdigest(),
+            abi=abi,
+            encoders=tuple(MethodEncoder.all_from_abi(abi)),
+        )
+
+    @functools.cached_property
+    def _by_method(self) -> dict[str, MethodEncoder]:
+        by_method = {encoder.signature: encoder for encoder in self.encoders}
+        names = Counter(encoder.name for encoder in self.encoders)
+        by_method.update({e.name: e for e in self.encoders if names[e.name] == 1})
+        return by_method
+
+    def encoder(self, method: str) -> MethodEncoder:
+        """Encoder of `method` (function name or full signature)"""
+        try:
+            return self._by_method[method]
+        except KeyError:
+            # Raises a descriptive error for unknown or ambiguous methods.
+            return MethodEncoder.resolve(self.encoders, method)
+
+
+# Not connected to any node: for contracts that only encode calls (see encoding_contract)
+_ENCODING_W3 = Web3()
+_REGISTRY: dict[str, ContractAbi] = {}
+_CONTRACTS: dict[tuple[Web3, ChecksumAddress, str], Contract] = {}
+_LOCK = threading.Lock()
+
+
+def load_abi(abi_name: str) -> ContractAbi:
+    """Loads (once per process) the parsed contract abi `abi_name` from src/abis"""
+    with _LOCK:
+        if abi_name not in _REGISTRY:
+            with open(os.path.join(ABI_PATH, f"{abi_name}.json"), "rb") as file:
+                _REGISTRY[abi_name] = ContractAbi.from_json(abi_name, file.read())
+        return _REGISTRY[abi_name]
+
+
 def load_contract_abi(abi_name: str) -> Any:
     """Loads a contract abi from json file"""
-    with open(
-        os.path.join(ABI_PATH, f"{abi_name}.json"), "r", encoding="utf-8"
-    ) as file:
-        return json.load(file)
+    return load_abi(abi_name).abi
+
+
+def get_contract(w3: Web3, abi_name: str, address: str) -> Contract:
+    """Cached web3 contract object of abi `abi_name` at `address` on `w3`"""
+    contract_abi = load_abi(abi_name)
+    checksum = Web3.to_checksum_address(address)
+    # Contracts are bound to their web3 instance (long-lived process wide clients).
+    key = (w3, checksum, contract_abi.digest)
+    with _LOCK:
+        if key not in _CONTRACTS:
+            _CONTRACTS[key] = w3.eth.contract(address=checksum, abi=contract_abi.abi)
+        return _CONTRACTS[key]
+
+
+def encoding_contract(abi_name: str, address: str) -> Contract:
+    """
+    Cached contract object of abi `abi_name` at `address` that is not bound to a node,
+    for encoding calls (e.g. for batch calls through a client) without network access.
+    """
+    return get_contract(_ENCODING_W3, abi_name, address)
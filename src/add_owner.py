@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from eth_typing.evm import ChecksumAddress
 from gnosis.safe import Safe, SafeOperation
 from gnosis.safe.multi_send import MultiSendTx, MultiSendOperation
+from src.child_safe import ChildSafe
 from src.safe import SafeTransaction, encode_exec_transaction
 
 
@@ -20,7 +21,7 @@ class AddOwnerArgs:
 
 
 def build_add_owner_with_threshold(
-    safe: Safe, sub_safe: Safe, params: AddOwnerArgs
+    safe: Safe, sub_safe: ChildSafe, params: AddOwnerArgs
 ) -> MultiSendTx:
     """
     :param safe: Safe owning each of this child safes
@@ -40,7 +41,7 @@ def build_add_owner_with_threshold(
     transaction = SafeTransaction(
         to=sub_safe.address,
         value=0,
-        data=sub_safe.contract.encodeABI("addOwnerWithThreshold", params.as_list()),
+        data=sub_safe.encode("addOwnerWithThreshold", list(params.as_list())),
         operation=SafeOperation.CALL,
     )
     return MultiSendTx(
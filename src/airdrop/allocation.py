@@ -2,21 +2,23 @@
 from __future__ import annotations
 
 import json
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Optional
 
 import requests
-from web3 import Web3
+from eth_typing.evm import ChecksumAddress
 
-from src.abis.load import load_contract_abi
-from src.environment import CLIENT
+from src.abis.load import encoding_contract
 
-AIRDROP_CONTRACT = CLIENT.w3.eth.contract(
-    address=Web3().to_checksum_address("0xA0b937D5c8E32a80E3a8ed4227CD020221544ee6"),
-    abi=load_contract_abi("airdrop"),
+AIRDROP_CONTRACT = encoding_contract(
+    "airdrop", "0xA0b937D5c8E32a80E3a8ed4227CD020221544ee6"
 )
+SAFE_TOKEN = encoding_contract("erc20", "0x5aFE3855358E112B5647B952709E6165e1c1eEEe")
 
 ALLOCATION_BASE_URL = "https://safe-claiming-app-data.gnosis-safe.io/allocations"
 MAX_U128 = 340282366920938463463374607431768211455
+ALLOCATION_WORKERS = 16
 
 # claimVestedTokens[ViaModule](
 #     vestingId(bytes32)
@@ -24,6 +26,19 @@ MAX_U128 = 340282366920938463463374607431768211455
 #     tokensToClaim(uint128) = MAX_U128
 # )
 ClaimParams = tuple[str, str, int]
+# redeem(
+#     curveType(uint8)
+#     durationWeeks(uint16)
+#     startDate(uint64)
+#     amount(uint128)
+#     proof(bytes32[])
+# )
+RedeemParams = tuple[int, int, int, int, list[str]]
+
+
+# Allocations never change: API responses are kept for the life of the process
+# (e.g. across the jobs of src.daemon), None marking ineligible Safes.
+_ALLOCATIONS: dict[tuple[str, int], Optional[list[Allocation]]] = {}
 
 
 @dataclass
@@ -47,35 +62,38 @@ class Allocation:
     proof: list[str]
 
     @staticmethod
-    def api_url(address: str) -> str:
+    def api_url(address: str, chain_id: int = 1) -> str:
         """Returns dynamically constructed API URL"""
-        chain_id = 1  # Airdrop was only on mainnet (so far...)
+        # Airdrop was only on mainnet (so far...)
         return f"{ALLOCATION_BASE_URL}/{chain_id}/{address}.json"
 
     @classmethod
-    def from_address(cls, safe_address: str) -> list[Allocation]:
+    def from_address(cls, safe_address: str, chain_id: int = 1) -> list[Allocation]:
         """
         Fetches and Parses Response for Safe Allocation Data
         Note that Safes received multiple Allocations (of different types)
         so this constructor returns a list.
         """
-        response = requests.get(url=cls.api_url(safe_address), timeout=5)
-        if not response.ok:
-            if "NoSuchKey" in response.text:
-                raise FileNotFoundError(
-                    f"{safe_address} is not eligible for SAFE airdrop"
-                )
-
-            raise RuntimeError(
-                f"Allocation Request failed with unhandled response {response.text}"
-            )
-
-        allocations: list[Allocation] = [
-            json.loads(json.dumps(entry), object_hook=lambda d: Allocation(**d))
-            for entry in response.json()
-        ]
+        key = (safe_address.lower(), chain_id)
+        if key not in _ALLOCATIONS:
+            response = requests.get(url=cls.api_url(safe_address, chain_id), timeout=5)
+            if not response.ok:
+                if "NoSuchKey" not in response.text:
+                    raise RuntimeError(
+                        f"Allocation Request failed with unhandled response "
+                        f"{response.text}"
+                    )
+                _ALLOCATIONS[key] = None
+            else:
+                _ALLOCATIONS[key] = [
+                    json.loads(json.dumps(entry), object_hook=lambda d: Allocation(**d))
+                    for entry in response.json()
+                ]
+        allocations = _ALLOCATIONS[key]
+        if allocations is None:
+            raise FileNotFoundError(f"{safe_address} is not eligible for SAFE airdrop")
         # First entry should be "user" allocation
-        return allocations
+        return list(allocations)
 
     def as_claim_params(self, beneficiary: str) -> ClaimParams:
         """
@@ -84,3 +102,31 @@ class Allocation:
         tokensToClaim(uint128) = MAX_U128
         """
         return self.vestingId, beneficiary, MAX_U128
+
+    def as_redeem_params(self) -> RedeemParams:
+        """
+        curveType(uint8), durationWeeks(uint16), startDate(uint64),
+        amount(uint128), proof(bytes32[])
+        """
+        return (
+            self.curve,
+            self.durationWeeks,
+            self.startDate,
+            int(self.amount),
+            self.proof,
+        )
+
+
+def fetch_allocations(
+    children: list[ChecksumAddress], chain_id: int = 1
+) -> dict[ChecksumAddress, list[Allocation]]:
+    """Concurrently fetches airdrop allocations (ineligible Safes get an empty list)"""
+
+    def fetch(child: ChecksumAddress) -> list[Allocation]:
+        try:
+            return Allocation.from_address(child, chain_id)
+        except FileNotFoundError:
+            return []
+
+    with ThreadPoolExecutor(max_workers=ALLOCATION_WORKERS) as pool:
+        return dict(zip(children, pool.map(fetch, children)))
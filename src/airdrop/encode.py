@@ -4,7 +4,9 @@ from gnosis.safe import SafeOperation, Safe
 from gnosis.safe.multi_send import MultiSendTx
 from web3 import Web3
 
+from src.abis.load import load_abi
 from src.airdrop.allocation import Allocation, AIRDROP_CONTRACT, MAX_U128
+from src.child_safe import ChildSafe
 from src.multisend import build_multisend_from_data
 from src.safe import SafeTransaction, encode_exec_transaction
 
@@ -24,7 +26,7 @@ def encode_claim(allocation: Allocation, beneficiary: str) -> SafeTransaction:
 
 
 def build_and_sign_claim(
-    safe: Safe, sub_safe: Safe, allocation: Allocation, beneficiary: str
+    safe: Safe, sub_safe: ChildSafe, allocation: Allocation, beneficiary: str
 ) -> MultiSendTx:
     """
     :param safe: Safe owning each of this child safes
@@ -44,3 +46,34 @@ def build_and_sign_claim(
             ),
         ),
     )
+
+
+def encode_redeem(allocation: Allocation) -> SafeTransaction:
+    """
+    Encodes the Safe Airdrop redeem transaction (creating the vesting) for a given Safe:
+    """
+    return SafeTransaction(
+        to=Web3.to_checksum_address(allocation.contract),
+        value=0,
+        data=load_abi("airdrop")
+        .encoder("redeem")
+        .encode(list(allocation.as_redeem_params())),
+        operation=SafeOperation.CALL,
+    )
+
+
+def build_and_sign_redeem(
+    safe: Safe, sub_safe: ChildSafe, allocation: Allocation
+) -> MultiSendTx:
+    """
+    :param safe: Safe owning each of this child safes
+    :param sub_safe: Safe owned by Parent with signing threshold = 1 (and allocation account)
+    :param allocation: contains function arguments for redeem tx
+    :return: Multisend Transaction
+    """
+    return build_multisend_from_data(
+        safe=sub_safe,
+        data=encode_exec_transaction(
+            sub_safe, safe.address, encode_redeem(allocation=allocation)
+        ),
+    )
@@ -0,0 +1,129 @@
+"""
+Local verification of airdrop allocations before redeeming them.
+The vesting id of an allocation is the EIP-712 hash of its Vesting struct
+(see VestingPool.vestingHash) and the leaf of the airdrop contract's `vestingsRoot`
+Merkle tree, whose proofs hash sorted pairs (as OpenZeppelin's MerkleProof).
+"""
+from __future__ import annotations
+
+import functools
+from dataclasses import dataclass, field
+
+from eth_abi.abi import encode
+from eth_hash.auto import keccak
+from gnosis.eth import EthereumClient
+
+from src.abis.load import get_contract
+from src.airdrop.allocation import Allocation
+from src.constants import ZERO_ADDRESS
+from src.util import to_checksum_address
+
+DOMAIN_TYPEHASH = keccak(b"EIP712Domain(uint256 chainId,address verifyingContract)")
+VESTING_TYPEHASH = keccak(
+    b"Vesting(address account,uint8 curveType,bool managed,"
+    b"uint16 durationWeeks,uint64 startDate,uint128 amount)"
+)
+VESTING_TYPES = ["bytes32", "address", "uint8", "bool", "uint16", "uint64", "uint128"]
+
+
+@functools.cache
+def domain_separator(chain_id: int, contract: str) -> bytes:
+    """EIP-712 domain separator of the airdrop `contract`"""
+    return keccak(
+        encode(
+            ["bytes32", "uint256", "address"],
+            [DOMAIN_TYPEHASH, chain_id, to_checksum_address(contract)],
+        )
+    )
+
+
+def vesting_hash(allocation: Allocation) -> bytes:
+    """Vesting id (and Merkle leaf) of an unmanaged vesting for `allocation`"""
+    struct_hash = keccak(
+        encode(
+            VESTING_TYPES,
+            [
+                VESTING_TYPEHASH,
+                to_checksum_address(allocation.account),
+                allocation.curve,
+                False,
+                allocation.durationWeeks,
+                allocation.startDate,
+                int(allocation.amount),
+            ],
+        )
+    )
+    domain = domain_separator(allocation.chainId, allocation.contract)
+    return keccak(b"\x19\x01" + domain + struct_hash)
+
+
+def process_proof(leaf: bytes, proof: list[str]) -> bytes:
+    """Merkle root implied by `leaf` and its (sorted pair) `proof`"""
+    node = leaf
+    for sibling in (bytes.fromhex(item.replace("0x", "")) for item in proof):
+        node = keccak(node + sibling if node < sibling else sibling + node)
+    return node
+
+
+def is_valid(allocation: Allocation, root: bytes) -> bool:
+    """Whether `allocation` matches its vesting id and proves membership in `root`"""
+    leaf = vesting_hash(allocation)
+    if leaf.hex() != allocation.vestingId.replace("0x", "").lower():
+        return False
+    return process_proof(leaf, allocation.proof) == root
+
+
+@dataclass
+class RedeemSelection:
+    """Verified allocations to be redeemed and/or claimed"""
+
+    redeem: list[Allocation] = field(default_factory=list)
+    claim: list[Allocation] = field(default_factory=list)
+    invalid: list[Allocation] = field(default_factory=list)
+    redeemed: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self.redeem)} allocations to redeem, {len(self.claim)} to claim "
+            f"({len(self.invalid)} invalid, {self.redeemed} already redeemed)"
+        )
+
+
+def select_redeemable(
+    client: EthereumClient, allocations: list[Allocation], claim: bool = False
+) -> RedeemSelection:
+    """
+    Verifies all `allocations` against the roots of their airdrop contracts and drops
+    invalid and already redeemed vestings (all reads in one batch request).
+    With `claim`, already redeemed vestings are still selected for claiming.
+    """
+    contracts = list(dict.fromkeys(a.contract for a in allocations))
+    results = client.batch_call(
+        [
+            get_contract(client.w3, "airdrop", contract).functions.vestingsRoot()
+            for contract in contracts
+        ]
+        + [
+            get_contract(client.w3, "airdrop", a.contract).functions.vestings(
+                bytes.fromhex(a.vestingId.replace("0x", ""))
+            )
+            for a in allocations
+        ],
+        raise_exception=False,
+    )
+    roots = dict(zip(contracts, results[: len(contracts)]))
+    selection = RedeemSelection()
+    for allocation, vesting in zip(allocations, results[len(contracts) :]):
+        if vesting is not None and vesting[0] != ZERO_ADDRESS:
+            selection.redeemed += 1
+            if claim:
+                selection.claim.append(allocation)
+            continue
+        root = roots[allocation.contract]
+        if root is None or not is_valid(allocation, root):
+            selection.invalid.append(allocation)
+            continue
+        selection.redeem.append(allocation)
+        if claim:
+            selection.claim.append(allocation)
+    return selection
@@ -3,16 +3,19 @@
 from gnosis.safe import Safe
 from gnosis.safe.multi_send import MultiSendTx
 
-from src.airdrop.allocation import Allocation
-from src.airdrop.encode import build_and_sign_claim
+from src.airdrop.allocation import Allocation, fetch_allocations
+from src.airdrop.encode import build_and_sign_claim, build_and_sign_redeem
+from src.airdrop.merkle import select_redeemable
+from src.child_safe import ChildSafe
 
 
-def transactions_for(parent: Safe, children: list[Safe]) -> list[MultiSendTx]:
+def transactions_for(parent: Safe, children: list[ChildSafe]) -> list[MultiSendTx]:
     """Builds transaction for given Airdrop command"""
-    allocations: dict[Safe, list[Allocation]] = {child: [] for child in children}
+    allocations: dict[ChildSafe, list[Allocation]] = {child: [] for child in children}
+    chain_id = parent.ethereum_client.get_chain_id()
     for child in children:
         try:
-            allocations[child] += Allocation.from_address(child.address)
+            allocations[child] += Allocation.from_address(child.address, chain_id)
         except FileNotFoundError as err:
             print(f"Not Found: {err} - skipping!")
 
@@ -31,3 +34,43 @@ def transactions_for(parent: Safe, children: list[Safe]) -> list[MultiSendTx]:
         ]
 
     return transactions
+
+
+def redeem_transactions_for(
+    parent: Safe, children: list[ChildSafe], claim: bool = False
+) -> list[MultiSendTx]:
+    """
+    Builds redeem transactions (followed by claims when `claim`) for all verified
+    and not yet redeemed allocations of the children, with the parent as beneficiary.
+    """
+    client = parent.ethereum_client
+    safes = {child.address: child for child in children}
+    allocations = fetch_allocations(list(safes), client.get_chain_id())
+    selection = select_redeemable(
+        client, [a for child in safes for a in allocations[child]], claim
+    )
+    print(f"Using Parent Safe {parent.address} as Beneficiary: {selection}")
+    for allocation in selection.invalid:
+        print(f"Invalid proof for {allocation.tag} allocation of {allocation.account}")
+
+    redeem_ids = {a.vestingId for a in selection.redeem}
+    claim_ids = {a.vestingId for a in selection.claim}
+    transactions = []
+    # Per child, redeems precede claims so each vesting exists when it is claimed.
+    for address, child in safes.items():
+        transactions += [
+            build_and_sign_redeem(safe=parent, sub_safe=child, allocation=a)
+            for a in allocations[address]
+            if a.vestingId in redeem_ids
+        ]
+        transactions += [
+            build_and_sign_claim(
+                safe=parent,
+                sub_safe=child,
+                allocation=a,
+                beneficiary=parent.address,
+            )
+            for a in allocations[address]
+            if a.vestingId in claim_ids
+        ]
+    return transactions
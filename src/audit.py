@@ -0,0 +1,192 @@
+"""
+Read-only fleet report: owners, threshold, nonce, snapshot delegate,
+SAFE token balance and airdrop vesting status of every child Safe.
+All on-chain values are fetched with JSON-RPC batch requests
+and allocation data is fetched concurrently.
+"""
+from __future__ import annotations
+
+import csv
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields, astuple
+from pathlib import Path
+from typing import Any, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+
+from src.abis.load import get_contract
+from src.airdrop.allocation import SAFE_TOKEN, Allocation, fetch_allocations
+from src.chains import Chain
+from src.constants import ZERO_ADDRESS
+from src.log import set_log
+from src.safe import SafeFamily
+from src.snapshot.delegate_registry import DELEGATION_CONTRACT, SAFE_DELEGATION_ID
+from src.util import partition_array
+
+log = set_log(__name__)
+
+# Calls per batch request
+READ_CHUNK = 1000
+
+
+def batch_call_chunked(client: EthereumClient, functions: list[Any]) -> list[Any]:
+    """batch_call of `functions` in chunks of READ_CHUNK (failing calls are None)"""
+    results: list[Any] = []
+    for chunk in partition_array(functions, READ_CHUNK):
+        results += client.batch_call(chunk, raise_exception=False)
+    return results
+
+
+@dataclass
+class VestingSummary:
+    """Aggregated airdrop vesting state of a single Safe"""
+
+    allocations: int = 0
+    redeemed: int = 0
+    allocated: int = 0
+    claimed: int = 0
+    vested_unclaimed: int = 0
+
+
+@dataclass
+class ChildReport:
+    """Single row of the fleet audit"""
+
+    # pylint:disable=too-many-instance-attributes
+    safe: ChecksumAddress
+    owners: str
+    threshold: Optional[int]
+    nonce: Optional[int]
+    parent_is_owner: bool
+    delegate: Optional[str]
+    safe_balance: Optional[int]
+    allocations: int
+    redeemed: int
+    allocated: int
+    claimed: int
+    vested_unclaimed: int
+
+
+def vesting_summaries(
+    client: EthereumClient, allocations: dict[ChecksumAddress, list[Allocation]]
+) -> dict[ChecksumAddress, VestingSummary]:
+    """Reads on-chain vesting state for all allocations in one batched pass"""
+    entries: list[tuple[ChecksumAddress, Allocation]] = []
+    functions = []
+    for child, allocation_list in allocations.items():
+        for allocation in allocation_list:
+            contract = get_contract(client.w3, "airdrop", allocation.contract)
+            vesting_id = bytes.fromhex(allocation.vestingId.replace("0x", ""))
+            entries.append((child, allocation))
+            functions += [
+                contract.functions.vestings(vesting_id),
+                contract.functions.calculateVestedAmount(vesting_id),
+            ]
+    # Failing calls (e.g. unknown vestings) result in None.
+    results = batch_call_chunked(client, functions)
+
+    summaries = {child: VestingSummary() for child in allocations}
+    for (child, allocation), vesting, vested in zip(
+        entries, results[0::2], results[1::2]
+    ):
+        summary = summaries[child]
+        summary.allocations += 1
+        summary.allocated += int(allocation.amount)
+        if vesting is None or vesting[0] == ZERO_ADDRESS:
+            # Not (yet) redeemed: vesting does not exist on chain.
+            continue
+        summary.redeemed += 1
+        summary.claimed += vesting[6]
+        if vested is not None:
+            summary.vested_unclaimed += vested[0] - vested[1]
+    return summaries
+
+
+def read_child_states(
+    client: EthereumClient, children: list[ChecksumAddress], mainnet: bool = True
+) -> list[tuple[Any, ...]]:
+    """
+    Reads (owners, threshold, nonce, delegate, SAFE balance) of every child.
+    Values of failing calls (e.g. on non-Safe addresses) are None, as are the
+    delegate and SAFE balance off `mainnet` (where their contracts are deployed).
+    """
+    safe_functions = get_safe_V1_3_0_contract(client.w3).functions
+    columns: list[list[Any]] = [
+        [
+            value
+            for chunk in partition_array(children, READ_CHUNK)
+            for value in client.batch_call_same_function(
+                function, chunk, raise_exception=False
+            )
+        ]
+        for function in (
+            safe_functions.getOwners(),
+            safe_functions.getThreshold(),
+            safe_functions.nonce(),
+        )
+    ]
+    if not mainnet:
+        log.info("delegate and SAFE balance are only read on mainnet")
+        return [(*state, None, None) for state in zip(*columns)]
+    delegation_id = SAFE_DELEGATION_ID.bytes
+    reads = batch_call_chunked(
+        client,
+        [
+            function
+            for child in children
+            for function in (
+                DELEGATION_CONTRACT.functions.delegation(child, delegation_id),
+                SAFE_TOKEN.functions.balanceOf(child),
+            )
+        ],
+    )
+    columns += [reads[0::2], reads[1::2]]
+    return list(zip(*columns))
+
+
+def audit_fleet(client: EthereumClient, family: SafeFamily) -> list[ChildReport]:
+    """Gathers the audit report of all children in `family`"""
+    log.info(f"auditing {len(family.children)} child safes of {family.parent}")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Allocation API requests overlap with the on-chain reads.
+        allocations = pool.submit(
+            fetch_allocations, family.children, family.chain.value
+        )
+        states = read_child_states(
+            client, family.children, mainnet=family.chain == Chain.ETHEREUM
+        )
+        vestings = vesting_summaries(client, allocations.result())
+
+    reports = []
+    for child, (owners, threshold, nonce, delegate, balance) in zip(
+        family.children, states
+    ):
+        vesting = vestings[child]
+        reports.append(
+            ChildReport(
+                safe=child,
+                owners=";".join(owners or []),
+                threshold=threshold,
+                nonce=nonce,
+                parent_is_owner=family.parent in (owners or []),
+                delegate=delegate,
+                safe_balance=balance,
+                allocations=vesting.allocations,
+                redeemed=vesting.redeemed,
+                allocated=vesting.allocated,
+                claimed=vesting.claimed,
+                vested_unclaimed=vesting.vested_unclaimed,
+            )
+        )
+    return reports
+
+
+def write_audit_csv(reports: list[ChildReport], path: Path) -> None:
+    """Writes the report as CSV (one column per ChildReport field)"""
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow([field.name for field in fields(ChildReport)])
+        writer.writerows(astuple(report) for report in reports)
+    log.info(f"wrote audit of {len(reports)} safes to {path}")
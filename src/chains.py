@@ -0,0 +1,73 @@
+"""Supported chains and their chain specific identifiers"""
+from __future__ import annotations
+
+from enum import Enum
+
+
+class Chain(Enum):
+    """Chains on which Safe fleets are operated (values are chain ids)"""
+
+    ETHEREUM = 1
+    OPTIMISM = 10
+    GNOSIS = 100
+    POLYGON = 137
+    BASE = 8453
+    ARBITRUM = 42161
+
+    @classmethod
+    def from_str(cls, chain_str: str) -> Chain:
+        """Constructs Enum variant from chain name (case-insensitive)"""
+        try:
+            return cls[chain_str.upper()]
+        except KeyError as err:
+            raise ValueError(f"No Chain {chain_str}!") from err
+
+    @classmethod
+    def from_chain_id(cls, chain_id: int) -> Chain:
+        """Constructs Enum variant from chain id"""
+        try:
+            return cls(chain_id)
+        except ValueError as err:
+            raise ValueError(f"Unsupported chain id {chain_id}!") from err
+
+    @property
+    def dune_name(self) -> str:
+        """Blockchain name used by Dune queries"""
+        return self.name.lower()
+
+    @property
+    def short_name(self) -> str:
+        """EIP-3770 short name used as prefix by the Safe web app"""
+        return {
+            Chain.ETHEREUM: "eth",
+            Chain.OPTIMISM: "oeth",
+            Chain.GNOSIS: "gno",
+            Chain.POLYGON: "matic",
+            Chain.BASE: "base",
+            Chain.ARBITRUM: "arb1",
+        }[self]
+
+    @property
+    def default_node_url(self) -> str:
+        """Public RPC used when no node url is configured for the chain"""
+        return {
+            Chain.ETHEREUM: "https://rpc.ankr.com/eth",
+            Chain.OPTIMISM: "https://mainnet.optimism.io",
+            Chain.GNOSIS: "https://rpc.gnosischain.com",
+            Chain.POLYGON: "https://polygon-rpc.com",
+            Chain.BASE: "https://mainnet.base.org",
+            Chain.ARBITRUM: "https://arb1.arbitrum.io/rpc",
+        }[self]
+
+    @property
+    def transaction_service_url(self) -> str:
+        """Base URL of the Safe Transaction Service"""
+        slug = {
+            Chain.ETHEREUM: "mainnet",
+            Chain.GNOSIS: "gnosis-chain",
+            Chain.ARBITRUM: "arbitrum",
+        }.get(self, self.name.lower())
+        return f"https://safe-transaction-{slug}.safe.global"
+
+    def __str__(self) -> str:
+        return self.name.lower()
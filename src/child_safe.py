@@ -0,0 +1,61 @@
+"""
+Slim handles of the child Safes of a fleet.
+Encoding calls on behalf of a child only requires its address and the Safe ABI,
+so handles share a single precompiled Safe ABI (rather than each owning a web3 contract
+resolved with a VERSION call) and only build a full gnosis `Safe` on demand.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Optional
+
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from gnosis.safe import Safe
+from web3 import Web3
+
+from src.abis.load import ContractAbi
+
+# The methods called on children (execTransaction, owner management) are identical
+# in Safe v1.1.1 and v1.3.0.
+SAFE_ABI = ContractAbi.from_json(
+    "safe", json.dumps(get_safe_V1_3_0_contract(Web3()).abi).encode()
+)
+
+
+class ChildSafe:
+    """Address and client of a child Safe"""
+
+    __slots__ = ("address", "ethereum_client", "_safe")
+
+    def __init__(self, address: ChecksumAddress, ethereum_client: EthereumClient):
+        self.address = address
+        self.ethereum_client = ethereum_client
+        self._safe: Optional[Safe] = None
+
+    def __str__(self) -> str:
+        return f"Safe={self.address}"
+
+    def __repr__(self) -> str:
+        return f"ChildSafe({self.address})"
+
+    def encode(self, method: str, args: list[Any]) -> HexStr:
+        """Call data of Safe `method` with `args` (without any network access)"""
+        return SAFE_ABI.encoder(method).encode(args)
+
+    def retrieve_is_owner(self, owner: str) -> bool:
+        """Whether `owner` is an owner of this Safe"""
+        is_owner: bool = (
+            get_safe_V1_3_0_contract(self.ethereum_client.w3, address=self.address)
+            .functions.isOwner(owner)
+            .call()
+        )
+        return is_owner
+
+    def as_safe(self) -> Safe:
+        """Full gnosis Safe object (built once, on first use)"""
+        if self._safe is None:
+            self._safe = Safe(self.address, self.ethereum_client)
+        return self._safe
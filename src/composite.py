@@ -0,0 +1,81 @@
+"""
+Composite commands: several operations per child executed by a single execTransaction.
+Each operation is built by its own command's builder (one pre-validated execTransaction
+wrapper per call); the calls of every child are then unwrapped and packed into one
+inner MultiSend delegate-called by the child, so the parent batch carries a single
+wrapper per child (and fewer parent batches and nonces overall).
+"""
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.safe import Safe, SafeOperation
+from gnosis.safe.multi_send import MultiSendOperation, MultiSendTx
+
+from src.child_safe import SAFE_ABI, ChildSafe
+from src.log import set_log
+from src.multisend import build_multisend_from_data
+from src.safe import SafeTransaction, encode_exec_transaction
+from src.tree import Builder, WeightedTx, wrap_batch
+from src.util import to_checksum_address
+
+log = set_log(__name__)
+
+
+def unwrap(wrapper: MultiSendTx) -> MultiSendTx:
+    """Call made by the child Safe executing the execTransaction `wrapper`"""
+    to, value, data, operation, *_ = SAFE_ABI.encoder("execTransaction").decode(
+        bytes(wrapper.data)
+    )
+    return MultiSendTx(
+        MultiSendOperation(operation), to_checksum_address(to), value, data
+    )
+
+
+def child_transaction(
+    child: ChildSafe, owner: ChecksumAddress, calls: list[MultiSendTx]
+) -> MultiSendTx:
+    """
+    execTransaction on `child` (pre-validated by `owner`) making all `calls`:
+    directly for a single call and through an inner MultiSend otherwise.
+    """
+    if len(calls) > 1:
+        return wrap_batch(
+            child, owner, [WeightedTx(call) for call in calls]
+        ).transaction
+    transaction = SafeTransaction(
+        to=to_checksum_address(calls[0].to),
+        value=calls[0].value,
+        data=HexStr("0x" + bytes(calls[0].data).hex()),
+        operation=SafeOperation(calls[0].operation.value),
+    )
+    return build_multisend_from_data(
+        child, encode_exec_transaction(child, owner, transaction)
+    )
+
+
+def composite_transactions(
+    parent: Safe, children: list[ChildSafe], builders: list[Builder]
+) -> list[MultiSendTx]:
+    """
+    One execTransaction per child carrying the operations of all `builders`
+    (in the given order). Children with a single operation keep its plain wrapper.
+    """
+    wrappers: dict[str, list[MultiSendTx]] = {child.address: [] for child in children}
+    for build in builders:
+        for wrapper in build(parent, children):
+            if wrapper.to not in wrappers:
+                raise ValueError(f"{wrapper.to} is not a child of {parent.address}")
+            wrappers[wrapper.to].append(wrapper)
+    transactions = []
+    for child in children:
+        calls = wrappers[child.address]
+        if len(calls) == 1:
+            transactions.append(calls[0])
+        elif calls:
+            transactions.append(
+                child_transaction(child, parent.address, [unwrap(c) for c in calls])
+            )
+    log.info(
+        f"packed {sum(map(len, wrappers.values()))} operations "
+        f"into {len(transactions)} child transactions"
+    )
+    return transactions
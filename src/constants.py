@@ -1,5 +1,4 @@
 """Project static constants"""
-import json
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -7,33 +6,3 @@ LOG_CONFIG_FILE = Path(__file__).parent.parent / Path("logging.conf")
 ABI_PATH = Path(__file__).parent.parent / Path("src/abis")
 
 ZERO_ADDRESS = "0x".ljust(42, "0")
-
-ERC20_ABI = json.loads(
-    """[
-    {
-        "inputs": [
-            {"internalType": "address", "name": "recipient", "type": "address"},
-            {"internalType": "uint256", "name": "amount", "type": "uint256"}
-        ],
-        "name": "transfer",
-        "outputs": [{"internalType": "bool", "name": "", "type": "bool"}],
-        "stateMutability": "nonpayable",
-        "type": "function"
-    },
-    {
-        "constant": true,
-        "inputs": [],
-        "name": "decimals",
-        "outputs": [
-          {
-            "name": "",
-            "type": "uint8"
-          }
-        ],
-        "payable": false,
-        "stateMutability": "view",
-        "type": "function"
-  }
-]
-"""
-)
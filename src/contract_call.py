@@ -0,0 +1,142 @@
+"""
+Generic contract method call executed by every child Safe.
+Arguments are either constant (with optional {parent}/{child} placeholders)
+or provided per child via a JSON file mapping child address -> argument list.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.safe import Safe, SafeOperation
+from gnosis.safe.multi_send import MultiSendTx
+
+from src.abis.encoder import MethodEncoder
+from src.abis.load import load_abi
+from src.child_safe import ChildSafe
+from src.log import set_log
+from src.multisend import build_multisend_from_data
+from src.safe import SafeTransaction, encode_exec_transaction
+from src.util import to_checksum_address, to_checksum_addresses
+
+log = set_log(__name__)
+
+
+def substitute(value: Any, parent: str, child: str) -> Any:
+    """Replaces {parent} and {child} placeholders in (nested) string arguments"""
+    if isinstance(value, str):
+        return value.replace("{parent}", parent).replace("{child}", child)
+    if isinstance(value, list):
+        return [substitute(item, parent, child) for item in value]
+    return value
+
+
+@dataclass
+class ContractCall:
+    """Contract method call to be executed on behalf of each child Safe"""
+
+    contract: ChecksumAddress
+    encoder: MethodEncoder
+    value: int = 0
+    args: Optional[list[Any]] = None
+    args_by_child: Optional[dict[ChecksumAddress, list[Any]]] = None
+
+    @classmethod
+    def from_args(
+        cls,
+        parser: Optional[argparse.ArgumentParser] = None,
+        argv: Optional[list[str]] = None,
+    ) -> ContractCall:
+        """Parses Instance of class from command line arguments (or `argv`)."""
+        if parser is None:
+            parser = argparse.ArgumentParser("Contract Call Arguments")
+        parser.add_argument(
+            "--contract",
+            type=str,
+            required=True,
+            help="Address of the contract called by each child Safe",
+        )
+        parser.add_argument(
+            "--abi",
+            type=str,
+            required=True,
+            help="Name of the contract ABI file in src/abis (e.g. erc20)",
+        )
+        parser.add_argument(
+            "--method",
+            type=str,
+            required=True,
+            help="Method name (or full signature for overloaded methods)",
+        )
+        parser.add_argument(
+            "--args",
+            type=str,
+            default=None,
+            help="JSON list of constant method arguments e.g. '[\"{parent}\", 1]'",
+        )
+        parser.add_argument(
+            "--args-file",
+            type=str,
+            default=None,
+            help="JSON file mapping child address to its list of method arguments",
+        )
+        parser.add_argument(
+            "--value",
+            type=int,
+            default=0,
+            help="ETH value (in wei) sent along with each call",
+        )
+        args, _ = parser.parse_known_args(argv)
+        if (args.args is None) == (args.args_file is None):
+            raise ValueError("exactly one of --args or --args-file must be provided")
+
+        args_by_child = None
+        if args.args_file is not None:
+            with open(args.args_file, "r", encoding="utf-8") as file:
+                raw_args = json.load(file)
+            args_by_child = dict(
+                zip(to_checksum_addresses(raw_args.keys()), raw_args.values())
+            )
+        return cls(
+            contract=to_checksum_address(args.contract),
+            encoder=load_abi(args.abi).encoder(args.method),
+            value=args.value,
+            args=json.loads(args.args) if args.args is not None else None,
+            args_by_child=args_by_child,
+        )
+
+    def args_for(
+        self, parent: ChecksumAddress, child: ChecksumAddress
+    ) -> Optional[list[Any]]:
+        """Method arguments for `child` (None when the child has no entry)"""
+        if self.args_by_child is not None:
+            args = self.args_by_child.get(child)
+        else:
+            args = self.args
+        if args is None:
+            return None
+        return [substitute(arg, parent, child) for arg in args]
+
+    def transactions_for(
+        self, parent: Safe, children: list[ChildSafe]
+    ) -> Iterator[MultiSendTx]:
+        """Lazily encodes the call for each child as parent-executed MultiSendTx"""
+        log.info(f"encoding {self.encoder.signature} on {self.contract} per child")
+        for child in children:
+            args = self.args_for(parent.address, child.address)
+            if args is None:
+                log.warning(f"no arguments for {child.address} - skipping!")
+                continue
+            transaction = SafeTransaction(
+                to=self.contract,
+                value=self.value,
+                data=self.encoder.encode(args),
+                operation=SafeOperation.CALL,
+            )
+            yield build_multisend_from_data(
+                safe=child,
+                data=encode_exec_transaction(child, parent.address, transaction),
+            )
@@ -0,0 +1,385 @@
+"""
+Long-running exec daemon with a local HTTP job API (on a Unix socket).
+The process keeps its clients (per chain), transaction services, ABI registry,
+Safe hashers and the fleet and allocation caches warm across jobs, so that
+automation can fire many small operations without per-process startup costs.
+
+    POST /jobs        {"args": [<src.exec arguments>]}  -> job (202)
+    GET  /jobs                                          -> all jobs
+    GET  /jobs/<id>                                     -> job
+
+The socket is only accessible to the user running the daemon and submissions must
+have Content-Type application/json. Jobs take the same arguments as
+`python -m src.exec` (without confirmation, pipelining, plans or gas scheduling),
+are run with bounded concurrency and their transactions are posted to the
+transaction service of the family's chain.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from socketserver import ThreadingUnixStreamServer
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.chains import Chain
+from src.log import set_log
+
+if TYPE_CHECKING:
+    from gnosis.safe import Safe
+    from gnosis.safe.api import TransactionServiceApi
+
+    from src.exec import TransactionBuilder
+    from src.safe import SafeFamily
+
+log = set_log(__name__)
+
+DEFAULT_SOCKET = Path.home() / ".subsafe-commander" / "daemon.sock"
+# Jobs accepted (queued or running) before new ones are rejected
+MAX_PENDING_JOBS = 100
+# Finished jobs kept for status requests (the oldest ones are evicted)
+MAX_FINISHED_JOBS = 1000
+# src.exec arguments that do not apply to daemon jobs
+UNSUPPORTED_ARGUMENTS = {"--pipeline", "--plan", "--gas-ceiling", "--yes"}
+
+# Runs a job from its src.exec arguments, returns the posted nonces
+JobRunner = Callable[[list[str]], list[int]]
+
+# Jobs of the same (chain, parent) lane post one after the other.
+_LANE_LOCKS: dict[tuple[Chain, str], threading.Lock] = {}
+_LANE_LOCKS_LOCK = threading.Lock()
+
+
+class JobStatus(Enum):
+    """Lifecycle of a job"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+@dataclass
+class Job:
+    """Single exec run requested through the API"""
+
+    args: list[str]
+    # pylint:disable-next=invalid-name
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    nonces: list[int] = field(default_factory=list)
+    error: Optional[str] = None
+    submitted: float = field(default_factory=time.time)
+    finished: Optional[float] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON compatible representation"""
+        return {
+            "id": self.id,
+            "args": self.args,
+            "status": str(self.status),
+            "nonces": self.nonces,
+            "error": self.error,
+            "submitted": self.submitted,
+            "finished": self.finished,
+        }
+
+
+def check_job_args(args: list[str]) -> None:
+    """Raises ValueError for src.exec arguments that are not supported by the daemon"""
+    unsupported = sorted({arg.split("=")[0] for arg in args} & UNSUPPORTED_ARGUMENTS)
+    if unsupported:
+        raise ValueError(f"{', '.join(unsupported)} not supported by the daemon")
+
+
+def parse_job(args: list[str]) -> tuple[list[SafeFamily], TransactionBuilder]:
+    """Families and transaction builder of the src.exec arguments `args`"""
+    # pylint:disable=import-outside-toplevel
+    from src.exec import ExecCommand, transaction_builder
+    from src.safe import SafeFamily
+
+    check_job_args(args)
+    try:
+        parser = argparse.ArgumentParser("Job Arguments")
+        parser.add_argument("--command", type=ExecCommand, required=True)
+        families = SafeFamily.all_from_args(parser, args)
+        command: ExecCommand = parser.parse_known_args(args)[0].command
+        if command == ExecCommand.AUDIT:
+            raise ValueError("AUDIT is not supported by the daemon")
+        return families, transaction_builder(command, args)
+    except SystemExit as err:
+        # argparse exits on invalid arguments
+        raise ValueError(f"invalid job arguments {args}") from err
+
+
+def lane_lock(chain: Chain, parent: str) -> threading.Lock:
+    """Lock serializing the jobs posting for `parent` on `chain`"""
+    with _LANE_LOCKS_LOCK:
+        return _LANE_LOCKS.setdefault((chain, parent), threading.Lock())
+
+
+def queued_nonce(safe: Safe, tx_service: TransactionServiceApi) -> int:
+    """
+    Nonce after the transactions of `safe` proposed to `tx_service` and not yet
+    executed (the current nonce of `safe` when none are queued), so that jobs do not
+    post conflicting proposals while earlier ones await execution.
+    """
+    nonce = int(safe.retrieve_nonce())
+    queued = [
+        int(tx["nonce"])
+        for tx in tx_service.get_transactions(safe.address)
+        if not tx["isExecuted"]
+    ]
+    return max([nonce, *(queued_tx + 1 for queued_tx in queued)])
+
+
+def post_lane(
+    family: SafeFamily, build: TransactionBuilder, signing_key: str
+) -> list[int]:
+    """
+    Posts the batches of a single (chain, parent) lane, after the proposals
+    already queued for its parent (one job per lane at a time).
+    """
+    # pylint:disable=import-outside-toplevel
+    from src.environment import chain_context
+    from src.exec import family_batches
+    from src.safe import batch_exec
+
+    context = chain_context(family.chain)
+    parent, children = family.as_safes(context.client)
+    batches = family_batches(build, family, parent, children, context.client)
+    with lane_lock(family.chain, family.parent):
+        nonce = queued_nonce(parent, context.tx_service)
+        return batch_exec(
+            parent,
+            context.client,
+            signing_key,
+            batches,
+            context.tx_service,
+            confirm=False,
+            nonce=nonce,
+        )
+
+
+def run_exec_job(args: list[str]) -> list[int]:
+    """Runs src.exec with `args` on the warm clients of this process"""
+    # pylint:disable=import-outside-toplevel
+    from src.exec import lanes_for
+
+    families, build = parse_job(args)
+    signing_key = os.environ["PROPOSER_PK"]
+    nonces = []
+    for family in lanes_for(families):
+        nonces += post_lane(family, build, signing_key)
+    return nonces
+
+
+class JobQueue:
+    """Jobs run by a bounded pool of workers"""
+
+    def __init__(self, runner: JobRunner = run_exec_job, workers: int = 4):
+        self.runner = runner
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, args: list[str]) -> dict[str, Any]:
+        """Queues a job (fails when MAX_PENDING_JOBS are pending)"""
+        with self._lock:
+            pending = [
+                job
+                for job in self._jobs.values()
+                if job.status in (JobStatus.QUEUED, JobStatus.RUNNING)
+            ]
+            if len(pending) >= MAX_PENDING_JOBS:
+                raise RuntimeError(f"{len(pending)} jobs pending")
+            job = Job(args)
+            self._jobs[job.id] = job
+            queued = job.to_dict()
+        self._pool.submit(self._run, job)
+        log.info(f"queued job {job.id}: {' '.join(args)}")
+        return queued
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            job.status = JobStatus.RUNNING
+        nonces, error = [], None
+        try:
+            nonces = self.runner(job.args)
+        except Exception as err:  # pylint:disable=broad-exception-caught
+            log.error(f"job {job.id} failed: {err}")
+            error = str(err)
+        with self._lock:
+            job.nonces, job.error = nonces, error
+            job.status = JobStatus.FAILED if error is not None else JobStatus.DONE
+            job.finished = time.time()
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        """Drops the oldest finished jobs beyond MAX_FINISHED_JOBS (holding the lock)"""
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in (JobStatus.DONE, JobStatus.FAILED)
+        ]
+        for job_id in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[dict[str, Any]]:
+        """Job with id `job_id` (if any)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.to_dict()
+
+    def all(self) -> list[dict[str, Any]]:
+        """All (not evicted) jobs in order of submission"""
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def shutdown(self) -> None:
+        """Waits for all accepted jobs"""
+        self._pool.shutdown(wait=True)
+
+
+def make_handler(jobs: JobQueue) -> type[BaseHTTPRequestHandler]:
+    """Request handler of the job API on `jobs`"""
+
+    class JobHandler(BaseHTTPRequestHandler):
+        """JSON job API"""
+
+        def _reply(self, status: int, content: Any) -> None:
+            body = json.dumps(content).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:  # pylint:disable=invalid-name
+            """Job status"""
+            if self.path.rstrip("/") == "/jobs":
+                self._reply(200, jobs.all())
+                return
+            prefix = "/jobs/"
+            job = jobs.get(self.path[len(prefix) :])
+            if not self.path.startswith(prefix) or job is None:
+                self._reply(404, {"error": f"not found: {self.path}"})
+                return
+            self._reply(200, job)
+
+        def do_POST(self) -> None:  # pylint:disable=invalid-name
+            """Job submission"""
+            if self.path.rstrip("/") != "/jobs":
+                self._reply(404, {"error": f"not found: {self.path}"})
+                return
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.split(";")[0].strip() != "application/json":
+                self._reply(415, {"error": "Content-Type must be application/json"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                args = json.loads(self.rfile.read(length))["args"]
+                if not isinstance(args, list):
+                    raise ValueError("args must be a list")
+                args = [str(arg) for arg in args]
+                check_job_args(args)
+            except (ValueError, KeyError, TypeError) as err:
+                self._reply(400, {"error": f"invalid job: {err}"})
+                return
+            try:
+                job = jobs.submit(args)
+            except RuntimeError as err:
+                self._reply(503, {"error": str(err)})
+                return
+            self._reply(202, job)
+
+        def address_string(self) -> str:
+            # Unix socket peers have no address
+            return "local"
+
+        # pylint:disable-next=arguments-differ
+        def log_message(self, fmt: str, *args: Any) -> None:
+            log.debug(fmt, *args)
+
+    return JobHandler
+
+
+class UnixHTTPServer(ThreadingUnixStreamServer):
+    """HTTP server on a Unix socket accessible only to the current user"""
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, handler: type[BaseHTTPRequestHandler]):
+        self.path = path
+        super().__init__(str(path), handler)
+
+    def server_bind(self) -> None:
+        self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if self.path.is_socket():
+            self.path.unlink()  # left behind by an earlier run
+        # Created without group and world permissions (no window before the chmod).
+        umask = os.umask(0o177)
+        try:
+            super().server_bind()
+        finally:
+            os.umask(umask)
+        self.path.chmod(0o600)
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.path.unlink(missing_ok=True)
+
+
+def serve(jobs: JobQueue, path: Path = DEFAULT_SOCKET) -> UnixHTTPServer:
+    """Job API server on the Unix socket `path` (call serve_forever to run it)"""
+    return UnixHTTPServer(path, make_handler(jobs))
+
+
+def main() -> None:
+    """Runs the daemon until interrupted"""
+    parser = argparse.ArgumentParser("Daemon Arguments")
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=DEFAULT_SOCKET,
+        help="Unix socket of the job API (accessible only to the current user)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="Maximum number of concurrent jobs"
+    )
+    args, _ = parser.parse_known_args()
+    os.environ.setdefault("FLEET_CACHE_SECONDS", "600")
+    # Pays the client and ABI setup once, before accepting jobs, and builds the
+    # clients of all configured chains (concurrent first jobs would build their own).
+    # pylint:disable=import-outside-toplevel,unused-import
+    import src.exec  # noqa: F401
+    from src.environment import chain_context, configured_chains
+
+    for chain in configured_chains():
+        chain_context(chain)
+
+    jobs = JobQueue(workers=args.workers)
+    server = serve(jobs, args.socket)
+    log.info(f"accepting jobs on {args.socket} (POST /jobs)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("shutting down (waiting for running jobs)")
+    finally:
+        server.server_close()
+        jobs.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Disperse backend for token transfers.
+Instead of one MultiSend call per transfer, the transfers of a token are sent by a
+single call to the Disperse contract (disperseToken / disperseEther with receiver and
+amount arrays), preceded by an approval for ERC20 tokens. The backend of each token
+group is chosen by an offline gas estimate: call data cost plus per-call execution
+overheads (the token transfers themselves cost the same with either backend).
+ETH stays on MultiSend unless Disperse is requested explicitly: disperseEther pays
+with `transfer`, whose 2300 gas stipend is not enough for Safes and most other
+contract wallets to receive ETH (reverting the whole batch).
+"""
+from __future__ import annotations
+
+import math
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.safe.multi_send import MultiSendOperation, MultiSendTx
+
+from src.abis.load import load_abi
+from src.log import set_log
+from src.multisend import BATCH_SIZE_LIMIT
+from src.tree import WeightedTx, chunk_by_weight
+from src.util import to_checksum_address
+
+if TYPE_CHECKING:
+    from src.token_transfer import Transfer
+
+log = set_log(__name__)
+
+# Same address on all chains (deterministic deployment), see https://disperse.app
+DISPERSE_CONTRACT = to_checksum_address("0xD152f549545093347A162Dce210e7293f1452150")
+DISPERSE_TOKEN = load_abi("disperse").encoder("disperseToken")
+DISPERSE_ETHER = load_abi("disperse").encoder("disperseEther")
+ERC20_APPROVE = load_abi("erc20").encoder("approve")
+
+# Packed MultiSend ERC20 transfer (operation, to, value, data length, transfer call)
+# versus one (receiver, amount) pair in the Disperse arrays.
+MULTISEND_TRANSFER_BYTES = 1 + 20 + 32 + 32 + 4 + 2 * 32
+DISPERSE_RECEIVER_BYTES = 2 * 32
+# Receivers per Disperse call: the same call data as a full batch of MultiSend transfers.
+# Sized by call data (191 receivers), not by the gas benchmarked for BATCH_SIZE_LIMIT:
+# a Disperse batch executes more than twice as many token transfers as a MultiSend
+# batch, so its gas is correspondingly higher (still far below the block gas limit).
+DISPERSE_BATCH_SIZE = (
+    BATCH_SIZE_LIMIT * MULTISEND_TRANSFER_BYTES // DISPERSE_RECEIVER_BYTES
+)
+
+# Execution overheads (estimates) on top of the transfers themselves.
+MULTISEND_CALL_GAS = 3_000
+DISPERSE_RECEIVER_GAS = 1_000
+# approve and transferFrom of the total into the Disperse contract
+DISPERSE_TOKEN_GAS = 60_000
+DISPERSE_ETHER_GAS = 10_000
+
+
+class TransferBackend(Enum):
+    """How the transfers of a token are encoded"""
+
+    AUTO = "auto"
+    MULTISEND = "multisend"
+    DISPERSE = "disperse"
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+
+def calldata_gas(data: bytes) -> int:
+    """Intrinsic gas of call data (16 per non-zero byte and 4 per zero byte)"""
+    zeros = data.count(0)
+    return 16 * (len(data) - zeros) + 4 * zeros
+
+
+def estimate_multisend_gas(transactions: list[MultiSendTx]) -> int:
+    """Estimated gas overhead of sending `transactions` as MultiSend calls"""
+    packed = b"".join(tx.encoded_data for tx in transactions)
+    return calldata_gas(packed) + MULTISEND_CALL_GAS * len(transactions)
+
+
+def estimate_disperse_gas(
+    transactions: list[MultiSendTx], receivers: int, token: Optional[ChecksumAddress]
+) -> int:
+    """Estimated gas overhead of the Disperse `transactions` for `receivers`"""
+    fixed = DISPERSE_ETHER_GAS if token is None else DISPERSE_TOKEN_GAS
+    return (
+        estimate_multisend_gas(transactions) + DISPERSE_RECEIVER_GAS * receivers + fixed
+    )
+
+
+def disperse_transactions(transfers: list[Transfer]) -> list[MultiSendTx]:
+    """Disperse call (after approving the total for ERC20) for transfers of one token"""
+    receivers = [transfer.receiver for transfer in transfers]
+    amounts = [transfer.amount_wei for transfer in transfers]
+    token = transfers[0].token
+    if token is None:
+        return [
+            MultiSendTx(
+                MultiSendOperation.CALL,
+                DISPERSE_CONTRACT,
+                sum(amounts),
+                DISPERSE_ETHER.encode([receivers, amounts]),
+            )
+        ]
+    return [
+        MultiSendTx(
+            MultiSendOperation.CALL,
+            token.address,
+            0,
+            ERC20_APPROVE.encode([DISPERSE_CONTRACT, sum(amounts)]),
+        ),
+        MultiSendTx(
+            MultiSendOperation.CALL,
+            DISPERSE_CONTRACT,
+            0,
+            DISPERSE_TOKEN.encode([token.address, receivers, amounts]),
+        ),
+    ]
+
+
+def group_by_token(
+    transfers: list[Transfer],
+) -> dict[Optional[ChecksumAddress], list[Transfer]]:
+    """Transfers by token address (None for ETH), in order of first appearance"""
+    groups: dict[Optional[ChecksumAddress], list[Transfer]] = {}
+    for transfer in transfers:
+        token = transfer.token.address if transfer.token is not None else None
+        groups.setdefault(token, []).append(transfer)
+    return groups
+
+
+def encode_group(
+    transfers: list[Transfer], backend: TransferBackend = TransferBackend.AUTO
+) -> list[WeightedTx]:
+    """
+    Transactions for transfers of a single token with `backend` (with AUTO, the one of
+    lower estimated gas, always MultiSend for ETH), weighted by their call data in
+    MultiSend transfers.
+    """
+    multisend = [transfer.as_multisend_tx() for transfer in transfers]
+    disperse = disperse_transactions(transfers)
+    token = transfers[0].token
+    if backend == TransferBackend.AUTO:
+        use_disperse = token is not None and estimate_disperse_gas(
+            disperse, len(transfers), token.address
+        ) < estimate_multisend_gas(multisend)
+    else:
+        use_disperse = backend == TransferBackend.DISPERSE
+    if not use_disperse:
+        return [WeightedTx(tx) for tx in multisend]
+    weight = math.ceil(
+        len(transfers) * DISPERSE_RECEIVER_BYTES / MULTISEND_TRANSFER_BYTES
+    )
+    # The weight is split across the approval (if any) and the Disperse call, at least
+    # 1 each, so that batches (of total weight <= BATCH_SIZE_LIMIT) never hold more
+    # transactions than a MultiSend batch accepts, while a full chunk still fits a
+    # single batch along with its approval.
+    *approval, call = disperse
+    return [WeightedTx(tx, 1) for tx in approval] + [
+        WeightedTx(call, max(weight - len(approval), 1))
+    ]
+
+
+def distribution_batches(
+    transfers: list[Transfer],
+    backend: TransferBackend = TransferBackend.AUTO,
+    capacity: int = BATCH_SIZE_LIMIT,
+) -> list[list[MultiSendTx]]:
+    """
+    MultiSend batches sending `transfers`: per token, in chunks of at most
+    DISPERSE_BATCH_SIZE receivers, each encoded with `backend`.
+    """
+    items: list[WeightedTx] = []
+    for token, group in group_by_token(transfers).items():
+        for start in range(0, len(group), DISPERSE_BATCH_SIZE):
+            chunk = encode_group(group[start : start + DISPERSE_BATCH_SIZE], backend)
+            items += chunk
+        log.info(f"encoded {len(group)} transfers of {token or 'ETH'}")
+    return [
+        [item.transaction for item in batch]
+        for batch in chunk_by_weight(items, capacity)
+    ]
@@ -1,22 +1,36 @@
 """Self-contained programmatic use of Dune Client"""
 import os
+import time
 
 from dotenv import load_dotenv
 from dune_client.client import DuneClient
 from dune_client.query import QueryBase
 from dune_client.types import QueryParameter
 from eth_typing.evm import ChecksumAddress
-from web3 import Web3
+
+from src.util import to_checksum_addresses
+
+_FLEETS: dict[tuple[str, int, int, str], tuple[float, list[ChecksumAddress]]] = {}
 
 
 def fetch_child_safes(
-    parent: str | ChecksumAddress, index_from: int, index_to: int
+    parent: str | ChecksumAddress,
+    index_from: int,
+    index_to: int,
+    blockchain: str = "ethereum",
 ) -> list[ChecksumAddress]:
-    """Retrieves Child Safes from Parent via Dune"""
+    """
+    Retrieves Child Safes from Parent via Dune. Results are reused for
+    FLEET_CACHE_SECONDS (default 0, i.e. not cached) in long-running processes.
+    """
     load_dotenv()
+    key = (str(parent).lower(), index_from, index_to, blockchain)
+    ttl = float(os.environ.get("FLEET_CACHE_SECONDS", 0))
+    if key in _FLEETS and time.monotonic() - _FLEETS[key][0] < ttl:
+        return list(_FLEETS[key][1])
     dune = DuneClient(os.environ["DUNE_API_KEY"])
     parameters = [
-        QueryParameter.text_type("Blockchain", "ethereum"),
+        QueryParameter.text_type("Blockchain", blockchain),
         QueryParameter.text_type("ParentSafe", parent),
         QueryParameter.number_type("IndexFrom", index_from),
         QueryParameter.number_type("IndexTo", index_to),
@@ -32,4 +46,6 @@ def fetch_child_safes(
         raise ValueError(f"No results returned for parent {parent}")
 
     print(f"got fleet of size {len(results)}")
-    return [Web3().to_checksum_address(row["bracket"]) for row in results]
+    children = to_checksum_addresses(row["bracket"] for row in results)
+    _FLEETS[key] = (time.monotonic(), children)
+    return list(children)
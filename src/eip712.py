@@ -0,0 +1,145 @@
+"""
+Precomputed EIP-712 hashing of Safe transactions.
+safe-eth-py hashes every SafeTx through the generic EIP-712 encoder (and may fetch
+the chain id and Safe version on the way). Here the domain separator is computed once
+per (chain, Safe, version), the SafeTx type hash and the constant (zero) gas refund
+fields are precomputed, and each transaction only hashes its own fields.
+"""
+from __future__ import annotations
+
+import functools
+from typing import Iterable, Optional
+
+from eth_hash.auto import keccak
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe, SafeTx
+from hexbytes import HexBytes
+from packaging.version import Version
+
+from src.util import to_checksum_address
+
+DOMAIN_TYPEHASH = keccak(b"EIP712Domain(uint256 chainId,address verifyingContract)")
+# Safes < 1.3.0 have no chain id in their domain.
+LEGACY_DOMAIN_TYPEHASH = keccak(b"EIP712Domain(address verifyingContract)")
+SAFE_TX_TYPEHASH = keccak(
+    b"SafeTx(address to,uint256 value,bytes data,uint8 operation,uint256 safeTxGas,"
+    b"uint256 baseGas,uint256 gasPrice,address gasToken,address refundReceiver,"
+    b"uint256 nonce)"
+)
+# Safes < 1.0.0 call baseGas dataGas.
+LEGACY_SAFE_TX_TYPEHASH = keccak(
+    b"SafeTx(address to,uint256 value,bytes data,uint8 operation,uint256 safeTxGas,"
+    b"uint256 dataGas,uint256 gasPrice,address gasToken,address refundReceiver,"
+    b"uint256 nonce)"
+)
+# safeTxGas, baseGas, gasPrice, gasToken and refundReceiver (no refunds)
+NO_REFUND_FIELDS = bytes(5 * 32)
+
+
+def _word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+def _address_word(address: str) -> bytes:
+    return bytes.fromhex(address[2:]).rjust(32, b"\x00")
+
+
+@functools.cache
+def domain_separator(chain_id: int, safe: str, version: str) -> bytes:
+    """EIP-712 domain separator of `safe` (at `version`) on chain `chain_id`"""
+    if Version(version) >= Version("1.3.0"):
+        return keccak(DOMAIN_TYPEHASH + _word(chain_id) + _address_word(safe))
+    return keccak(LEGACY_DOMAIN_TYPEHASH + _address_word(safe))
+
+
+class SafeTxHasher:
+    """Hashes the (refund free) Safe transactions of a single Safe"""
+
+    __slots__ = ("chain_id", "safe", "version", "_prefix", "_typehash")
+
+    def __init__(self, chain_id: int, safe: str, version: str):
+        self.chain_id = chain_id
+        self.safe = to_checksum_address(safe)
+        self.version = version
+        self._prefix = b"\x19\x01" + domain_separator(chain_id, self.safe, version)
+        self._typehash = (
+            SAFE_TX_TYPEHASH
+            if Version(version) >= Version("1.0.0")
+            else LEGACY_SAFE_TX_TYPEHASH
+        )
+
+    def hash(  # pylint:disable=too-many-arguments
+        self, to: str, value: int, data: bytes, operation: int, nonce: int
+    ) -> bytes:
+        """safe_tx_hash of the transaction with the given fields"""
+        struct_hash = keccak(
+            self._typehash
+            + _address_word(to)
+            + _word(value)
+            + keccak(bytes(data))
+            + _word(operation)
+            + NO_REFUND_FIELDS
+            + _word(nonce)
+        )
+        return keccak(self._prefix + struct_hash)
+
+    def hash_many(
+        self, payloads: Iterable[tuple[str, int, bytes, int, int]]
+    ) -> list[bytes]:
+        """Hashes of all (to, value, data, operation, nonce) `payloads`"""
+        return [self.hash(*payload) for payload in payloads]
+
+
+class HashedSafeTx(SafeTx):
+    """
+    Refund free SafeTx of the hasher's Safe carrying its precomputed hash
+    (its fields must not be modified).
+    """
+
+    def __init__(  # pylint:disable=too-many-arguments
+        self,
+        hasher: SafeTxHasher,
+        to: str,
+        value: int,
+        data: bytes,
+        operation: int,
+        nonce: int,
+        client: Optional[EthereumClient] = None,
+        safe_tx_hash: Optional[bytes] = None,
+    ):
+        super().__init__(
+            client,  # type: ignore[arg-type]
+            hasher.safe,
+            to,
+            value,
+            data,
+            operation,
+            0,
+            0,
+            0,
+            None,
+            None,
+            safe_nonce=nonce,
+            safe_version=hasher.version,
+            chain_id=hasher.chain_id,
+        )
+        self._safe_tx_hash = HexBytes(
+            safe_tx_hash or hasher.hash(to, value, data, operation, nonce)
+        )
+
+    @property
+    def safe_tx_hash(self) -> HexBytes:
+        return self._safe_tx_hash
+
+
+_HASHERS: dict[tuple[EthereumClient, str], SafeTxHasher] = {}
+
+
+def hasher_for(safe: Safe) -> SafeTxHasher:
+    """Hasher of `safe` (its chain id and version are fetched once per process)"""
+    key = (safe.ethereum_client, safe.address)
+    if key not in _HASHERS:
+        _HASHERS[key] = SafeTxHasher(
+            safe.ethereum_client.get_chain_id(), safe.address, safe.retrieve_version()
+        )
+    return _HASHERS[key]
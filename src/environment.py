@@ -1,14 +1,73 @@
 """Loading environment variables as project constants"""
+import functools
 import os
+from dataclasses import dataclass
 
 from dotenv import load_dotenv
-from eth_typing import URI
-from gnosis.eth import EthereumClient
+from gnosis.eth import EthereumClient, EthereumNetwork
+from gnosis.safe.api import TransactionServiceApi
+
+from src.chains import Chain
+from src.provider import pooled_client
 
 load_dotenv()
+# Comma separated list of node urls (requests are load balanced over all of them).
 NODE_URL = os.environ.get("NODE_URL", "https://rpc.ankr.com/eth")
 if not NODE_URL:
     raise EnvironmentError("NODE_URL not set")
+# Max requests per second sent to each node url (0 or empty = unlimited).
+RPC_RATE_LIMIT = float(os.environ.get("RPC_RATE_LIMIT") or 0)
 
-CLIENT = EthereumClient(URI(NODE_URL))
+CLIENT = pooled_client(NODE_URL.split(","), RPC_RATE_LIMIT)
 print("Using network", CLIENT.get_network())
+
+
+@dataclass
+class ChainContext:
+    """Ethereum and Safe Transaction Service clients of a single chain"""
+
+    chain: Chain
+    client: EthereumClient
+    tx_service: TransactionServiceApi
+
+
+def configured_chains() -> list[Chain]:
+    """Chains with a node configured (NODE_URL_<CHAIN> or the chain of CLIENT)"""
+    client_chain = CLIENT.get_chain_id()
+    return [
+        chain
+        for chain in Chain
+        if os.environ.get(f"NODE_URL_{chain.name}") or chain.value == client_chain
+    ]
+
+
+@functools.cache
+def chain_context(chain: Chain) -> ChainContext:
+    """
+    Returns the (process wide, pooled) clients for `chain`.
+    The node(s) are taken from NODE_URL_<CHAIN> (e.g. NODE_URL_GNOSIS),
+    falling back to CLIENT if it is connected to `chain`
+    and finally to a public RPC of the chain.
+    """
+    node_url = os.environ.get(f"NODE_URL_{chain.name}")
+    if node_url:
+        client = pooled_client(node_url.split(","), RPC_RATE_LIMIT)
+    elif CLIENT.get_chain_id() == chain.value:
+        client = CLIENT
+    else:
+        client = pooled_client([chain.default_node_url], RPC_RATE_LIMIT)
+    if client.get_chain_id() != chain.value:
+        raise EnvironmentError(
+            f"node for {chain} is connected to chain {client.get_chain_id()}"
+        )
+    return ChainContext(
+        chain=chain,
+        client=client,
+        tx_service=TransactionServiceApi(
+            EthereumNetwork(chain.value),
+            ethereum_client=client,
+            base_url=os.environ.get(
+                f"TX_SERVICE_URL_{chain.name}", chain.transaction_service_url
+            ),
+        ),
+    )
@@ -0,0 +1,70 @@
+"""Chunked and batched eth_getLogs scans over many contract addresses"""
+from __future__ import annotations
+
+from typing import Any, Optional, cast
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from hexbytes import HexBytes
+
+from src.log import set_log
+from src.util import partition_array
+
+log = set_log(__name__)
+
+# Many public nodes reject eth_getLogs over wide ranges or with long address lists.
+LOG_BLOCK_CHUNK = 5000
+LOG_ADDRESS_CHUNK = 100
+
+
+def as_int(value: int | str) -> int:
+    """Raw RPC responses carry hex strings, formatted ones carry ints."""
+    if isinstance(value, str):
+        return int(value, 16)
+    return value
+
+
+def fetch_logs(
+    client: EthereumClient,
+    addresses: Optional[list[ChecksumAddress]],
+    topics: list[HexBytes],
+    from_block: int,
+    to_block: int,
+) -> list[dict[str, Any]]:
+    """
+    Raw logs with any of `topics` (as first topic) emitted by `addresses` (None for
+    any contract) in [from_block, to_block], sorted by (block, log index).
+    The range and address list are chunked and all eth_getLogs
+    requests are sent together as JSON-RPC batches.
+    """
+    chunks: list[Optional[list[ChecksumAddress]]] = [None]
+    if addresses is not None:
+        chunks = list(partition_array(addresses, LOG_ADDRESS_CHUNK))
+    payload: list[dict[str, Any]] = []
+    for chunk in chunks:
+        for start in range(from_block, to_block + 1, LOG_BLOCK_CHUNK):
+            log_filter: dict[str, Any] = {
+                "fromBlock": hex(start),
+                "toBlock": hex(min(start + LOG_BLOCK_CHUNK - 1, to_block)),
+                "topics": [[topic.hex() for topic in topics]],
+            }
+            if chunk is not None:
+                log_filter["address"] = chunk
+            payload.append(
+                {
+                    "id": len(payload),
+                    "jsonrpc": "2.0",
+                    "method": "eth_getLogs",
+                    "params": [log_filter],
+                }
+            )
+    log.info(
+        f"fetching logs of {'all' if addresses is None else len(addresses)} contracts "
+        f"in blocks [{from_block}, {to_block}] with {len(payload)} requests"
+    )
+    logs: list[dict[str, Any]] = []
+    for result in client.raw_batch_request(payload):
+        # eth_getLogs results are lists (the client's signature is overly narrow)
+        logs += cast(list[dict[str, Any]], result or [])
+    logs.sort(key=lambda e: (as_int(e["blockNumber"]), as_int(e["logIndex"])))
+    return logs
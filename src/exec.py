@@ -6,32 +6,80 @@ from __future__ import annotations
 
 import argparse
 import os
+import sys
 from enum import Enum
+from pathlib import Path
+from typing import Callable, Optional
 
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe
+from gnosis.safe.multi_send import MultiSendTx
 from web3 import Web3
 
 from src.add_owner import build_add_owner_with_threshold, AddOwnerArgs
-from src.airdrop.tx import transactions_for as claim_tx
+from src.airdrop.tx import (
+    redeem_transactions_for as redeem_tx,
+    transactions_for as claim_tx,
+)
+from src.audit import audit_fleet, write_audit_csv
+from src.chains import Chain
+from src.child_safe import ChildSafe
+from src.composite import composite_transactions
+from src.contract_call import ContractCall
 from src.log import set_log
-from src.snapshot.tx import transactions_for as snapshot_tx_for, SnapshotCommand
-from src.environment import CLIENT
-from src.safe import multi_exec, SafeFamily
+from src.snapshot.tx import (
+    transactions_for as snapshot_tx_for,
+    SnapshotArgs,
+    SnapshotCommand,
+)
+from src.environment import chain_context
+from src.pipeline import pipelined_exec
+from src.plan import build_plan
+from src.multisend import (
+    BATCH_SIZE_LIMIT,
+    build_and_sign_batches,
+    confirm_or_decline,
+)
+from src.rotate_owner import RotateArgs, rotate_transactions
+from src.scheduler import (
+    GWEI,
+    FeeSchedule,
+    add_schedule_arguments,
+    base_fee_reader,
+    chain_submitter,
+    check_executor,
+    run_schedule,
+)
+from src.safe import add_yes_argument, batch_exec, get_safe, SafeFamily
+from src.shard import format_lane_report, run_lanes, shard_families
+from src.sweep import SweepArgs, sweep_transactions
+from src.tree import tree_batches
+from src.util import partition_array
 
 log = set_log(__name__)
 
 
-def transaction_queue(address: str) -> str:
+def transaction_queue(address: str, chain: Chain = Chain.ETHEREUM) -> str:
     """URL to transaction queue"""
-    return f"https://app.safe.global/transactions/queue?safe=eth:{address}"
+    return (
+        f"https://app.safe.global/transactions/queue?safe={chain.short_name}:{address}"
+    )
 
 
 class ExecCommand(Enum):
     """All supported Scrip Entry point commands"""
 
     CLAIM = "CLAIM"
+    REDEEM = "REDEEM"
+    REDEEM_CLAIM = "REDEEM_CLAIM"
     ADD_OWNER = "ADD_OWNER"
     SET_DELEGATE = "setDelegate"
     CLEAR_DELEGATE = "clearDelegate"
+    AUDIT = "AUDIT"
+    CALL = "CALL"
+    COMPOSITE = "COMPOSITE"
+    SWEEP = "SWEEP"
+    ROTATE = "ROTATE"
 
     def __str__(self) -> str:
         return str(self.value)
@@ -45,25 +93,29 @@ class ExecCommand(Enum):
         return SnapshotCommand(self.value)
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser("Script Arguments")
-    parser.add_argument(
-        "--command",
-        type=ExecCommand,
-        choices=list(ExecCommand),
-        required=True,
-        help="Supported Airdrop Contract interactions",
-    )
+TransactionBuilder = Callable[[Safe, list[ChildSafe]], list[MultiSendTx]]
 
-    parent, children = SafeFamily.from_args(parser).as_safes(CLIENT)
-    args, _ = parser.parse_known_args()
-    command: ExecCommand = args.command
 
+def transaction_builder(  # pylint:disable=too-many-return-statements
+    command: ExecCommand,
+    argv: Optional[list[str]] = None,
+) -> TransactionBuilder:
+    """
+    Builder of the MultiSend transactions for `command` (parsing any extra arguments once,
+    from `argv` instead of sys.argv when given), so that it can be applied to all
+    children at once or child by child.
+    """
     if command == ExecCommand.CLAIM:
-        transactions = claim_tx(parent, children)
-    elif command.is_snapshot_function():
-        transactions = snapshot_tx_for(parent, children, command.as_snapshot_command())
-    elif command == ExecCommand.ADD_OWNER:
+        return claim_tx
+    if command in (ExecCommand.REDEEM, ExecCommand.REDEEM_CLAIM):
+        claim = command == ExecCommand.REDEEM_CLAIM
+        return lambda parent, children: redeem_tx(parent, children, claim)
+    if command.is_snapshot_function():
+        snapshot_args = SnapshotArgs.from_args(argv=argv)
+        return lambda parent, children: snapshot_tx_for(
+            parent, children, command.as_snapshot_command(), snapshot_args
+        )
+    if command == ExecCommand.ADD_OWNER:
         parser = argparse.ArgumentParser("Add Owner Arguments")
         parser.add_argument(
             "--new-owner",
@@ -77,26 +129,262 @@ if __name__ == "__main__":
             default=1,
             help="New Safe signature threshold",
         )
-        args, _ = parser.parse_known_args()
-        transactions = [
-            build_add_owner_with_threshold(
-                safe=parent,
-                sub_safe=child,
-                params=AddOwnerArgs(
-                    new_owner=Web3.to_checksum_address(args.new_owner),
-                    threshold=args.threshold,
-                ),
-            )
+        args, _ = parser.parse_known_args(argv)
+        params = AddOwnerArgs(
+            new_owner=Web3.to_checksum_address(args.new_owner),
+            threshold=args.threshold,
+        )
+        return lambda parent, children: [
+            build_add_owner_with_threshold(safe=parent, sub_safe=child, params=params)
             for child in children
         ]
-    else:
-        raise ValueError(
-            f"{args.command} is not a currently supported Exec interface method"
+    if command == ExecCommand.CALL:
+        call = ContractCall.from_args(argv=argv)
+        return lambda parent, children: list(call.transactions_for(parent, children))
+    if command == ExecCommand.ROTATE:
+        rotate_args = RotateArgs.from_args(argv)
+        return lambda parent, children: rotate_transactions(
+            parent, children, rotate_args
         )
+    if command == ExecCommand.SWEEP:
+        sweep_args = SweepArgs.from_args(argv)
+        return lambda parent, children: sweep_transactions(parent, children, sweep_args)
+    if command == ExecCommand.COMPOSITE:
+        parser = argparse.ArgumentParser("Composite Arguments")
+        parser.add_argument(
+            "--ops",
+            type=str,
+            required=True,
+            help="Comma separated commands executed in one transaction per child "
+            "(e.g. ADD_OWNER,setDelegate,CLAIM)",
+        )
+        args, _ = parser.parse_known_args(argv)
+        operations = [ExecCommand(op) for op in args.ops.split(",")]
+        if {ExecCommand.AUDIT, ExecCommand.COMPOSITE} & set(operations):
+            raise ValueError(f"{args.ops} can not be composed")
+        builders = [transaction_builder(op, argv) for op in operations]
+        return lambda parent, children: composite_transactions(
+            parent, children, builders
+        )
+    raise ValueError(f"{command} is not a currently supported Exec interface method")
+
+
+def audit(
+    family: SafeFamily, out_suffix: str = "", argv: Optional[list[str]] = None
+) -> None:
+    """
+    Read-only AUDIT command: writes a report of the family to file
+    (parsing `argv` instead of sys.argv when given).
+    """
+    parser = argparse.ArgumentParser("Audit Arguments")
+    parser.add_argument(
+        "--out",
+        type=Path,
+        default=Path("audit.csv"),
+        help="Output path of the CSV audit report",
+    )
+    args, _ = parser.parse_known_args(argv)
+    out: Path = args.out
+    out = out.with_stem(f"{out.stem}{out_suffix}")
+    write_audit_csv(audit_fleet(chain_context(family.chain).client, family), out)
+
+
+def family_batches(
+    build: TransactionBuilder,
+    family: SafeFamily,
+    parent: Safe,
+    children: list[ChildSafe],
+    client: EthereumClient,
+) -> list[list[MultiSendTx]]:
+    """
+    Parent batches of the transactions from `build`: partitioned by BATCH_SIZE_LIMIT
+    for flat families and packed by weight for nested trees (see src.tree).
+    """
+    if family.tree is not None:
+        batches = tree_batches(parent, family.tree, build, client)
+    else:
+        batches = partition_array(build(parent, children), BATCH_SIZE_LIMIT)
+    log.info(f"packed transactions into {len(batches)} batches")
+    return batches
+
+
+def scheduled_exec(
+    parent: Safe,
+    batches: list[list[MultiSendTx]],
+    client: EthereumClient,
+    schedule: FeeSchedule,
+    confirm: bool = True,
+) -> list[int]:
+    """
+    Signs `batches` and executes them from the proposer account according to
+    `schedule` (after confirmation if `confirm`). Returns the executed nonces.
+    """
+    signing_key = os.environ["PROPOSER_PK"]
+    executor = check_executor(parent, signing_key)
+    signed = build_and_sign_batches(parent, batches, client, signing_key)
+    confirm_or_decline(
+        f"executing {len(signed)} batches of {parent.address} from {executor} "
+        f"at a base fee of at most {schedule.ceiling / GWEI:.2f} gwei "
+        f"(or after {schedule.deadline / 60:.0f} minutes)",
+        confirm,
+    )
+    report = run_schedule(
+        signed,
+        schedule,
+        read_fee=base_fee_reader(client),
+        submit=chain_submitter(signing_key),
+    )
+    log.info(report)
+    return [execution.nonce for execution in report.executions]
 
-    nonces = multi_exec(
-        parent, CLIENT, signing_key=os.environ["PROPOSER_PK"], transactions=transactions
+
+def run_family(  # pylint:disable=too-many-arguments
+    command: ExecCommand,
+    family: SafeFamily,
+    out_suffix: str = "",
+    confirm: bool = True,
+    plan_out: Optional[Path] = None,
+    pipeline: bool = False,
+    schedule: Optional[FeeSchedule] = None,
+    argv: Optional[list[str]] = None,
+) -> list[int]:
+    """
+    Runs `command` for a single family with the clients of its chain
+    (parsing its arguments from `argv` instead of sys.argv when given).
+    Returns the nonces of the posted parent transactions
+    (none when only writing a plan to `plan_out`).
+    With `pipeline`, loading, encoding, signing and posting overlap (see src.pipeline).
+    With `schedule`, the signed batches are executed when gas is cheap (see src.scheduler).
+    """
+    if command == ExecCommand.AUDIT:
+        audit(family, out_suffix, argv)
+        return []
+    context = chain_context(family.chain)
+    if pipeline:
+        parent = get_safe(family.parent, context.client)
+        nonces = pipelined_exec(
+            parent,
+            family.children,
+            context.client,
+            build=transaction_builder(command, argv),
+            signing_key=os.environ["PROPOSER_PK"],
+            tx_service=context.tx_service,
+            confirm=confirm,
+        )
+        log.info(
+            f"Transaction with nonce(s) {nonces} posted to "
+            f"{transaction_queue(parent.address, family.chain)}"
+        )
+        return nonces
+    parent, children = family.as_safes(context.client)
+    batches = family_batches(
+        transaction_builder(command, argv), family, parent, children, context.client
+    )
+    if plan_out is not None:
+        plan = build_plan(str(command), family.chain, parent, batches, context.client)
+        plan.write(plan_out.with_stem(f"{plan_out.stem}{out_suffix}"))
+        return []
+    if schedule is not None:
+        return scheduled_exec(parent, batches, context.client, schedule, confirm)
+    nonces = batch_exec(
+        parent,
+        context.client,
+        signing_key=os.environ["PROPOSER_PK"],
+        batches=batches,
+        tx_service=context.tx_service,
+        confirm=confirm,
     )
     log.info(
-        f"Transaction with nonce(s) {nonces} posted to {transaction_queue(parent.address)}"
+        f"Transaction with nonce(s) {nonces} posted to "
+        f"{transaction_queue(parent.address, family.chain)}"
     )
+    log.info(
+        "once executed, per-child outcomes can be checked with "
+        "`python -m src.receipts --tx-hashes <hashes>` (same family arguments)"
+    )
+    return nonces
+
+
+def lanes_for(families: list[SafeFamily]) -> list[SafeFamily]:
+    """
+    Families processed in parallel lanes: where several parents are given on a chain,
+    children are sharded to the parent owning them.
+    """
+    lanes = []
+    for chain in dict.fromkeys(family.chain for family in families):
+        chain_families = [family for family in families if family.chain == chain]
+        if len(chain_families) == 1 or any(f.tree for f in chain_families):
+            # Trees are given per parent, so there is nothing to shard.
+            lanes += chain_families
+        else:
+            sharded, _ = shard_families(chain_context(chain).client, chain_families)
+            lanes += sharded
+    return lanes
+
+
+def lane_suffix(family: SafeFamily, lanes: list[SafeFamily]) -> str:
+    """Distinguishes per lane output files (when there are several lanes)"""
+    suffix = ""
+    if len({lane.chain for lane in lanes}) > 1:
+        suffix += f"_{family.chain}"
+    if len({lane.parent for lane in lanes}) > 1:
+        suffix += f"_{family.parent}"
+    return suffix
+
+
+def main() -> None:
+    """Script entry point"""
+    parser = argparse.ArgumentParser("Script Arguments")
+    parser.add_argument(
+        "--command",
+        type=ExecCommand,
+        choices=list(ExecCommand),
+        required=True,
+        help="Supported Airdrop Contract interactions",
+    )
+    add_yes_argument(parser)
+    parser.add_argument(
+        "--plan",
+        type=Path,
+        default=None,
+        help="Only write the encoded batches to this plan file (see src.plan to apply)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Overlap loading, encoding, signing and posting of batches",
+    )
+    add_schedule_arguments(parser)
+
+    families = SafeFamily.all_from_args(parser)
+    args, _ = parser.parse_known_args()
+    command: ExecCommand = args.command
+    if args.pipeline and args.plan is not None:
+        parser.error("--pipeline posts transactions and cannot be used with --plan")
+    if args.pipeline and any(family.tree for family in families):
+        parser.error("--pipeline does not support nested --tree families")
+    schedule = FeeSchedule.from_args(args)
+    if schedule is not None and (args.pipeline or args.plan is not None):
+        parser.error("--gas-ceiling cannot be used with --pipeline or --plan")
+    lanes = lanes_for(families)
+    # Each (chain, parent) lane has its own nonce, so lanes are processed concurrently.
+    results = run_lanes(
+        lambda family: run_family(
+            command,
+            family,
+            lane_suffix(family, lanes),
+            confirm=not args.yes,
+            plan_out=args.plan,
+            pipeline=args.pipeline,
+            schedule=schedule,
+        ),
+        lanes,
+    )
+    if len(results) > 1:
+        print(format_lane_report(results))
+    if any(result.status != "OK" for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
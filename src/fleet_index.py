@@ -0,0 +1,485 @@
+"""
+Persistent (SQLite) index of Safe fleets.
+Stores the parent -> children edges of each chain along with the owners, threshold,
+version and last seen block of every child, so that families are read from disk
+instead of being re-discovered (via Dune or RPC scans) on every run.
+Ownership is kept current by replaying AddedOwner, RemovedOwner and
+ChangedThreshold logs since the last synced block, and Safes that an indexed parent
+became an owner of since then (AddedOwner or SafeSetup logs of any contract)
+are added to its family:
+
+    python -m src.fleet_index --db fleet.db add --parent P [--sub-safes ...]
+    python -m src.fleet_index --db fleet.db update
+    python -m src.fleet_index --db fleet.db children --parent P --sole-owner
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+
+from eth_abi.abi import decode
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.chains import Chain
+from src.event_logs import as_int, fetch_logs
+from src.log import set_log
+from src.util import to_checksum_address, to_checksum_addresses
+
+log = set_log(__name__)
+
+ADDED_OWNER_TOPIC = Web3.keccak(text="AddedOwner(address)")
+REMOVED_OWNER_TOPIC = Web3.keccak(text="RemovedOwner(address)")
+CHANGED_THRESHOLD_TOPIC = Web3.keccak(text="ChangedThreshold(uint256)")
+SAFE_SETUP_TOPIC = Web3.keccak(
+    text="SafeSetup(address,address[],uint256,address,address)"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS edges (
+    chain INTEGER NOT NULL,
+    parent TEXT NOT NULL,
+    child TEXT NOT NULL,
+    PRIMARY KEY (chain, parent, child)
+);
+CREATE TABLE IF NOT EXISTS safes (
+    chain INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    threshold INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    last_block INTEGER NOT NULL,
+    PRIMARY KEY (chain, address)
+);
+CREATE TABLE IF NOT EXISTS owners (
+    chain INTEGER NOT NULL,
+    safe TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    PRIMARY KEY (chain, safe, owner)
+);
+CREATE INDEX IF NOT EXISTS owners_by_owner ON owners (chain, owner);
+CREATE TABLE IF NOT EXISTS sync (
+    chain INTEGER PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class SafeState:
+    """Ownership state of a Safe as of some block"""
+
+    address: ChecksumAddress
+    owners: list[ChecksumAddress]
+    threshold: int
+    version: str
+
+
+@dataclass
+class OwnerEvent:
+    """Decoded AddedOwner, RemovedOwner or ChangedThreshold log of a Safe"""
+
+    safe: ChecksumAddress
+    block: int
+    topic: HexBytes
+    # New/removed owner or new threshold
+    value: ChecksumAddress | int
+
+
+def decode_owner_event(entry: Mapping[str, Any]) -> Optional[OwnerEvent]:
+    """
+    Decodes a raw log (None for other events).
+    Owners are indexed since Safe v1.4.0 and part of the data before.
+    """
+    topics = [HexBytes(topic) for topic in entry["topics"]]
+    if not topics:
+        return None
+    payload = topics[1] if len(topics) > 1 else HexBytes(entry["data"])[:32]
+    value: ChecksumAddress | int
+    if topics[0] in (ADDED_OWNER_TOPIC, REMOVED_OWNER_TOPIC):
+        value = to_checksum_address(payload[-20:].hex())
+    elif topics[0] == CHANGED_THRESHOLD_TOPIC:
+        value = int.from_bytes(payload, "big")
+    else:
+        return None
+    return OwnerEvent(
+        safe=to_checksum_address(str(entry["address"])),
+        block=as_int(entry["blockNumber"]),
+        topic=topics[0],
+        value=value,
+    )
+
+
+def discover_children(
+    entries: Iterable[Mapping[str, Any]], parents: Iterable[ChecksumAddress]
+) -> dict[ChecksumAddress, list[ChecksumAddress]]:
+    """
+    Safes (emitting the AddedOwner or SafeSetup logs `entries`) that any of
+    `parents` became an owner of, per parent.
+    """
+    found: dict[ChecksumAddress, list[ChecksumAddress]] = {p: [] for p in parents}
+    for entry in entries:
+        topics = [HexBytes(topic) for topic in entry["topics"]]
+        safe = to_checksum_address(str(entry["address"]))
+        owners: list[ChecksumAddress] = []
+        if topics and topics[0] == SAFE_SETUP_TOPIC:
+            setup_owners, *_ = decode(
+                ["address[]", "uint256", "address", "address"], HexBytes(entry["data"])
+            )
+            owners = to_checksum_addresses(setup_owners)
+        else:
+            event = decode_owner_event(entry)
+            if event is not None and event.topic == ADDED_OWNER_TOPIC:
+                owners = [to_checksum_address(str(event.value))]
+        for owner in owners:
+            if owner in found and safe not in found[owner]:
+                found[owner].append(safe)
+    return found
+
+
+class FleetIndex:
+    """SQLite backed fleet index (use as a context manager to commit on exit)"""
+
+    def __init__(self, path: Path | str):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> FleetIndex:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if exc[0] is None:
+            self.connection.commit()
+        self.connection.close()
+
+    def add_edges(
+        self, chain: Chain, parent: ChecksumAddress, children: Iterable[str]
+    ) -> None:
+        """Records `children` as members of the family of `parent`"""
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO edges VALUES (?, ?, ?)",
+            [(chain.value, parent, child) for child in children],
+        )
+
+    def record_states(self, chain: Chain, states: list[SafeState], block: int) -> None:
+        """Replaces the stored state of each Safe by its state as of `block`"""
+        for state in states:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO safes VALUES (?, ?, ?, ?, ?)",
+                (chain.value, state.address, state.threshold, state.version, block),
+            )
+            self.connection.execute(
+                "DELETE FROM owners WHERE chain = ? AND safe = ?",
+                (chain.value, state.address),
+            )
+            self.connection.executemany(
+                "INSERT INTO owners VALUES (?, ?, ?)",
+                [(chain.value, state.address, owner) for owner in state.owners],
+            )
+        if self.synced_block(chain) is None:
+            self.set_synced_block(chain, block)
+
+    def apply_events(self, chain: Chain, events: list[OwnerEvent]) -> int:
+        """
+        Applies events (in order) to indexed Safes, skipping those already reflected
+        in a Safe's state (at or before its last seen block). Returns the number applied.
+        """
+        last_blocks = dict(
+            self.connection.execute(
+                "SELECT address, last_block FROM safes WHERE chain = ?", (chain.value,)
+            ).fetchall()
+        )
+        applied = 0
+        for event in events:
+            if event.block <= last_blocks.get(event.safe, event.block):
+                continue
+            key = (chain.value, event.safe)
+            if event.topic == ADDED_OWNER_TOPIC:
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO owners VALUES (?, ?, ?)",
+                    key + (event.value,),
+                )
+            elif event.topic == REMOVED_OWNER_TOPIC:
+                self.connection.execute(
+                    "DELETE FROM owners WHERE chain = ? AND safe = ? AND owner = ?",
+                    key + (event.value,),
+                )
+            else:
+                self.connection.execute(
+                    "UPDATE safes SET threshold = ? WHERE chain = ? AND address = ?",
+                    (event.value,) + key,
+                )
+            self.connection.execute(
+                "UPDATE safes SET last_block = ? WHERE chain = ? AND address = ?",
+                (event.block,) + key,
+            )
+            applied += 1
+        return applied
+
+    def synced_block(self, chain: Chain) -> Optional[int]:
+        """Block up to which owner logs of `chain` were applied"""
+        row = self.connection.execute(
+            "SELECT block FROM sync WHERE chain = ?", (chain.value,)
+        ).fetchone()
+        return None if row is None else int(row[0])
+
+    def set_synced_block(self, chain: Chain, block: int) -> None:
+        """Marks owner logs of `chain` as applied up to `block`"""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO sync VALUES (?, ?)", (chain.value, block)
+        )
+
+    def parents(self, chain: Chain) -> list[ChecksumAddress]:
+        """All parents with indexed families on `chain`"""
+        rows = self.connection.execute(
+            "SELECT DISTINCT parent FROM edges WHERE chain = ? "
+            "ORDER BY parent COLLATE NOCASE",
+            (chain.value,),
+        )
+        return to_checksum_addresses(row[0] for row in rows)
+
+    def safes(self, chain: Chain) -> list[ChecksumAddress]:
+        """All indexed Safes of `chain`"""
+        rows = self.connection.execute(
+            "SELECT address FROM safes WHERE chain = ? "
+            "ORDER BY address COLLATE NOCASE",
+            (chain.value,),
+        )
+        return to_checksum_addresses(row[0] for row in rows)
+
+    def state(self, chain: Chain, address: ChecksumAddress) -> Optional[SafeState]:
+        """Stored state of the Safe at `address` (None if not indexed)"""
+        row = self.connection.execute(
+            "SELECT threshold, version FROM safes WHERE chain = ? AND address = ?",
+            (chain.value, address),
+        ).fetchone()
+        if row is None:
+            return None
+        owners = self.connection.execute(
+            "SELECT owner FROM owners WHERE chain = ? AND safe = ? "
+            "ORDER BY owner COLLATE NOCASE",
+            (chain.value, address),
+        )
+        return SafeState(
+            address=address,
+            owners=to_checksum_addresses(owner for (owner,) in owners),
+            threshold=int(row[0]),
+            version=str(row[1]),
+        )
+
+    def children(
+        self,
+        chain: Chain,
+        parent: ChecksumAddress,
+        threshold: Optional[int] = None,
+        sole_owner: bool = False,
+    ) -> list[ChecksumAddress]:
+        """
+        Children of `parent` (sorted) that it currently owns, optionally only those
+        with `threshold` and/or those owned by `parent` alone. Edges of children the
+        parent was removed from are kept (they return once it is added again).
+        """
+        query = (
+            "SELECT e.child FROM edges e JOIN safes s "
+            "ON s.chain = e.chain AND s.address = e.child "
+            "WHERE e.chain = ? AND e.parent = ? AND EXISTS (SELECT 1 FROM owners o "
+            "WHERE o.chain = e.chain AND o.safe = e.child AND o.owner = e.parent)"
+        )
+        params: list[Any] = [chain.value, parent]
+        if threshold is not None:
+            query += " AND s.threshold = ?"
+            params.append(threshold)
+        if sole_owner:
+            query += (
+                " AND (SELECT group_concat(o.owner) FROM owners o"
+                " WHERE o.chain = e.chain AND o.safe = e.child) = e.parent"
+            )
+        query += " ORDER BY e.child COLLATE NOCASE"
+        rows = self.connection.execute(query, params)
+        return to_checksum_addresses(row[0] for row in rows)
+
+    def owned_by(self, chain: Chain, owner: ChecksumAddress) -> list[ChecksumAddress]:
+        """Indexed Safes having `owner` among their owners (sorted)"""
+        rows = self.connection.execute(
+            "SELECT safe FROM owners WHERE chain = ? AND owner = ? "
+            "ORDER BY safe COLLATE NOCASE",
+            (chain.value, owner),
+        )
+        return to_checksum_addresses(row[0] for row in rows)
+
+
+def read_safe_states(
+    client: EthereumClient, addresses: list[ChecksumAddress]
+) -> list[SafeState]:
+    """Reads owners, threshold and version of all `addresses` in batched calls"""
+    safe_functions = get_safe_V1_3_0_contract(client.w3).functions
+    columns: list[list[Any]] = [
+        client.batch_call_same_function(function, addresses, raise_exception=False)
+        for function in (
+            safe_functions.getOwners(),
+            safe_functions.getThreshold(),
+            safe_functions.VERSION(),
+        )
+    ]
+    owners, thresholds, versions = columns
+    states = []
+    for address, safe_owners, threshold, version in zip(
+        addresses, owners, thresholds, versions
+    ):
+        if safe_owners is None or threshold is None:
+            log.warning(f"could not read owners of {address} (not a Safe?) - skipping")
+            continue
+        states.append(
+            SafeState(
+                address=address,
+                owners=to_checksum_addresses(safe_owners),
+                threshold=int(threshold),
+                version=str(version),
+            )
+        )
+    return states
+
+
+def add_family(
+    index: FleetIndex,
+    client: EthereumClient,
+    chain: Chain,
+    parent: ChecksumAddress,
+    children: list[ChecksumAddress],
+) -> None:
+    """Indexes `children` under `parent` along with their current state"""
+    block = client.current_block_number
+    index.add_edges(chain, parent, children)
+    index.record_states(chain, read_safe_states(client, children), block)
+    log.info(f"indexed {len(children)} children of {parent} on {chain} at {block}")
+
+
+def add_discovered(
+    index: FleetIndex,
+    client: EthereumClient,
+    chain: Chain,
+    found: dict[ChecksumAddress, list[ChecksumAddress]],
+    block: int,
+) -> int:
+    """
+    Indexes the `found` children of each parent (still owned by it and not yet in
+    its family) with their current state. Returns the number of new edges.
+    """
+    added = 0
+    for parent, candidates in found.items():
+        known = set(index.children(chain, parent))
+        new = [child for child in candidates if child not in known]
+        if not new:
+            continue
+        states = [s for s in read_safe_states(client, new) if parent in s.owners]
+        index.add_edges(chain, parent, [state.address for state in states])
+        index.record_states(chain, states, block)
+        added += len(states)
+        log.info(f"discovered {len(states)} new children of {parent} on {chain}")
+    return added
+
+
+def update_index(
+    index: FleetIndex,
+    client: EthereumClient,
+    chain: Chain,
+    to_block: Optional[int] = None,
+) -> int:
+    """
+    Adds Safes the indexed parents became owners of and applies owner logs of all
+    indexed Safes since the last sync. Returns the number of applied events.
+    """
+    from_block = index.synced_block(chain)
+    if from_block is None:
+        log.info(f"nothing indexed on {chain} yet")
+        return 0
+    if to_block is None:
+        to_block = client.current_block_number
+    if to_block <= from_block:
+        return 0
+    # Owners are not indexed before Safe v1.4.0 (nor in SafeSetup): scan all contracts.
+    setups = fetch_logs(
+        client, None, [ADDED_OWNER_TOPIC, SAFE_SETUP_TOPIC], from_block + 1, to_block
+    )
+    found = discover_children(setups, index.parents(chain))
+    # New children are recorded as of to_block, so their logs below are skipped.
+    add_discovered(index, client, chain, found, to_block)
+    logs = fetch_logs(
+        client,
+        index.safes(chain),
+        [ADDED_OWNER_TOPIC, REMOVED_OWNER_TOPIC, CHANGED_THRESHOLD_TOPIC],
+        from_block + 1,
+        to_block,
+    )
+    events = [e for e in map(decode_owner_event, logs) if e is not None]
+    applied = index.apply_events(chain, events)
+    index.set_synced_block(chain, to_block)
+    log.info(f"applied {applied} owner events on {chain} up to block {to_block}")
+    return applied
+
+
+def main() -> None:
+    """Builds, updates and queries a fleet index"""
+    # pylint:disable=import-outside-toplevel
+    from src.dune import fetch_child_safes
+    from src.environment import chain_context
+
+    parser = argparse.ArgumentParser("Fleet Index")
+    parser.add_argument("--db", type=Path, required=True, help="SQLite index file")
+    parser.add_argument(
+        "--chain", type=Chain.from_str, default=Chain.ETHEREUM, help="Indexed chain"
+    )
+    actions = parser.add_subparsers(dest="action", required=True)
+    add = actions.add_parser("add", help="Indexes the children of a parent")
+    add.add_argument("--parent", type=str, required=True)
+    add.add_argument(
+        "--sub-safes",
+        type=str,
+        default=None,
+        help="Comma separated children (fetched from Dune if omitted)",
+    )
+    add.add_argument("--num-safes", type=int, default=1000)
+    actions.add_parser(
+        "update", help="Applies owner logs and adds new children since the last update"
+    )
+    query = actions.add_parser("children", help="Lists the children of a parent")
+    query.add_argument("--parent", type=str, required=True)
+    query.add_argument("--threshold", type=int, default=None)
+    query.add_argument(
+        "--sole-owner", action="store_true", help="Only children owned by parent alone"
+    )
+    args = parser.parse_args()
+    with FleetIndex(args.db) as index:
+        if args.action == "children":
+            print(
+                "\n".join(
+                    index.children(
+                        args.chain,
+                        to_checksum_address(args.parent),
+                        args.threshold,
+                        args.sole_owner,
+                    )
+                )
+            )
+            return
+        client = chain_context(args.chain).client
+        if args.action == "add":
+            parent = to_checksum_address(args.parent)
+            if args.sub_safes is not None:
+                children = to_checksum_addresses(args.sub_safes.split(","))
+            else:
+                children = fetch_child_safes(
+                    parent, 0, args.num_safes, args.chain.dune_name
+                )
+            add_family(index, client, args.chain, parent, children)
+        else:
+            update_index(index, client, args.chain)
+
+
+if __name__ == "__main__":
+    main()
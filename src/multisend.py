@@ -3,16 +3,20 @@ All the tools necessary to compose and encode a
 Safe Multisend transaction consisting of Transfers
 """
 import logging.config
-import sys
+import threading
 from typing import Optional
 
+from eth_abi.abi import encode
 from eth_typing.encoding import HexStr
 from gnosis.eth.ethereum_client import EthereumClient
 from gnosis.safe import Safe, SafeTx, SafeOperation
 from gnosis.safe.api import TransactionServiceApi
 from gnosis.safe.api.base_api import SafeAPIException
 from gnosis.safe.multi_send import MultiSend, MultiSendTx, MultiSendOperation
+from hexbytes import HexBytes
 
+from src.child_safe import ChildSafe
+from src.eip712 import HashedSafeTx, hasher_for
 from src.util import partition_array
 
 log = logging.getLogger(__name__)
@@ -21,6 +25,15 @@ MULTISEND_CONTRACT = "0x40A2aCCbd92BCA938b02010E17A5b8929b49130D"
 # See benchmarks:
 # https://github.com/bh2smith/subsafe-commander/issues/4#issuecomment-1297738947
 BATCH_SIZE_LIMIT = 80
+MULTISEND_SELECTOR = bytes.fromhex("8d80ff0a")
+# Serializes confirmation prompts when several families are posted concurrently.
+CONFIRM_LOCK = threading.Lock()
+# Set once posting was declined: no further transactions are posted by any lane.
+DECLINED = threading.Event()
+
+
+class PostingDeclined(SystemExit):
+    """Posting was declined at the confirmation prompt (exits the script)"""
 
 
 def build_encoded_multisend(
@@ -31,17 +44,37 @@ def build_encoded_multisend(
     return MultiSend(ethereum_client=client).build_tx_data(transactions)
 
 
-def post_safe_tx(safe_tx: SafeTx, tx_service: TransactionServiceApi) -> int:
+def multisend_calldata(packed: bytes) -> bytes:
+    """Call data of MultiSend.multiSend(packed) (encoded without any network access)"""
+    return MULTISEND_SELECTOR + encode(["bytes"], [packed])
+
+
+def confirm_or_decline(message: str, confirm: bool = True) -> None:
+    """
+    Prints `message` and (if `confirm`) asks for interactive confirmation.
+    Raises PostingDeclined when this (or any earlier) confirmation was declined.
+    """
+    with CONFIRM_LOCK:
+        if DECLINED.is_set():
+            raise PostingDeclined()
+        print(message)
+        if confirm and input("are you sure? (y/n) ") != "y":
+            DECLINED.set()
+            raise PostingDeclined()
+
+
+def post_safe_tx(
+    safe_tx: SafeTx, tx_service: TransactionServiceApi, confirm: bool = True
+) -> int:
     """
-    Posts a Signed Safe Transaction.
+    Posts a Signed Safe Transaction (after interactive confirmation if `confirm`).
     On success: Returns an integer representing resulting parent safe transaction nonce
     On Safe Transaction Service Error: Returns -1
+    Raises PostingDeclined when this (or any earlier) confirmation was declined.
     """
     assert safe_tx.signatures != b"", "Attempt to post unsigned transaction!"
     address, tx_hash = safe_tx.safe_address, safe_tx.safe_tx_hash.hex()
-    print(f"posting transaction with hash {tx_hash} to {address}")
-    if input("are you sure? (y/n) ") != "y":
-        sys.exit()
+    confirm_or_decline(f"posting transaction with hash {tx_hash} to {address}", confirm)
     try:
         tx_service.post_transaction(safe_tx)
         return int(safe_tx.safe_nonce)
@@ -72,14 +105,28 @@ def build_and_sign_multisend(
     encoded_multisend = build_encoded_multisend(
         transactions=transactions, client=client
     )
+    return sign_multisend_data(safe, encoded_multisend, signing_key, nonce)
+
+
+def sign_multisend_data(
+    safe: Safe,
+    encoded_multisend: bytes | str,
+    signing_key: str,
+    nonce: Optional[int] = None,
+) -> SafeTx:
+    """Constructs and Signs the Safe Transaction delegate-calling MultiSend with `data`"""
     # This is a weird type issue.
     assert isinstance(SafeOperation.DELEGATE_CALL.value, int)
-    safe_tx = safe.build_multisig_tx(
+    if nonce is None:
+        nonce = safe.retrieve_nonce()
+    safe_tx = HashedSafeTx(
+        hasher_for(safe),
         to=MULTISEND_CONTRACT,
         value=0,
-        data=encoded_multisend,
+        data=HexBytes(encoded_multisend),
         operation=SafeOperation.DELEGATE_CALL.value,
-        safe_nonce=nonce,
+        nonce=nonce,
+        client=safe.ethereum_client,
     )
     # There is a deep warning being raised here:
     # Details in issue: https://github.com/safe-global/safe-eth-py/issues/294
@@ -103,14 +150,31 @@ def partitioned_build_multisend(
         log.info("building an executing a single multi-exec transaction")
     else:
         log.info(f"partitioned {len(transactions)} into {len(partition)} batches")
-    nonce = safe.retrieve_nonce()
+    return build_and_sign_batches(safe, partition, client, signing_key)
+
+
+def build_and_sign_batches(
+    safe: Safe,
+    batches: list[list[MultiSendTx]],
+    client: EthereumClient,
+    signing_key: str,
+    nonce: Optional[int] = None,
+) -> list[SafeTx]:
+    """
+    Builds one MultiSend transaction per batch with appropriate nonce
+    beginning from `nonce` (by default the current nonce of `safe`).
+    """
+    if nonce is None:
+        nonce = safe.retrieve_nonce()
     return [
         build_and_sign_multisend(safe, part, client, signing_key, nonce + i)
-        for i, part in enumerate(partition)
+        for i, part in enumerate(batches)
     ]
 
 
-def build_multisend_from_data(safe: Safe, data: HexStr, value: int = 0) -> MultiSendTx:
+def build_multisend_from_data(
+    safe: Safe | ChildSafe, data: HexStr, value: int = 0
+) -> MultiSendTx:
     """Constructs a MultiSend Transaction for Safe with provided Data"""
     return MultiSendTx(
         to=safe.address,
@@ -0,0 +1,161 @@
+"""
+Pipelined execution of a family.
+Loading children, encoding their transactions, signing MultiSend batches and posting
+them are stages connected by bounded queues (each stage running its blocking web3
+calls in a worker thread), so encoding of the first children starts while later ones
+are still being loaded and posting of the first batch overlaps signing of later ones.
+Children are loaded and encoded in chunks, keeping the batched reads of the loader and
+of each command's builder. Batches and nonces are identical to those of the sequential
+`multi_exec`.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe, SafeTx
+from gnosis.safe.api import TransactionServiceApi
+from gnosis.safe.multi_send import MultiSendTx
+
+from src.child_safe import ChildSafe
+from src.log import set_log
+from src.multisend import BATCH_SIZE_LIMIT, build_and_sign_multisend, post_safe_tx
+from src.safe import load_children
+from src.util import partition_array
+
+log = set_log(__name__)
+
+# Marks the end of a stage's output.
+_DONE = None
+
+
+@dataclass
+class PipelineStages:
+    """Blocking per item work of each stage"""
+
+    load: Callable[[list[ChecksumAddress]], list[ChildSafe]]
+    build: Callable[[list[ChildSafe]], list[MultiSendTx]]
+    sign: Callable[[list[MultiSendTx], int], SafeTx]
+    post: Callable[[SafeTx], int]
+
+
+async def _load(
+    chunks: list[list[ChecksumAddress]],
+    stages: PipelineStages,
+    out: asyncio.Queue[Any],
+    concurrency: int,
+) -> None:
+    """Loads up to `concurrency` chunks of children at once, emitting them in order"""
+    pending: deque[asyncio.Future[list[ChildSafe]]] = deque()
+    for chunk in chunks:
+        if len(pending) >= concurrency:
+            await out.put(await pending.popleft())
+        pending.append(asyncio.ensure_future(asyncio.to_thread(stages.load, chunk)))
+    while pending:
+        await out.put(await pending.popleft())
+    await out.put(_DONE)
+
+
+async def _build(
+    stages: PipelineStages,
+    source: asyncio.Queue[Any],
+    out: asyncio.Queue[Any],
+    batch_size: int,
+) -> None:
+    """Encodes the transactions of each chunk of children, emitting full batches"""
+    batch: list[MultiSendTx] = []
+    while (chunk := await source.get()) is not _DONE:
+        batch += await asyncio.to_thread(stages.build, chunk)
+        while len(batch) >= batch_size:
+            await out.put(batch[:batch_size])
+            batch = batch[batch_size:]
+    if batch:
+        await out.put(batch)
+    await out.put(_DONE)
+
+
+async def _sign(
+    stages: PipelineStages,
+    source: asyncio.Queue[Any],
+    out: asyncio.Queue[Any],
+    nonce: int,
+) -> None:
+    """Signs batches with consecutive nonces"""
+    while (batch := await source.get()) is not _DONE:
+        await out.put(await asyncio.to_thread(stages.sign, batch, nonce))
+        nonce += 1
+    await out.put(_DONE)
+
+
+async def _post(stages: PipelineStages, source: asyncio.Queue[Any]) -> list[int]:
+    """Posts signed batches in nonce order"""
+    nonces = []
+    while (safe_tx := await source.get()) is not _DONE:
+        nonces.append(await asyncio.to_thread(stages.post, safe_tx))
+    return nonces
+
+
+async def run_pipeline(  # pylint:disable=too-many-arguments
+    children: list[ChecksumAddress],
+    stages: PipelineStages,
+    nonce: int,
+    batch_size: int = BATCH_SIZE_LIMIT,
+    queue_size: int = 2,
+    load_concurrency: int = 2,
+    chunk_size: int = BATCH_SIZE_LIMIT,
+) -> list[int]:
+    """
+    Runs all stages concurrently for `children` (loaded and encoded in chunks of
+    `chunk_size`), the first batch being signed with `nonce`.
+    Returns the nonces of the posted transactions (-1 for failed posts).
+    """
+    chunks = partition_array(children, chunk_size)
+    loaded: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+    batches: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+    signed: asyncio.Queue[Any] = asyncio.Queue(maxsize=queue_size)
+    tasks = [
+        asyncio.create_task(_load(chunks, stages, loaded, load_concurrency)),
+        asyncio.create_task(_build(stages, loaded, batches, batch_size)),
+        asyncio.create_task(_sign(stages, batches, signed, nonce)),
+    ]
+    posting = asyncio.create_task(_post(stages, signed))
+    try:
+        await asyncio.gather(*tasks, posting)
+    except BaseException:
+        # A failing stage would leave the others blocked on their queues.
+        for task in tasks + [posting]:
+            task.cancel()
+        raise
+    return posting.result()
+
+
+def pipelined_exec(  # pylint:disable=too-many-arguments
+    parent: Safe,
+    children: list[ChecksumAddress],
+    client: EthereumClient,
+    build: Callable[[Safe, list[ChildSafe]], list[MultiSendTx]],
+    signing_key: str,
+    tx_service: Optional[TransactionServiceApi] = None,
+    confirm: bool = True,
+) -> list[int]:
+    """
+    Pipelined equivalent of `multi_exec` where `build` encodes the transactions
+    of (parent, children) and children are only given by address.
+    """
+    if tx_service is None:
+        tx_service = TransactionServiceApi(client.get_network())
+    service = tx_service
+    stages = PipelineStages(
+        load=lambda chunk: load_children(chunk, parent, client),
+        build=lambda chunk: build(parent, chunk),
+        sign=lambda batch, nonce: build_and_sign_multisend(
+            parent, batch, client, signing_key, nonce
+        ),
+        post=lambda safe_tx: post_safe_tx(safe_tx, service, confirm=confirm),
+    )
+    log.info(f"pipelining {len(children)} children of {parent.address}")
+    return asyncio.run(run_pipeline(children, stages, parent.retrieve_nonce()))
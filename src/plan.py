@@ -0,0 +1,238 @@
+"""
+Plan/apply split of batch execution.
+A plan is a reviewable JSON artifact holding the partitioned and encoded MultiSend
+payloads of a family along with their intended parent nonces and Safe transaction hashes.
+Applying a plan only signs and posts (skipping batches whose nonce was already used),
+so it can be re-applied after partial failures without redoing any preparation.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe, SafeOperation, SafeTx
+from gnosis.safe.api import TransactionServiceApi
+from gnosis.safe.multi_send import MultiSendTx
+from hexbytes import HexBytes
+
+from src.chains import Chain
+from src.eip712 import HashedSafeTx, SafeTxHasher
+from src.log import set_log
+from src.multisend import (
+    MULTISEND_CONTRACT,
+    build_encoded_multisend,
+    post_safe_tx,
+)
+from src.safe import add_yes_argument
+from src.signer import add_signature, read_signatures, run_signer, signing_requests
+
+log = set_log(__name__)
+
+PLAN_VERSION = 1
+
+
+@dataclass
+class PlannedBatch:
+    """Encoded MultiSend batch to be executed by the parent at `nonce`"""
+
+    nonce: int
+    data: HexStr
+    safe_tx_hash: HexStr
+    transactions: int
+
+
+@dataclass
+class Plan:
+    """All batches of one (command, chain, parent) run"""
+
+    command: str
+    chain: Chain
+    safe: ChecksumAddress
+    safe_version: str
+    batches: list[PlannedBatch] = field(default_factory=list)
+    version: int = PLAN_VERSION
+
+    def safe_tx(self, batch: PlannedBatch, client: Optional[EthereumClient]) -> SafeTx:
+        """Unsigned Safe transaction of `batch` (built without any network access)"""
+        # This is a weird type issue.
+        assert isinstance(SafeOperation.DELEGATE_CALL.value, int)
+        return HashedSafeTx(
+            self.hasher,
+            to=MULTISEND_CONTRACT,
+            value=0,
+            data=HexBytes(batch.data),
+            operation=SafeOperation.DELEGATE_CALL.value,
+            nonce=batch.nonce,
+            client=client,
+        )
+
+    @property
+    def hasher(self) -> SafeTxHasher:
+        """EIP-712 hasher of the parent's Safe transactions"""
+        return SafeTxHasher(self.chain.value, self.safe, self.safe_version)
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON compatible content (without digest)"""
+        content = asdict(self)
+        content["chain"] = str(self.chain)
+        return content
+
+    @property
+    def digest(self) -> str:
+        """sha256 of the canonical JSON content"""
+        canonical = json.dumps(self.to_dict(), sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @classmethod
+    def from_dict(cls, content: dict[str, Any]) -> Plan:
+        """Inverse of `to_dict`"""
+        if content.get("version") != PLAN_VERSION:
+            raise ValueError(f"unsupported plan version {content.get('version')}")
+        return cls(
+            command=content["command"],
+            chain=Chain.from_str(content["chain"]),
+            safe=content["safe"],
+            safe_version=content["safe_version"],
+            batches=[PlannedBatch(**batch) for batch in content["batches"]],
+        )
+
+    def write(self, path: Path) -> None:
+        """Writes plan (along with its digest) as JSON"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(dict(self.to_dict(), digest=self.digest), file, indent=2)
+        log.info(f"wrote plan of {len(self.batches)} batches to {path} ({self.digest})")
+
+    @classmethod
+    def read(cls, path: Path) -> Plan:
+        """Reads plan from JSON, rejecting artifacts modified after planning"""
+        with open(path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+        digest = content.pop("digest", None)
+        plan = cls.from_dict(content)
+        if digest != plan.digest:
+            raise ValueError(f"plan {path} digest mismatch (modified after planning?)")
+        return plan
+
+
+def build_plan(
+    command: str,
+    chain: Chain,
+    parent: Safe,
+    batches: list[list[MultiSendTx]],
+    client: EthereumClient,
+) -> Plan:
+    """Encodes the transaction `batches` with nonces from the parent's current nonce"""
+    nonce = parent.retrieve_nonce()
+    plan = Plan(
+        command=command,
+        chain=chain,
+        safe=parent.address,
+        safe_version=parent.retrieve_version(),
+    )
+    datas = [build_encoded_multisend(part, client) for part in batches]
+    # This is a weird type issue.
+    assert isinstance(SafeOperation.DELEGATE_CALL.value, int)
+    hashes = plan.hasher.hash_many(
+        (MULTISEND_CONTRACT, 0, data, SafeOperation.DELEGATE_CALL.value, nonce + i)
+        for i, data in enumerate(datas)
+    )
+    for i, (part, data, safe_tx_hash) in enumerate(zip(batches, datas, hashes)):
+        plan.batches.append(
+            PlannedBatch(
+                nonce=nonce + i,
+                data=HexStr(HexBytes(data).hex()),
+                safe_tx_hash=HexStr(HexBytes(safe_tx_hash).hex()),
+                transactions=len(part),
+            )
+        )
+    return plan
+
+
+def apply_plan(  # pylint:disable=too-many-arguments
+    plan: Plan,
+    client: EthereumClient,
+    tx_service: TransactionServiceApi,
+    signing_key: Optional[str] = None,
+    confirm: bool = True,
+    signatures: Optional[dict[HexStr, HexStr]] = None,
+) -> list[int]:
+    """
+    Signs (with `signing_key`, or using externally made `signatures` by safe_tx_hash)
+    and posts the batches of `plan` whose nonce is not yet used by the parent.
+    Returns the nonces of the posted transactions (-1 for failed posts).
+    """
+    if (signing_key is None) == (signatures is None):
+        raise ValueError("exactly one of signing_key or signatures is required")
+    current_nonce = Safe(plan.safe, client).retrieve_nonce()
+    nonces = []
+    for batch in plan.batches:
+        if batch.nonce < current_nonce:
+            log.info(f"skipping batch with nonce {batch.nonce} (already executed)")
+            continue
+        safe_tx = plan.safe_tx(batch, client)
+        if safe_tx.safe_tx_hash.hex() != batch.safe_tx_hash:
+            raise ValueError(f"batch {batch.nonce} does not match its safe_tx_hash")
+        if signatures is not None:
+            if batch.safe_tx_hash not in signatures:
+                raise ValueError(f"no signature for batch with nonce {batch.nonce}")
+            add_signature(safe_tx, HexBytes(signatures[batch.safe_tx_hash]))
+        else:
+            assert signing_key is not None
+            safe_tx.sign(signing_key)
+        nonces.append(post_safe_tx(safe_tx, tx_service, confirm=confirm))
+    return nonces
+
+
+def main() -> None:
+    """Applies a plan written by `exec --plan`"""
+    # pylint:disable=import-outside-toplevel
+    from src.environment import chain_context
+
+    parser = argparse.ArgumentParser("Apply Plan Arguments")
+    parser.add_argument(
+        "--plan", type=Path, required=True, help="Plan written by exec --plan"
+    )
+    add_yes_argument(parser)
+    parser.add_argument(
+        "--signatures",
+        type=Path,
+        default=None,
+        help="Signatures made by `python -m src.signer sign` (instead of PROPOSER_PK)",
+    )
+    parser.add_argument(
+        "--signer-command",
+        type=str,
+        default=None,
+        help="External signing command (JSON requests via stdin, signatures to stdout)",
+    )
+    args, _ = parser.parse_known_args()
+    loaded_plan = Plan.read(args.plan)
+    external_signatures = None
+    if args.signatures is not None:
+        external_signatures = read_signatures(args.signatures)
+    elif args.signer_command is not None:
+        external_signatures = run_signer(
+            args.signer_command, signing_requests(loaded_plan)
+        )
+    context = chain_context(loaded_plan.chain)
+    posted = apply_plan(
+        loaded_plan,
+        context.client,
+        context.tx_service,
+        signing_key=os.environ["PROPOSER_PK"] if external_signatures is None else None,
+        confirm=not args.yes,
+        signatures=external_signatures,
+    )
+    log.info(f"{loaded_plan.command} plan applied with nonce(s) {posted}")
+
+
+if __name__ == "__main__":
+    main()
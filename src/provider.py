@@ -0,0 +1,278 @@
+"""
+RPC endpoint pool spreading requests over several node urls.
+- requests are load balanced (round-robin) over all healthy endpoints,
+- each endpoint is rate limited to a configured number of requests per second,
+- failing or rate limited endpoints are put on a cool-down and requests fail over to another,
+- identical concurrent eth_calls share a single request.
+The pool is a `requests` transport adapter mounted on the http session of an EthereumClient,
+so web3 calls as well as the client's JSON-RPC batch requests (arrays) all go through it.
+"""
+from __future__ import annotations
+
+import copy
+import itertools
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Iterable, Mapping, Optional
+
+import requests
+from eth_typing import URI
+from gnosis.eth import EthereumClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import HTTPProvider
+from web3.types import RPCEndpoint, RPCResponse
+
+from src.log import set_log
+
+log = set_log(__name__)
+
+# JSON-RPC error codes / HTTP status codes meaning "try again elsewhere".
+RETRYABLE_RPC_ERRORS = {-32005, -32029, 429}
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+BASE_COOL_DOWN = 1.0
+MAX_COOL_DOWN = 60.0
+
+
+class RateLimiter:  # pylint:disable=too-few-public-methods
+    """Spaces acquisitions at least 1 / `rate` seconds apart (rate <= 0 means unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until the next request slot"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+class Endpoint:
+    """Single node url with its own rate limiter and health state"""
+
+    def __init__(self, url: str, rate_limit: float):
+        self.url = url
+        self.limiter = RateLimiter(rate_limit)
+        self.failures = 0
+        self.cool_down_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """False while the endpoint is cooling down after a failure"""
+        return time.monotonic() >= self.cool_down_until
+
+    def mark_failure(self) -> None:
+        """Exponentially increasing cool-down for consecutive failures"""
+        self.failures += 1
+        cool_down = min(BASE_COOL_DOWN * 2 ** (self.failures - 1), MAX_COOL_DOWN)
+        self.cool_down_until = time.monotonic() + cool_down
+
+    def mark_success(self) -> None:
+        """Resets health state"""
+        self.failures = 0
+        self.cool_down_until = 0.0
+
+    def __str__(self) -> str:
+        return self.url
+
+
+def is_retryable(response: requests.Response) -> bool:
+    """Rate limits and server errors are worth retrying on another endpoint"""
+    if response.status_code in RETRYABLE_HTTP_STATUS:
+        return True
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return any(
+        isinstance(r, dict)
+        and isinstance(r.get("error"), dict)
+        and r["error"].get("code") in RETRYABLE_RPC_ERRORS
+        for r in (body if isinstance(body, list) else [body])
+    )
+
+
+def coalescing_key(body: Optional[bytes | str]) -> Optional[str]:
+    """Identifies single eth_call requests (ignoring the request id)"""
+    if body is None:
+        return None
+    try:
+        request = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(request, dict) or request.get("method") != "eth_call":
+        return None
+    return json.dumps(request.get("params"), sort_keys=True)
+
+
+def with_request_id(response: requests.Response, body: Any) -> requests.Response:
+    """Copy of a shared (coalesced) response carrying the id of the request in `body`"""
+    result = copy.copy(response)
+    content = response.json()
+    content["id"] = json.loads(body)["id"]
+    result._content = json.dumps(content).encode()  # pylint:disable=protected-access
+    return result
+
+
+class PooledAdapter(HTTPAdapter):
+    """Transport adapter sending each request to one of several node urls"""
+
+    def __init__(
+        self,
+        urls: Iterable[str],
+        rate_limit: float = 0,
+        max_attempts: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self.endpoints = [Endpoint(url, rate_limit) for url in urls]
+        if not self.endpoints:
+            raise ValueError("PooledAdapter requires at least one url")
+        self.max_attempts = max_attempts or 2 * len(self.endpoints)
+        self._round_robin = itertools.cycle(self.endpoints)
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future[requests.Response]] = {}
+
+    def __str__(self) -> str:
+        return f"PooledAdapter({', '.join(map(str, self.endpoints))})"
+
+    def next_endpoint(self) -> Endpoint:
+        """Next healthy endpoint (or the one recovering first if none is healthy)"""
+        with self._lock:
+            for _ in range(len(self.endpoints)):
+                endpoint = next(self._round_robin)
+                if endpoint.healthy:
+                    return endpoint
+            return min(self.endpoints, key=lambda e: e.cool_down_until)
+
+    def send(  # pylint:disable=too-many-arguments
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Any = None,
+        verify: bool | str = True,
+        cert: Any = None,
+        proxies: Optional[Mapping[str, str]] = None,
+    ) -> requests.Response:
+        kwargs = {
+            "stream": stream,
+            "timeout": timeout,
+            "verify": verify,
+            "cert": cert,
+            "proxies": proxies,
+        }
+        key = coalescing_key(request.body)
+        if key is None:
+            return self._send_with_failover(request, **kwargs)
+
+        with self._lock:
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                future: Future[requests.Response] = Future()
+                self._in_flight[key] = future
+        if in_flight is not None:
+            # Identical call is already being requested: share its response.
+            return with_request_id(in_flight.result(), request.body)
+        try:
+            response = self._send_with_failover(request, **kwargs)
+            # Read content now so that the response can be shared between threads.
+            _ = response.content
+            future.set_result(response)
+            return response
+        except BaseException as err:
+            future.set_exception(err)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _send_with_failover(
+        self, request: requests.PreparedRequest, **kwargs: Any
+    ) -> requests.Response:
+        last_error: Optional[Exception] = None
+        for _ in range(self.max_attempts):
+            endpoint = self.next_endpoint()
+            endpoint_request = request.copy()
+            endpoint_request.url = endpoint.url
+            endpoint.limiter.acquire()
+            try:
+                response = super().send(endpoint_request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                last_error = err
+            else:
+                if not is_retryable(response):
+                    endpoint.mark_success()
+                    return response
+                last_error = requests.HTTPError(
+                    f"{response.status_code}: {response.text[:200]}"
+                )
+            log.warning(f"rpc request to {endpoint} failed, failing over: {last_error}")
+            endpoint.mark_failure()
+        raise requests.ConnectionError(
+            f"rpc request failed on all endpoints after {self.max_attempts} attempts"
+        ) from last_error
+
+
+class SessionHTTPProvider(HTTPProvider):
+    """
+    HTTPProvider posting through one fixed session. web3 caches the session
+    handed to HTTPProvider only for the constructing thread, other threads
+    would get a fresh session without the pooled adapter mounted.
+    """
+
+    def __init__(self, session: requests.Session, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.session = session
+
+    def make_request(self, method: RPCEndpoint, params: Any) -> RPCResponse:
+        response = self.session.post(
+            str(self.endpoint_uri),
+            data=self.encode_rpc_request(method, params),
+            **self.get_request_kwargs(),  # pylint:disable=not-a-mapping
+        )
+        response.raise_for_status()
+        return self.decode_rpc_response(response.content)
+
+
+class PooledEthereumClient(EthereumClient):
+    """
+    EthereumClient whose http session routes all node traffic
+    (web3 provider and JSON-RPC batch requests) through a PooledAdapter
+    """
+
+    def __init__(self, adapter: PooledAdapter, **kwargs: Any):
+        self.adapter = adapter
+        super().__init__(URI(adapter.endpoints[0].url), **kwargs)
+        for w3, timeout in ((self.w3, self.timeout), (self.slow_w3, self.slow_timeout)):
+            w3.provider = SessionHTTPProvider(
+                self.http_session,
+                self.ethereum_node_url,
+                request_kwargs={"timeout": timeout},
+            )
+
+    def __str__(self) -> str:
+        return f"EthereumClient for {self.adapter}"
+
+    def _prepare_http_session(self, retry_count: int) -> requests.Session:
+        # Connection retries per endpoint (before failing over to the next one).
+        self.adapter.max_retries = Retry.from_int(retry_count)
+        session = requests.Session()
+        # Only node traffic (addressed to the primary url) is pooled.
+        session.mount(self.adapter.endpoints[0].url, self.adapter)
+        return session
+
+
+def pooled_client(
+    urls: list[str], rate_limit: float = 0, **kwargs: Any
+) -> EthereumClient:
+    """EthereumClient on the pool of `urls` each limited to `rate_limit` requests/second"""
+    return PooledEthereumClient(
+        PooledAdapter(urls, rate_limit=rate_limit, pool_maxsize=100), **kwargs
+    )
@@ -0,0 +1,184 @@
+"""
+Tracking of executed MultiSend batches.
+Each inner `execTransaction` call on a child Safe emits either
+ExecutionSuccess(bytes32 txHash, uint256 payment) or
+ExecutionFailure(bytes32 txHash, uint256 payment) from the child's address.
+This module fetches those logs (via transaction receipts or eth_getLogs)
+and reduces them to a per-child outcome table.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional
+
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.event_logs import as_int, fetch_logs
+from src.log import set_log
+from src.safe import SafeFamily
+
+log = set_log(__name__)
+
+EXECUTION_SUCCESS_TOPIC = Web3.keccak(text="ExecutionSuccess(bytes32,uint256)")
+EXECUTION_FAILURE_TOPIC = Web3.keccak(text="ExecutionFailure(bytes32,uint256)")
+
+
+@dataclass
+class ChildOutcome:
+    """Result of a single inner execTransaction on a child Safe"""
+
+    child: ChecksumAddress
+    success: bool
+    safe_tx_hash: str
+    tx_hash: str
+    block_number: int
+
+
+def decode_execution_logs(
+    logs: Iterable[Mapping[str, Any]], children: Iterable[str]
+) -> list[ChildOutcome]:
+    """
+    Filters ExecutionSuccess/ExecutionFailure logs emitted by `children`
+    and decodes them into ChildOutcomes (in log order).
+    """
+    lookup = {child.lower(): Web3.to_checksum_address(child) for child in children}
+    outcomes = []
+    for entry in logs:
+        child = lookup.get(str(entry["address"]).lower())
+        if child is None or not entry["topics"]:
+            continue
+        topic = HexBytes(entry["topics"][0])
+        if topic not in (EXECUTION_SUCCESS_TOPIC, EXECUTION_FAILURE_TOPIC):
+            continue
+        outcomes.append(
+            ChildOutcome(
+                child=child,
+                success=topic == EXECUTION_SUCCESS_TOPIC,
+                # First (non-indexed) word of data is the inner Safe transaction hash.
+                safe_tx_hash=HexBytes(entry["data"])[:32].hex(),
+                tx_hash=HexBytes(entry["transactionHash"]).hex(),
+                block_number=as_int(entry["blockNumber"]),
+            )
+        )
+    return outcomes
+
+
+def fetch_batch_outcomes(
+    client: EthereumClient, tx_hashes: list[str], children: list[ChecksumAddress]
+) -> list[ChildOutcome]:
+    """
+    Fetches all receipts of the executed batches (in a single JSON-RPC batch request)
+    and decodes the per-child outcomes from their logs.
+    """
+    receipts = client.get_transaction_receipts([HexStr(h) for h in tx_hashes])
+    logs = []
+    for tx_hash, receipt in zip(tx_hashes, receipts):
+        if receipt is None:
+            log.warning(f"no receipt found for {tx_hash} (not yet mined?)")
+            continue
+        if receipt["status"] != 1:
+            log.warning(f"batch transaction {tx_hash} reverted")
+        logs += receipt["logs"]
+    return decode_execution_logs(logs, children)
+
+
+def fetch_log_outcomes(
+    client: EthereumClient,
+    children: list[ChecksumAddress],
+    from_block: int,
+    to_block: Optional[int] = None,
+) -> list[ChildOutcome]:
+    """
+    Scans [from_block, to_block] for execution events of `children`
+    (with batched eth_getLogs requests, see src.event_logs).
+    """
+    if to_block is None:
+        to_block = client.current_block_number
+    logs = fetch_logs(
+        client,
+        children,
+        [EXECUTION_SUCCESS_TOPIC, EXECUTION_FAILURE_TOPIC],
+        from_block,
+        to_block,
+    )
+    return decode_execution_logs(logs, children)
+
+
+def outcome_table(
+    children: list[ChecksumAddress], outcomes: list[ChildOutcome]
+) -> list[tuple[ChecksumAddress, int, int, str]]:
+    """
+    Aggregates outcomes into rows of (child, successes, failures, status)
+    with status one of OK, FAILED, PARTIAL or MISSING (no execution found).
+    """
+    counts: dict[str, list[int]] = {child: [0, 0] for child in children}
+    for outcome in outcomes:
+        counts.setdefault(outcome.child, [0, 0])[0 if outcome.success else 1] += 1
+
+    rows = []
+    for child, (successes, failures) in counts.items():
+        if successes + failures == 0:
+            status = "MISSING"
+        elif failures == 0:
+            status = "OK"
+        elif successes == 0:
+            status = "FAILED"
+        else:
+            status = "PARTIAL"
+        rows.append((Web3.to_checksum_address(child), successes, failures, status))
+    return rows
+
+
+def format_outcome_table(rows: list[tuple[ChecksumAddress, int, int, str]]) -> str:
+    """Renders outcome table rows as aligned text"""
+    lines = [f"{'child':<42} {'success':>7} {'failure':>7}  status"]
+    lines += [f"{c:<42} {s:>7} {f:>7}  {status}" for c, s, f, status in rows]
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # pylint:disable=ungrouped-imports
+    from src.environment import chain_context
+
+    parser = argparse.ArgumentParser("Batch Outcome Arguments")
+    parser.add_argument(
+        "--tx-hashes",
+        type=str,
+        default=None,
+        help="Comma separated hashes of executed (parent) batch transactions",
+    )
+    parser.add_argument(
+        "--from-block",
+        type=int,
+        default=None,
+        help="Scan execution logs from this block (used when no --tx-hashes given)",
+    )
+    parser.add_argument(
+        "--to-block",
+        type=int,
+        default=None,
+        help="Scan execution logs up to this block (default: latest)",
+    )
+    family = SafeFamily.from_args(parser)
+    args, _ = parser.parse_known_args()
+    chain_client = chain_context(family.chain).client
+    if args.tx_hashes is not None:
+        results = fetch_batch_outcomes(
+            chain_client, args.tx_hashes.split(","), family.children
+        )
+    elif args.from_block is not None:
+        results = fetch_log_outcomes(
+            chain_client, family.children, args.from_block, args.to_block
+        )
+    else:
+        raise ValueError("one of --tx-hashes or --from-block is required")
+
+    table = outcome_table(family.children, results)
+    print(format_outcome_table(table))
+    failed = [row for row in table if row[3] != "OK"]
+    log.info(f"{len(table) - len(failed)} of {len(table)} child safes fully succeeded")
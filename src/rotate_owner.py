@@ -0,0 +1,130 @@
+"""
+Owner rotation of child Safes in a single inner call per child:
+swapOwner(prevOwner, old, new) or, when the new owner is already present,
+removeOwner(prevOwner, old, threshold). The owner lists (and thresholds) of all
+children are read in bulk to find the `prevOwner` of the old owner in each
+Safe's linked list; children already rotated are skipped.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from gnosis.safe import Safe, SafeOperation
+from gnosis.safe.multi_send import MultiSendTx
+
+from src.child_safe import ChildSafe
+from src.log import set_log
+from src.multisend import build_multisend_from_data
+from src.safe import SafeTransaction, encode_exec_transaction
+from src.util import to_checksum_address
+
+log = set_log(__name__)
+
+# Head of the owners linked list in Safe's OwnerManager
+SENTINEL_OWNERS = to_checksum_address("0x0000000000000000000000000000000000000001")
+
+
+@dataclass
+class RotateArgs:
+    """Owner replaced by `new_owner` on every child"""
+
+    old_owner: ChecksumAddress
+    new_owner: ChecksumAddress
+
+    @classmethod
+    def from_args(cls, argv: Optional[list[str]] = None) -> RotateArgs:
+        """Parses Instance of class from command line arguments (or `argv`)."""
+        parser = argparse.ArgumentParser("Rotate Owner Arguments")
+        parser.add_argument(
+            "--old-owner",
+            type=str,
+            required=True,
+            help="Owner to be replaced on the child Safes",
+        )
+        parser.add_argument(
+            "--new-owner",
+            type=str,
+            required=True,
+            help="Owner replacing --old-owner",
+        )
+        args, _ = parser.parse_known_args(argv)
+        return cls(
+            old_owner=to_checksum_address(args.old_owner),
+            new_owner=to_checksum_address(args.new_owner),
+        )
+
+
+def previous_owner(owners: list[str], owner: str) -> ChecksumAddress:
+    """Predecessor of `owner` in the linked list of `owners` (as returned by getOwners)"""
+    index = owners.index(owner)
+    return SENTINEL_OWNERS if index == 0 else to_checksum_address(owners[index - 1])
+
+
+def rotation_call(
+    child: ChildSafe, owners: list[str], threshold: int, params: RotateArgs
+) -> Optional[HexStr]:
+    """
+    Safe call data rotating the owner of `child` with `owners` and `threshold`
+    (None when there is nothing to do).
+    """
+    owners = [to_checksum_address(owner) for owner in owners]
+    if params.old_owner not in owners:
+        if params.new_owner not in owners:
+            log.warning(f"{params.old_owner} is not an owner of {child} - skipping!")
+        return None
+    prev_owner = previous_owner(owners, params.old_owner)
+    if params.new_owner not in owners:
+        return child.encode(
+            "swapOwner", [prev_owner, params.old_owner, params.new_owner]
+        )
+    # The new owner is already present: only the old one has to go.
+    return child.encode(
+        "removeOwner",
+        [prev_owner, params.old_owner, min(threshold, len(owners) - 1)],
+    )
+
+
+def read_owners(
+    client: EthereumClient, children: list[ChecksumAddress]
+) -> list[tuple[Optional[list[str]], Optional[int]]]:
+    """Owners and threshold of every child (None when unreadable)"""
+    functions = get_safe_V1_3_0_contract(client.w3).functions
+    columns: list[list[Any]] = [
+        client.batch_call_same_function(function, children, raise_exception=False)
+        for function in (functions.getOwners(), functions.getThreshold())
+    ]
+    return list(zip(*columns))
+
+
+def rotate_transactions(
+    parent: Safe, children: list[ChildSafe], params: RotateArgs
+) -> list[MultiSendTx]:
+    """One execTransaction per child still owned by `params.old_owner`"""
+    states = read_owners(parent.ethereum_client, [child.address for child in children])
+    transactions = []
+    for child, (owners, threshold) in zip(children, states):
+        if owners is None or threshold is None:
+            log.warning(f"could not read owners of {child} - skipping!")
+            continue
+        data = rotation_call(child, owners, threshold, params)
+        if data is None:
+            continue
+        transaction = SafeTransaction(
+            to=child.address, value=0, data=data, operation=SafeOperation.CALL
+        )
+        transactions.append(
+            build_multisend_from_data(
+                child, encode_exec_transaction(child, parent.address, transaction)
+            )
+        )
+    log.info(
+        f"rotating {params.old_owner} -> {params.new_owner} on "
+        f"{len(transactions)} of {len(children)} children"
+    )
+    return transactions
@@ -3,24 +3,32 @@ from __future__ import annotations
 
 import argparse
 from dataclasses import dataclass
-from typing import Optional, Any
+from typing import TYPE_CHECKING, Any, Optional
 
 from eth_typing.encoding import HexStr
 from eth_typing.evm import ChecksumAddress
 from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
 from gnosis.safe import Safe, SafeOperation
 from gnosis.safe.api import TransactionServiceApi
 from gnosis.safe.multi_send import MultiSendTx
-from web3 import Web3
 from web3.contract import Contract  # type:ignore
 
+from src.chains import Chain
+from src.child_safe import ChildSafe
 from src.constants import ZERO_ADDRESS
 from src.dune import fetch_child_safes
+from src.fleet_index import FleetIndex
 from src.log import set_log
 from src.multisend import (
+    build_and_sign_batches,
     post_safe_tx,
     partitioned_build_multisend,
 )
+from src.util import to_checksum_address, to_checksum_addresses
+
+if TYPE_CHECKING:
+    from src.tree import SafeTree
 
 log = set_log(__name__)
 
@@ -30,7 +38,31 @@ def get_safe(address: str, client: EthereumClient) -> Safe:
     Fetches safe object at address
     Safe must exist on the `client.get_network()`
     """
-    return Safe(address=Web3.to_checksum_address(address), ethereum_client=client)
+    return Safe(address=to_checksum_address(address), ethereum_client=client)
+
+
+def get_child(address: str, client: EthereumClient) -> ChildSafe:
+    """Slim handle of the child safe at address (see src.child_safe)"""
+    return ChildSafe(to_checksum_address(address), client)
+
+
+def load_children(
+    addresses: list[ChecksumAddress], parent: Safe, client: EthereumClient
+) -> list[ChildSafe]:
+    """
+    Child safes at `addresses`, warning about those not owned by `parent`
+    (checked in a single batch request).
+    """
+    children = [get_child(address, client) for address in addresses]
+    is_owner = client.batch_call_same_function(
+        get_safe_V1_3_0_contract(client.w3).functions.isOwner(parent.address),
+        addresses,
+        raise_exception=False,
+    )
+    for child, owned in zip(children, is_owner):
+        if not owned:
+            print(f"{parent} not an owner of {child}: transactions will fail!")
+    return children
 
 
 @dataclass
@@ -59,7 +91,7 @@ def encode_contract_method(
 
 
 def encode_exec_transaction(
-    safe: Safe, owner: ChecksumAddress, transaction: SafeTransaction
+    safe: ChildSafe, owner: ChecksumAddress, transaction: SafeTransaction
 ) -> HexStr:
     """
     Builds an ExecTransaction
@@ -71,7 +103,7 @@ def encode_exec_transaction(
         f"0x000000000000000000000000{owner.replace('0x', '')}00"
         f"0000000000000000000000000000000000000000000000000000000000000001"
     )
-    data: HexStr = safe.contract.encodeABI(
+    data: HexStr = safe.encode(
         "execTransaction",
         [
             transaction.to,
@@ -92,22 +124,52 @@ def encode_exec_transaction(
 @dataclass
 class SafeFamily:
     """
-    Simple data class holding a Safe and a collection of Sub Safes
+    Simple data class holding a Safe and a collection of Sub Safes (on a given chain)
     """
 
     parent: ChecksumAddress
     children: list[ChecksumAddress]
+    chain: Chain = Chain.ETHEREUM
+    # Nested Safes below the parent (children are its top-level Safes), see src.tree
+    tree: Optional[SafeTree] = None
 
     @classmethod
-    def from_args(cls, parser: Optional[argparse.ArgumentParser] = None) -> SafeFamily:
-        """Parses Instance of class from command line arguments."""
+    def from_args(
+        cls,
+        parser: Optional[argparse.ArgumentParser] = None,
+        argv: Optional[list[str]] = None,
+    ) -> SafeFamily:
+        """
+        Parses Instance of class from command line arguments (for a single chain).
+        Reads `argv` instead of sys.argv when given.
+        """
+        families = cls.all_from_args(parser, argv)
+        if len(families) != 1:
+            raise ValueError(
+                "expected a single --chain and --parent for this operation"
+            )
+        return families[0]
+
+    @classmethod
+    def all_from_args(
+        cls,
+        parser: Optional[argparse.ArgumentParser] = None,
+        argv: Optional[list[str]] = None,
+    ) -> list[SafeFamily]:
+        """
+        Parses one instance per chain (given by --chain) and parent (given by --parent)
+        from command line arguments (`argv` instead of sys.argv when given).
+        With several parents, each family holds all candidate children
+        (see src.shard for assigning them to their owning parent).
+        """
         if parser is None:
             parser = argparse.ArgumentParser("Safe Family Arguments")
         parser.add_argument(
             "--parent",
             type=str,
             required=True,
-            help="Master Safe Address (owner of all sub safes)",
+            help="Master Safe Address (owner of all sub safes) or comma separated list "
+            "of parent Safes each owning a subset of the sub safes",
         )
         parser.add_argument(
             "--sub-safes",
@@ -128,50 +190,121 @@ class SafeFamily:
             default=1000,
             help="Index in (sorted) list of children to perform operation to",
         )
+        parser.add_argument(
+            "--chain",
+            type=str,
+            default=str(Chain.ETHEREUM),
+            help=f"Comma separated list of chains with the family (one of "
+            f"{','.join(str(c) for c in Chain)})",
+        )
+        parser.add_argument(
+            "--fleet-index",
+            type=str,
+            default=None,
+            help="Read children from this fleet index (see src.fleet_index) "
+            "instead of Dune",
+        )
+        parser.add_argument(
+            "--sole-owner",
+            action="store_true",
+            help="With --fleet-index: only children owned by the parent alone "
+            "with threshold 1",
+        )
+        parser.add_argument(
+            "--tree",
+            type=str,
+            default=None,
+            help="JSON file of nested Safes per parent e.g. "
+            '{"<parent>": {"<team>": {"<project>": {}}}} (see src.tree)',
+        )
+
+        args, _ = parser.parse_known_args(argv)
+        parents = to_checksum_addresses(args.parent.split(","))
+        families = []
+        for chain in [Chain.from_str(c) for c in args.chain.split(",")]:
+            for parent in parents:
+                tree = None
+                if args.tree is not None:
+                    # pylint:disable=import-outside-toplevel
+                    from src.tree import SafeTree
+
+                    tree = SafeTree.read(args.tree, parent)
+                    children = [child.address for child in tree.children]
+                    print(f"Using tree of {len(list(tree.descendants()))} Safes")
+                elif args.sub_safes is not None:
+                    children = to_checksum_addresses(args.sub_safes.split(","))
+                elif args.fleet_index is not None:
+                    with FleetIndex(args.fleet_index) as index:
+                        indexed = index.children(
+                            chain,
+                            parent,
+                            threshold=1 if args.sole_owner else None,
+                            sole_owner=args.sole_owner,
+                        )
+                    start = args.index_from
+                    children = indexed[start : start + args.num_safes]
+                else:
+                    start = args.index_from
+                    length = args.num_safes
+                    children = fetch_child_safes(
+                        parent, start, start + length, chain.dune_name
+                    )
 
-        args, _ = parser.parse_known_args()
-        parent = Web3().to_checksum_address(args.parent)
-        if args.sub_safes is not None:
-            children = [
-                Web3().to_checksum_address(c) for c in args.sub_safes.split(",")
-            ]
-        else:
-            start = args.index_from
-            length = args.num_safes
-            children = fetch_child_safes(parent, start, start + length)
-
-        print(f"Using {len(children)} child safes {children}")
-        return cls(parent, children)
-
-    def as_safes(self, eth_client: EthereumClient) -> tuple[Safe, list[Safe]]:
-        """Constructs/Fetches and returns Safe Objects from the instance attributes"""
+                print(f"Using {len(children)} child safes on {chain} {children}")
+                families.append(cls(parent, children, chain, tree))
+        return families
+
+    def as_safes(self, eth_client: EthereumClient) -> tuple[Safe, list[ChildSafe]]:
+        """
+        Constructs the parent Safe and child handles from the instance attributes
+        (checking parent ownership of all children in a single batch request).
+        """
         print(f"loading {len(self.children) + 1} Safe instances...")
         parent = get_safe(self.parent, eth_client)
-        children = []
-        # TODO - make this async!
-        for child in self.children:
-            child_safe = get_safe(child, eth_client)
-            if not child_safe.retrieve_is_owner(parent.address):
-                print(f"{parent} not an owner of {child_safe}: transactions will fail!")
-            children.append(child_safe)
-
+        children = load_children(self.children, parent, eth_client)
         print(f"loaded parent {parent.address} along with {len(children)} child Safes")
         return parent, children
 
 
-def multi_exec(
+def add_sender_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the --parent, --chain and --yes arguments of a single sending Safe"""
+    parser.add_argument(
+        "--parent", type=str, required=True, help="Safe sending the transactions"
+    )
+    parser.add_argument(
+        "--chain",
+        type=Chain.from_str,
+        default=Chain.ETHEREUM,
+        help="Chain of the sending Safe",
+    )
+    add_yes_argument(parser)
+
+
+def add_yes_argument(parser: argparse.ArgumentParser) -> None:
+    """Adds --yes skipping the confirmation before posting each transaction"""
+    parser.add_argument(
+        "--yes",
+        action="store_true",
+        help="Post transactions without interactive confirmation",
+    )
+
+
+def multi_exec(  # pylint:disable=too-many-arguments
     parent: Safe,
     client: EthereumClient,
     signing_key: str,
     transactions: list[MultiSendTx],
+    tx_service: Optional[TransactionServiceApi] = None,
+    confirm: bool = True,
 ) -> list[int]:
     """
     Iteratively builds and posts a multisend transaction adding `new_owner` to each child safe.
     Requires that `parent` is a single signer on all `children`.
     """
-    tx_service = TransactionServiceApi(client.get_network())
+    if tx_service is None:
+        tx_service = TransactionServiceApi(client.get_network())
     return [
-        post_safe_tx(safe_tx=tx, tx_service=tx_service)
+        post_safe_tx(safe_tx=tx, tx_service=tx_service, confirm=confirm)
         for tx in partitioned_build_multisend(
             safe=parent,
             transactions=transactions,
@@ -179,3 +312,24 @@ def multi_exec(
             signing_key=signing_key,
         )
     ]
+
+
+def batch_exec(  # pylint:disable=too-many-arguments
+    parent: Safe,
+    client: EthereumClient,
+    signing_key: str,
+    batches: list[list[MultiSendTx]],
+    tx_service: Optional[TransactionServiceApi] = None,
+    confirm: bool = True,
+    nonce: Optional[int] = None,
+) -> list[int]:
+    """
+    Builds and posts one multisend transaction per (already packed) batch,
+    e.g. for nested trees (see src.tree), numbered from `nonce` if given.
+    """
+    if tx_service is None:
+        tx_service = TransactionServiceApi(client.get_network())
+    return [
+        post_safe_tx(safe_tx=tx, tx_service=tx_service, confirm=confirm)
+        for tx in build_and_sign_batches(parent, batches, client, signing_key, nonce)
+    ]
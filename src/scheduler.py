@@ -0,0 +1,192 @@
+"""
+Gas price aware execution of signed batches.
+Instead of being posted for manual execution, the signed Safe transactions of a run
+are held and executed (in nonce order) as soon as the base fee is at or below a
+ceiling, or once a deadline is reached. Savings are tracked against executing all
+batches at the base fee seen when the schedule started.
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from eth_account import Account
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe, SafeTx
+
+from src.log import set_log
+
+log = set_log(__name__)
+
+GWEI = 10**9
+
+# Current base fee (in wei)
+FeeReader = Callable[[], int]
+# Executes a Safe transaction, returns the gas it used
+Submitter = Callable[[SafeTx], int]
+
+
+@dataclass
+class FeeSchedule:
+    """Base fee ceiling (wei) and deadline (seconds after start) of an execution"""
+
+    ceiling: int
+    deadline: float
+    poll_interval: float = 12.0
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> Optional[FeeSchedule]:
+        """Schedule from parsed `add_schedule_arguments` (None when not scheduled)"""
+        if args.gas_ceiling is None:
+            return None
+        return cls(
+            ceiling=int(args.gas_ceiling * GWEI),
+            deadline=args.deadline * 60,
+            poll_interval=args.poll_interval,
+        )
+
+
+def add_schedule_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the --gas-ceiling, --deadline and --poll-interval arguments"""
+    parser.add_argument(
+        "--gas-ceiling",
+        type=float,
+        default=None,
+        help="Execute the signed batches once the base fee (gwei) is at most this",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        default=60.0,
+        help="Minutes after which batches are executed regardless of the base fee",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=12.0,
+        help="Seconds between base fee checks",
+    )
+
+
+@dataclass
+class ScheduledExecution:
+    """Batch executed at `base_fee`"""
+
+    nonce: int
+    base_fee: int
+    gas_used: int
+
+
+@dataclass
+class ScheduleReport:
+    """Executions of a schedule, compared to immediate execution at `reference_fee`"""
+
+    reference_fee: int
+    executions: list[ScheduledExecution] = field(default_factory=list)
+    # Nonces of the batches that were not executed, with the reason
+    failures: list[tuple[int, str]] = field(default_factory=list)
+
+    @property
+    def cost(self) -> int:
+        """Total base fee cost (wei) of the executions"""
+        return sum(e.gas_used * e.base_fee for e in self.executions)
+
+    @property
+    def savings(self) -> int:
+        """Base fee cost saved (wei) compared to immediate execution"""
+        gas_used = sum(e.gas_used for e in self.executions)
+        return gas_used * self.reference_fee - self.cost
+
+    def __str__(self) -> str:
+        summary = (
+            f"executed {len(self.executions)} batches for {self.cost / 10**18:.6f} ETH "
+            f"in base fees, saving {self.savings / 10**18:.6f} ETH compared to "
+            f"execution at {self.reference_fee / GWEI:.2f} gwei"
+        )
+        for nonce, reason in self.failures:
+            summary += f"\nnonce {nonce} NOT executed: {reason}"
+        return summary
+
+
+def base_fee_reader(client: EthereumClient) -> FeeReader:
+    """Reads the base fee of the latest block through `client`"""
+
+    def read() -> int:
+        return int(client.w3.eth.get_block("latest")["baseFeePerGas"])
+
+    return read
+
+
+def check_executor(safe: Safe, sender_key: str) -> str:
+    """
+    Ensures the account of `sender_key` can execute transactions of `safe` alone
+    (threshold 1 and an owner). Returns the account address.
+    """
+    # pylint:disable-next=no-value-for-parameter
+    sender = str(Account.from_key(sender_key).address)
+    threshold = safe.retrieve_threshold()
+    if threshold != 1:
+        raise ValueError(
+            f"scheduled execution requires threshold 1, {safe.address} has {threshold}"
+        )
+    if sender not in safe.retrieve_owners():
+        raise ValueError(f"executor {sender} is not an owner of {safe.address}")
+    return sender
+
+
+def chain_submitter(sender_key: str) -> Submitter:
+    """Executes Safe transactions from the account of `sender_key` (waiting for them)"""
+
+    def submit(safe_tx: SafeTx) -> int:
+        tx_hash, _ = safe_tx.execute(sender_key)
+        receipt = safe_tx.ethereum_client.w3.eth.wait_for_transaction_receipt(tx_hash)
+        log.info(f"executed nonce {safe_tx.safe_nonce} in {tx_hash.hex()}")
+        return int(receipt["gasUsed"])
+
+    return submit
+
+
+def run_schedule(  # pylint:disable=too-many-arguments
+    batches: list[SafeTx],
+    schedule: FeeSchedule,
+    read_fee: FeeReader,
+    submit: Submitter,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable[[float], None] = time.sleep,
+) -> ScheduleReport:
+    """
+    Executes `batches` in nonce order whenever the base fee is at most the ceiling
+    (all remaining ones once the deadline has passed).
+    A failed execution stops the schedule (later nonces cannot be executed before it),
+    the failure and the remaining batches are recorded in the report.
+    """
+    start = clock()
+    fee = read_fee()
+    report = ScheduleReport(reference_fee=fee)
+    pending = sorted(batches, key=lambda safe_tx: int(safe_tx.safe_nonce))
+    while pending:
+        remaining = schedule.deadline - (clock() - start)
+        if fee <= schedule.ceiling or remaining <= 0:
+            safe_tx = pending.pop(0)
+            nonce = int(safe_tx.safe_nonce)
+            try:
+                gas_used = submit(safe_tx)
+            except Exception as err:  # pylint:disable=broad-exception-caught
+                log.error(f"execution of nonce {nonce} failed: {err}")
+                report.failures.append((nonce, str(err)))
+                report.failures += [
+                    (int(tx.safe_nonce), f"nonce {nonce} failed") for tx in pending
+                ]
+                break
+            report.executions.append(ScheduledExecution(nonce, fee, gas_used))
+        else:
+            log.info(
+                f"base fee {fee / GWEI:.2f} gwei above ceiling, "
+                f"{len(pending)} batches waiting ({remaining:.0f}s to deadline)"
+            )
+            sleep(min(schedule.poll_interval, remaining))
+        if pending:
+            fee = read_fee()
+    return report
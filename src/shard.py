@@ -0,0 +1,138 @@
+"""
+Sharding of fleets controlled by several parent Safes.
+Every child is assigned to a parent owning it, so that the batches of each parent
+(serialised on that parent's nonce only) are built, signed and proposed in
+parallel lanes, followed by a combined report of all lanes.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+
+from src.log import set_log
+from src.multisend import DECLINED, PostingDeclined
+from src.safe import SafeFamily
+
+log = set_log(__name__)
+
+
+def assign_children(
+    parents: list[ChecksumAddress],
+    children: list[ChecksumAddress],
+    owners: list[Any],
+) -> tuple[dict[ChecksumAddress, list[ChecksumAddress]], list[ChecksumAddress]]:
+    """
+    Assigns each child to the first of `parents` among its `owners` (the owner list
+    of each child, None where unreadable).
+    Returns the children per parent and the orphaned children.
+    """
+    shards: dict[ChecksumAddress, list[ChecksumAddress]] = {p: [] for p in parents}
+    orphans = []
+    for child, child_owners in zip(children, owners):
+        owning = [p for p in parents if p in (child_owners or [])]
+        if not owning:
+            orphans.append(child)
+            continue
+        if len(owning) > 1:
+            log.warning(f"{child} owned by several parents {owning}, using {owning[0]}")
+        shards[owning[0]].append(child)
+    return shards, orphans
+
+
+def shard_families(
+    client: EthereumClient, families: list[SafeFamily]
+) -> tuple[list[SafeFamily], list[ChecksumAddress]]:
+    """
+    Re-distributes the children of `families` (all on the same chain)
+    to their owning parent based on (batched) on-chain owner reads.
+    Returns the non-empty sharded families and the children owned by none of the parents.
+    """
+    parents = list(dict.fromkeys(family.parent for family in families))
+    children = list(
+        dict.fromkeys(child for family in families for child in family.children)
+    )
+    owners = client.batch_call_same_function(
+        get_safe_V1_3_0_contract(client.w3).functions.getOwners(),
+        children,
+        raise_exception=False,
+    )
+    shards, orphans = assign_children(parents, children, owners)
+    chain = families[0].chain
+    for parent, shard in shards.items():
+        log.info(f"parent {parent} owns {len(shard)} of {len(children)} children")
+    if orphans:
+        log.warning(f"{len(orphans)} children owned by none of the parents: {orphans}")
+    sharded = [SafeFamily(p, shard, chain) for p, shard in shards.items() if shard]
+    return sharded, orphans
+
+
+@dataclass
+class LaneResult:
+    """Outcome of processing a single (parent, chain) lane"""
+
+    family: SafeFamily
+    nonces: list[int] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def status(self) -> str:
+        """OK when all batches were posted, FAILED otherwise"""
+        if self.error is not None or -1 in self.nonces:
+            return "FAILED"
+        return "OK"
+
+
+def run_lanes(
+    run: Callable[[SafeFamily], list[int]], families: list[SafeFamily]
+) -> list[LaneResult]:
+    """
+    Runs `run` for every family concurrently, collecting (rather than raising) errors.
+    Once posting is declined in one lane, the remaining lanes are cancelled
+    (lanes still running stop at their next post).
+    """
+    results = {id(family): LaneResult(family) for family in families}
+
+    def run_lane(family: SafeFamily) -> list[int]:
+        if DECLINED.is_set():
+            raise PostingDeclined()
+        return run(family)
+
+    with ThreadPoolExecutor(max_workers=max(len(families), 1)) as pool:
+        futures = {pool.submit(run_lane, family): family for family in families}
+        for done, future in enumerate(as_completed(futures), start=1):
+            family = futures[future]
+            result = results[id(family)]
+            # BaseException: scripts may sys.exit() within a lane.
+            error = None if future.cancelled() else future.exception()
+            if future.cancelled() or isinstance(error, PostingDeclined):
+                result.error = "declined"
+                pool.shutdown(wait=False, cancel_futures=True)
+            elif error is not None:
+                result.error = repr(error)
+            else:
+                result.nonces = future.result()
+            log.info(
+                f"lane {done}/{len(families)} ({family.parent} on {family.chain}) "
+                f"finished: {result.status}"
+            )
+    return [results[id(family)] for family in families]
+
+
+def format_lane_report(results: list[LaneResult]) -> str:
+    """Human readable table of all lane results"""
+    lines = [f"{'chain':<10} {'parent':<42} {'children':>8}  {'status':<6} nonces"]
+    for result in results:
+        family = result.family
+        detail = result.error if result.error is not None else result.nonces
+        lines.append(
+            f"{str(family.chain):<10} {family.parent:<42} "
+            f"{len(family.children):>8}  {result.status:<6} {detail}"
+        )
+    failed = sum(result.status != "OK" for result in results)
+    lines.append(f"{len(results) - failed}/{len(results)} lanes succeeded")
+    return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""
+External signing of Safe transaction hashes.
+All hashes of a run (from a plan) are exported in one batch, signed by a separate
+process holding the key (a stand-in for a hardware wallet, HSM or KMS) and the
+signatures are imported back in bulk when applying the plan:
+
+    python -m src.signer export --plan plan.json --out requests.json
+    SIGNER_PK=... python -m src.signer sign < requests.json > signatures.json
+    python -m src.plan --plan plan.json --signatures signatures.json
+
+Alternatively `--signer-command` runs the signing process for the whole batch in one round trip.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from eth_account import Account
+from eth_typing.encoding import HexStr
+from gnosis.safe import SafeTx
+from gnosis.safe.signatures import signature_to_bytes
+from gnosis.safe.safe_signature import SafeSignature, SafeSignatureEOA
+from hexbytes import HexBytes
+
+from src.log import set_log
+
+if TYPE_CHECKING:
+    from src.plan import Plan
+
+log = set_log(__name__)
+
+
+@dataclass
+class SigningRequest:
+    """Safe transaction hash to be signed (with context for the signer to review)"""
+
+    safe: str
+    nonce: int
+    safe_tx_hash: HexStr
+
+
+def signing_requests(plan: Plan) -> list[SigningRequest]:
+    """Signing requests of all batches in `plan`"""
+    return [
+        SigningRequest(plan.safe, batch.nonce, batch.safe_tx_hash)
+        for batch in plan.batches
+    ]
+
+
+def sign_requests(
+    requests: Iterable[SigningRequest], private_key: str
+) -> dict[HexStr, HexStr]:
+    """Signs all request hashes, returns safe_tx_hash -> signature ({r}{s}{v})"""
+    # unsafe_sign_hash replaces the deprecated signHash (named _sign_hash before 0.13).
+    sign_hash = getattr(Account, "unsafe_sign_hash", None) or getattr(
+        Account, "_sign_hash"
+    )
+    signatures = {}
+    for request in requests:
+        signed = sign_hash(  # pylint:disable=no-value-for-parameter
+            HexBytes(request.safe_tx_hash), private_key
+        )
+        signature = signature_to_bytes(signed["v"], signed["r"], signed["s"])
+        signatures[request.safe_tx_hash] = HexStr("0x" + signature.hex())
+    return signatures
+
+
+def add_signature(safe_tx: SafeTx, signature: bytes) -> str:
+    """Inserts an externally made EOA signature (sorted by owner), returns its signer"""
+    parsed = SafeSignature.parse_signature(signature, safe_tx.safe_tx_hash)
+    if len(parsed) != 1 or not isinstance(parsed[0], SafeSignatureEOA):
+        raise ValueError(f"invalid signature for {safe_tx.safe_tx_hash.hex()}")
+    owner = parsed[0].owner
+    if owner not in safe_tx.signers:
+        owners = sorted(safe_tx.signers + [owner], key=lambda x: int(x, 16))
+        position = owners.index(owner)
+        safe_tx.signatures = (
+            safe_tx.signatures[: 65 * position]
+            + bytes(signature)
+            + safe_tx.signatures[65 * position :]
+        )
+    return str(owner)
+
+
+def run_signer(command: str, requests: list[SigningRequest]) -> dict[HexStr, HexStr]:
+    """
+    Has the external `command` (split into arguments, run without a shell)
+    sign all requests (JSON via stdin/stdout) at once
+    """
+    log.info(f"requesting {len(requests)} signatures from `{command}`")
+    result = subprocess.run(
+        shlex.split(command),
+        input=json.dumps([asdict(r) for r in requests]),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    signatures: dict[HexStr, HexStr] = json.loads(result.stdout)
+    missing = [r.safe_tx_hash for r in requests if r.safe_tx_hash not in signatures]
+    if missing:
+        raise ValueError(f"signer returned no signature for {missing}")
+    return signatures
+
+
+def read_signatures(path: Path) -> dict[HexStr, HexStr]:
+    """Reads signatures written by `python -m src.signer sign`"""
+    with open(path, "r", encoding="utf-8") as file:
+        signatures: dict[HexStr, HexStr] = json.load(file)
+    return signatures
+
+
+def _requests_from_json(content: list[dict[str, Any]]) -> list[SigningRequest]:
+    return [SigningRequest(**request) for request in content]
+
+
+if __name__ == "__main__":
+    # pylint:disable=ungrouped-imports
+    from src.plan import Plan
+
+    parser = argparse.ArgumentParser("External Signer")
+    subcommands = parser.add_subparsers(dest="action", required=True)
+    export = subcommands.add_parser("export", help="Exports signing requests of a plan")
+    export.add_argument("--plan", type=Path, required=True)
+    export.add_argument("--out", type=Path, required=True)
+    sign = subcommands.add_parser(
+        "sign", help="Signs requests from stdin with SIGNER_PK (signatures to stdout)"
+    )
+    args = parser.parse_args()
+    if args.action == "export":
+        exported = signing_requests(Plan.read(args.plan))
+        args.out.write_text(json.dumps([asdict(r) for r in exported], indent=2))
+        log.info(f"exported {len(exported)} signing requests to {args.out}")
+    else:
+        json.dump(
+            sign_requests(
+                _requests_from_json(json.load(sys.stdin)), os.environ["SIGNER_PK"]
+            ),
+            sys.stdout,
+        )
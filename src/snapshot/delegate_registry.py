@@ -3,14 +3,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 
-from web3 import Web3
 
-from src.abis.load import load_contract_abi
-from src.environment import CLIENT
+from src.abis.load import encoding_contract
 
-DELEGATION_CONTRACT = CLIENT.w3.eth.contract(
-    address=Web3().to_checksum_address("0x469788fE6E9E9681C6ebF3bF78e7Fd26Fc015446"),
-    abi=load_contract_abi("delegate_registry"),
+DELEGATION_CONTRACT = encoding_contract(
+    "delegate_registry", "0x469788fE6E9E9681C6ebF3bF78e7Fd26Fc015446"
 )
 
 
@@ -1,17 +1,27 @@
 """Transaction List Builder interface for exec script"""
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import Optional
 
-from gnosis.safe import Safe
+from eth_typing.evm import ChecksumAddress
+from gnosis.safe import Safe, SafeOperation
 from gnosis.safe.multi_send import MultiSendTx
-from web3 import Web3
 
+from src.abis.load import load_abi
+from src.child_safe import ChildSafe
 from src.log import set_log
 from src.multisend import build_multisend_from_data
-from src.safe import encode_exec_transaction, encode_contract_method
+from src.safe import SafeTransaction, encode_exec_transaction
 from src.snapshot.delegate_registry import (
     SAFE_DELEGATION_ID,
     DELEGATION_CONTRACT,
+    DelegationId,
 )
+from src.util import to_checksum_address, to_checksum_addresses
 
 log = set_log(__name__)
 
@@ -26,35 +36,105 @@ class SnapshotCommand(Enum):
         return str(self.value)
 
 
+@dataclass
+class SnapshotArgs:
+    """
+    Snapshot spaces (delegation ids) to update and the delegate of each child:
+    taken from `delegates_by_child`, falling back to `delegate` and finally to the parent.
+    """
+
+    spaces: list[DelegationId] = field(default_factory=lambda: [SAFE_DELEGATION_ID])
+    delegate: Optional[ChecksumAddress] = None
+    delegates_by_child: dict[ChecksumAddress, ChecksumAddress] = field(
+        default_factory=dict
+    )
+
+    @classmethod
+    def from_args(
+        cls,
+        parser: Optional[argparse.ArgumentParser] = None,
+        argv: Optional[list[str]] = None,
+    ) -> SnapshotArgs:
+        """Parses Instance of class from command line arguments (or `argv`)."""
+        if parser is None:
+            parser = argparse.ArgumentParser("Snapshot Arguments")
+        parser.add_argument(
+            "--spaces",
+            type=str,
+            default=str(SAFE_DELEGATION_ID),
+            help="Comma separated list of Snapshot space ids (e.g. safe.eth,cow.eth)",
+        )
+        parser.add_argument(
+            "--delegate",
+            type=str,
+            default=None,
+            help="Delegate address for all children (default: parent)",
+        )
+        parser.add_argument(
+            "--delegates-file",
+            type=str,
+            default=None,
+            help="JSON file mapping child address to its delegate address",
+        )
+        args, _ = parser.parse_known_args(argv)
+        delegates_by_child = {}
+        if args.delegates_file is not None:
+            with open(args.delegates_file, "r", encoding="utf-8") as file:
+                raw_delegates: dict[str, str] = json.load(file)
+            delegates_by_child = dict(
+                zip(
+                    to_checksum_addresses(raw_delegates.keys()),
+                    to_checksum_addresses(raw_delegates.values()),
+                )
+            )
+        return cls(
+            spaces=[DelegationId.from_str(s) for s in args.spaces.split(",")],
+            delegate=to_checksum_address(args.delegate) if args.delegate else None,
+            delegates_by_child=delegates_by_child,
+        )
+
+    def delegate_for(self, parent: Safe, child: ChildSafe) -> ChecksumAddress:
+        """Delegate to be set by `child`"""
+        return self.delegates_by_child.get(
+            child.address, self.delegate or parent.address
+        )
+
+
 def transactions_for(
-    parent: Safe, children: list[Safe], command: SnapshotCommand
+    parent: Safe,
+    children: list[ChildSafe],
+    command: SnapshotCommand,
+    snapshot_args: Optional[SnapshotArgs] = None,
 ) -> list[MultiSendTx]:
-    """Builds transaction for given Snapshot command"""
-
-    if command == SnapshotCommand.SET_DELEGATE:
-        delegate = input(f"Delegate Address(default={parent.address}): ")
-        if delegate != "":
-            try:
-                delegate = Web3().to_checksum_address(delegate)
-            except ValueError as err:
-                raise ValueError(f'Invalid Delegate address "{delegate}"') from err
-        else:
-            delegate = parent.address
-        log.info(f"Setting delegation for namespace {SAFE_DELEGATION_ID} to {delegate}")
-        params = [SAFE_DELEGATION_ID.hex, delegate]
-    elif command == SnapshotCommand.CLEAR_DELEGATE:
-        params = [SAFE_DELEGATION_ID.hex]
-    else:
+    """
+    Builds transactions for given Snapshot command:
+    one delegate registry call per (child, space) pair, all encoded in a single pass.
+    """
+    if snapshot_args is None:
+        snapshot_args = SnapshotArgs()
+    if command not in (SnapshotCommand.SET_DELEGATE, SnapshotCommand.CLEAR_DELEGATE):
         raise EnvironmentError(f"Invalid snapshot command: {command}")
+    encoder = load_abi("delegate_registry").encoder(str(command))
+    spaces = ", ".join(str(space) for space in snapshot_args.spaces)
+    log.info(f"encoding {command} for {len(children)} children in spaces {spaces}")
 
-    return [
-        build_multisend_from_data(
-            safe=child,
-            data=encode_exec_transaction(
-                child,
-                parent.address,
-                encode_contract_method(DELEGATION_CONTRACT, str(command), params),
-            ),
-        )
-        for child in children
-    ]
+    transactions = []
+    for child in children:
+        for space in snapshot_args.spaces:
+            if command == SnapshotCommand.SET_DELEGATE:
+                params = [space.hex, snapshot_args.delegate_for(parent, child)]
+            else:
+                params = [space.hex]
+            transaction = SafeTransaction(
+                to=DELEGATION_CONTRACT.address,
+                value=0,
+                data=encoder.encode(params),
+                operation=SafeOperation.CALL,
+            )
+            transactions.append(
+                build_multisend_from_data(
+                    safe=child,
+                    data=encode_exec_transaction(child, parent.address, transaction),
+                )
+            )
+    return transactions
@@ -0,0 +1,114 @@
+"""
+Bulk sweep of ETH and token balances from all children back to the parent.
+Balances of every (child, token) pair are read by one eth_call each, sent in a
+few JSON-RPC batch requests (ETH balances through Multicall3 getEthBalance), zero
+balances are skipped and the transfers of each child are executed by a single
+execTransaction on that child.
+"""
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe
+from gnosis.safe.multi_send import MultiSendTx
+
+from src.abis.load import get_contract
+from src.child_safe import ChildSafe
+from src.composite import child_transaction
+from src.log import set_log
+from src.token_transfer import Token, Transfer
+from src.util import partition_array
+
+log = set_log(__name__)
+
+# Multicall3 (same address on all supported chains), also providing ETH balances.
+MULTICALL_CONTRACT = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# Balance reads (eth_calls) per JSON-RPC batch request
+BALANCE_READ_CHUNK = 1000
+NATIVE = "ETH"
+
+
+@dataclass
+class SweepArgs:
+    """Tokens to sweep (None for the native token)"""
+
+    tokens: list[Optional[Token]] = field(default_factory=lambda: [None])
+
+    @classmethod
+    def from_args(cls, argv: Optional[list[str]] = None) -> SweepArgs:
+        """Parses Instance of class from command line arguments (or `argv`)."""
+        parser = argparse.ArgumentParser("Sweep Arguments")
+        parser.add_argument(
+            "--tokens",
+            type=str,
+            default=NATIVE,
+            help=f"Comma separated token addresses to sweep ({NATIVE} for native)",
+        )
+        args, _ = parser.parse_known_args(argv)
+        return cls(
+            tokens=[
+                None if token.upper() == NATIVE else Token(token)
+                for token in args.tokens.split(",")
+            ]
+        )
+
+
+def read_balances(
+    client: EthereumClient,
+    children: list[ChecksumAddress],
+    tokens: list[Optional[Token]],
+) -> dict[ChecksumAddress, list[Optional[int]]]:
+    """Balance of each token (in order) held by every child (None when unreadable)"""
+    multicall = get_contract(client.w3, "multicall", MULTICALL_CONTRACT)
+    contracts = [
+        None if token is None else get_contract(client.w3, "erc20", token.address)
+        for token in tokens
+    ]
+    functions = [
+        multicall.functions.getEthBalance(child)
+        if contract is None
+        else contract.functions.balanceOf(child)
+        for child in children
+        for contract in contracts
+    ]
+    results: list[Any] = []
+    for chunk in partition_array(functions, BALANCE_READ_CHUNK):
+        results += client.batch_call(chunk, raise_exception=False)
+    return {
+        child: results[i * len(tokens) : (i + 1) * len(tokens)]
+        for i, child in enumerate(children)
+    }
+
+
+def sweep_transactions(
+    parent: Safe, children: list[ChildSafe], sweep_args: Optional[SweepArgs] = None
+) -> list[MultiSendTx]:
+    """One execTransaction per child with non-zero balances, sending them to the parent"""
+    if sweep_args is None:
+        sweep_args = SweepArgs()
+    balances = read_balances(
+        parent.ethereum_client, [child.address for child in children], sweep_args.tokens
+    )
+    totals = [0] * len(sweep_args.tokens)
+    transactions = []
+    for child in children:
+        calls = []
+        for i, (token, balance) in enumerate(
+            zip(sweep_args.tokens, balances[child.address])
+        ):
+            if not balance:
+                continue
+            totals[i] += int(balance)
+            calls.append(
+                Transfer(token, parent.address, int(balance)).as_multisend_tx()
+            )
+        if calls:
+            transactions.append(child_transaction(child, parent.address, calls))
+    for token, total in zip(sweep_args.tokens, totals):
+        log.info(f"sweeping {total} of {token.address if token else NATIVE}")
+    log.info(f"{len(transactions)} of {len(children)} children hold balances")
+    return transactions
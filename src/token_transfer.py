@@ -1,34 +1,38 @@
 """Models associated with ERC20 Tokens and Transfers"""
 from __future__ import annotations
 
+import argparse
+import csv
 import functools
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Optional
 
 from eth_typing.encoding import HexStr
 from eth_typing.evm import ChecksumAddress
 from gnosis.safe.multi_send import MultiSendTx, MultiSendOperation
-from web3 import Web3
 
-from src.abis.load import load_contract_abi
-from src.constants import ERC20_ABI
-from src.environment import CLIENT
+from src.abis.load import get_contract, load_abi
 from src.log import set_log
+from src.util import to_checksum_address, to_checksum_addresses
 
 log = set_log(__name__)
 
-ERC20_TOKEN = CLIENT.w3.eth.contract(
-    abi=load_contract_abi("erc20"),
-)
+ERC20_TRANSFER = load_abi("erc20").encoder("transfer")
 
 
 @functools.cache
 def get_token_decimals(address: ChecksumAddress) -> int:
     """Fetches Token Decimals and caches results by address"""
-    # This requires a real web3 connection
+    # This requires a real web3 connection (imported here so that the module
+    # itself can be used offline).
+    # pylint:disable=import-outside-toplevel
+    from src.environment import CLIENT
+
     log.info(f"fetching decimals for token {address}")
-    token_info = CLIENT.w3.eth.contract(address=address, abi=ERC20_ABI)
+    token_info = get_contract(CLIENT.w3, "erc20", address)
     # This "trick" is because of the unknown type returned from the contract call.
     token_decimals: int = token_info.functions.decimals().call()
     return token_decimals
@@ -39,17 +43,22 @@ class Token:
     Token class consists of token `address` and additional `decimals` value.
     The constructor exists in a way that we can either
     - provide the decimals (for unit testing) which avoids making web3 calls
-    - fetch the token decimals with eth_call.
+    - fetch the token decimals with eth_call (on first use).
     Since we primarily work with the COW token, the decimals are hardcoded here.
     """
 
     def __init__(self, address: str | ChecksumAddress, decimals: Optional[int] = None):
         if isinstance(address, str):
-            address = Web3.to_checksum_address(address)
+            address = to_checksum_address(address)
         self.address = address
-        self.decimals = (
-            decimals if decimals is not None else get_token_decimals(address)
-        )
+        self._decimals = decimals
+
+    @property
+    def decimals(self) -> int:
+        """Token decimals (fetched when not provided)"""
+        if self._decimals is None:
+            self._decimals = get_token_decimals(self.address)
+        return self._decimals
 
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Token):
@@ -100,10 +109,31 @@ class Transfer:
         token_address = obj.get("token_address", None)
         return cls(
             token=Token(token_address) if token_address else None,
-            receiver=Web3.to_checksum_address(obj["receiver"]),
+            receiver=to_checksum_address(obj["receiver"]),
             amount_wei=int(obj["amount"]),
         )
 
+    @classmethod
+    def from_dicts(cls, objs: list[dict[str, str]]) -> list[Transfer]:
+        """
+        Bulk version of `from_dict`: receivers are checksummed in one pass
+        and a single Token instance is shared per token address.
+        """
+        receivers = to_checksum_addresses(obj["receiver"] for obj in objs)
+        tokens: dict[str, Token] = {}
+        transfers = []
+        for obj, receiver in zip(objs, receivers):
+            token_address = obj.get("token_address", None)
+            token = None
+            if token_address:
+                if token_address not in tokens:
+                    tokens[token_address] = Token(token_address)
+                token = tokens[token_address]
+            transfers.append(
+                cls(token=token, receiver=receiver, amount_wei=int(obj["amount"]))
+            )
+        return transfers
+
     @property
     def token_type(self) -> TokenType:
         """Returns the type of transfer (Native or ERC20)"""
@@ -135,9 +165,7 @@ class Transfer:
                 operation=MultiSendOperation.CALL,
                 to=str(self.token.address),
                 value=0,
-                data=ERC20_TOKEN.encodeABI(
-                    fn_name="transfer", args=[self.receiver, self.amount_wei]
-                ),
+                data=ERC20_TRANSFER.encode([self.receiver, self.amount_wei]),
             )
         raise ValueError(f"Unsupported type {self.token_type}")
 
@@ -152,3 +180,102 @@ class Transfer:
                 f"amount_wei={self.amount})"
             )
         raise ValueError(f"Invalid Token Type {self.token_type}")
+
+
+TransferKey = tuple[Optional[ChecksumAddress], ChecksumAddress]
+
+
+@dataclass
+class AggregationReport:
+    """Summary of transfers merged by `aggregate_transfers`"""
+
+    rows: int
+    transfers: int
+    # Number of rows merged into each (token, receiver) transfer (only for merges).
+    merged: dict[TransferKey, int] = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        lines = [
+            f"aggregated {self.rows} transfer rows into {self.transfers} transfers "
+            f"({len(self.merged)} receivers with repeated rows)"
+        ]
+        for (token, receiver), count in self.merged.items():
+            lines.append(f"  {count} rows merged for {receiver} ({token or 'ETH'})")
+        return "\n".join(lines)
+
+
+def aggregate_transfers(
+    transfers: list[Transfer],
+) -> tuple[list[Transfer], AggregationReport]:
+    """
+    Merges transfers of the same token to the same receiver (summing amounts).
+    The result is sorted by (token, receiver) with native transfers first,
+    so that the same input always yields the same batches.
+    """
+    totals: dict[TransferKey, Transfer] = {}
+    counts: dict[TransferKey, int] = {}
+    for transfer in transfers:
+        token = transfer.token.address if transfer.token is not None else None
+        key = (token, transfer.receiver)
+        if key in totals:
+            totals[key].amount_wei += transfer.amount_wei
+            counts[key] += 1
+        else:
+            totals[key] = Transfer(
+                transfer.token, transfer.receiver, transfer.amount_wei
+            )
+            counts[key] = 1
+
+    keys = sorted(totals, key=lambda k: (k[0] or "", k[1]))
+    report = AggregationReport(
+        rows=len(transfers),
+        transfers=len(keys),
+        merged={key: counts[key] for key in keys if counts[key] > 1},
+    )
+    return [totals[key] for key in keys], report
+
+
+def load_transfers(path: Path) -> list[Transfer]:
+    """
+    Reads transfers from CSV with columns `receiver`, `amount` (in wei)
+    and optional `token_address` (empty for native transfers)
+    """
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        return Transfer.from_dicts(list(csv.DictReader(file)))
+
+
+if __name__ == "__main__":
+    # pylint:disable=ungrouped-imports
+    from src.disperse import TransferBackend, distribution_batches
+    from src.environment import chain_context
+    from src.safe import add_sender_arguments, batch_exec, get_safe
+
+    parser = argparse.ArgumentParser("Transfer Arguments")
+    add_sender_arguments(parser)
+    parser.add_argument(
+        "--transfers",
+        type=Path,
+        required=True,
+        help="CSV file with columns receiver,amount[,token_address]",
+    )
+    parser.add_argument(
+        "--backend",
+        type=TransferBackend,
+        choices=list(TransferBackend),
+        default=TransferBackend.AUTO,
+        help="Encoding of the transfers of each token (auto: lowest estimated gas, "
+        "MultiSend for ETH)",
+    )
+    args, _ = parser.parse_known_args()
+    aggregated, aggregation = aggregate_transfers(load_transfers(args.transfers))
+    print(aggregation)
+    context = chain_context(args.chain)
+    nonces = batch_exec(
+        get_safe(args.parent, context.client),
+        context.client,
+        signing_key=os.environ["PROPOSER_PK"],
+        batches=distribution_batches(aggregated, args.backend),
+        tx_service=context.tx_service,
+        confirm=not args.yes,
+    )
+    log.info(f"Transfers posted with nonce(s) {nonces}")
@@ -0,0 +1,174 @@
+"""
+Fixed-width binary transfer records for very large distributions.
+Each record is a 20-byte receiver address followed by a 32-byte (big-endian)
+amount in wei; all records of a file transfer the same token (or ETH).
+Files are memory-mapped and encoded into MultiSend calldata chunk by chunk
+directly from the buffer, without per-row Transfer objects.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from eth_typing.evm import ChecksumAddress
+from gnosis.safe.multi_send import MultiSendOperation
+from hexbytes import HexBytes
+
+from src.abis.load import load_abi
+from src.log import set_log
+from src.multisend import (
+    BATCH_SIZE_LIMIT,
+    multisend_calldata,
+    post_safe_tx,
+    sign_multisend_data,
+)
+from src.safe import add_sender_arguments, get_safe
+from src.util import to_checksum_address
+
+log = set_log(__name__)
+
+ADDRESS_SIZE = 20
+AMOUNT_SIZE = 32
+RECORD_SIZE = ADDRESS_SIZE + AMOUNT_SIZE
+
+ERC20_TRANSFER_SELECTOR = load_abi("erc20").encoder("transfer").selector
+_CALL = bytes([MultiSendOperation.CALL.value])
+_ZERO_WORD = bytes(32)
+_ADDRESS_PADDING = bytes(32 - ADDRESS_SIZE)
+_TRANSFER_DATA_LENGTH = (4 + 2 * 32).to_bytes(32, "big")
+
+
+def write_records(path: Path, transfers: Iterable[tuple[str, int]]) -> int:
+    """Writes (receiver, amount_wei) pairs as fixed-width records, returns the count"""
+    count = 0
+    with open(path, "wb") as file:
+        for receiver, amount in transfers:
+            file.write(HexBytes(to_checksum_address(receiver)))
+            file.write(amount.to_bytes(AMOUNT_SIZE, "big"))
+            count += 1
+    return count
+
+
+def records_from_csv(csv_path: Path, path: Path) -> int:
+    """Converts a CSV with columns `receiver` and `amount` (wei) to a record file"""
+    with open(csv_path, "r", encoding="utf-8", newline="") as file:
+        return write_records(
+            path,
+            ((row["receiver"], int(row["amount"])) for row in csv.DictReader(file)),
+        )
+
+
+@contextmanager
+def open_records(path: Path) -> Iterator[memoryview]:
+    """Read-only memory map of the record file at `path`"""
+    size = os.path.getsize(path)
+    if size % RECORD_SIZE != 0:
+        raise ValueError(f"{path} size {size} is not a multiple of {RECORD_SIZE}")
+    if size == 0:
+        yield memoryview(b"")
+        return
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        view = memoryview(mapped)
+        try:
+            yield view
+        finally:
+            view.release()
+
+
+def pack_transfers(
+    records: memoryview, token: Optional[ChecksumAddress] = None
+) -> bytes:
+    """
+    Packed MultiSend transactions (operation, to, value, data length, data)
+    transferring ETH (or `token`) for each record in `records`.
+    """
+    parts: list[bytes | memoryview] = []
+    if token is None:
+        for offset in range(0, len(records), RECORD_SIZE):
+            parts += (
+                _CALL,
+                records[offset : offset + ADDRESS_SIZE],
+                records[offset + ADDRESS_SIZE : offset + RECORD_SIZE],
+                _ZERO_WORD,
+            )
+    else:
+        token_prefix = (
+            _CALL
+            + bytes.fromhex(token[2:])
+            + _ZERO_WORD
+            + _TRANSFER_DATA_LENGTH
+            + ERC20_TRANSFER_SELECTOR
+            + _ADDRESS_PADDING
+        )
+        for offset in range(0, len(records), RECORD_SIZE):
+            parts += (token_prefix, records[offset : offset + RECORD_SIZE])
+    return b"".join(parts)
+
+
+def iter_multisend_calldata(
+    records: memoryview,
+    token: Optional[ChecksumAddress] = None,
+    batch_size: int = BATCH_SIZE_LIMIT,
+) -> Iterator[bytes]:
+    """MultiSend call data for consecutive chunks of `batch_size` records"""
+    chunk = batch_size * RECORD_SIZE
+    for start in range(0, len(records), chunk):
+        yield multisend_calldata(pack_transfers(records[start : start + chunk], token))
+
+
+def main() -> None:
+    """Sends the transfers of a record file from a single Safe"""
+    # pylint:disable=import-outside-toplevel
+    from src.environment import chain_context
+
+    parser = argparse.ArgumentParser("Transfer Record Arguments")
+    add_sender_arguments(parser)
+    parser.add_argument(
+        "--records",
+        type=Path,
+        required=True,
+        help="Fixed-width record file (20-byte receiver, 32-byte amount)",
+    )
+    parser.add_argument(
+        "--from-csv",
+        type=Path,
+        default=None,
+        help="Converts this CSV (columns receiver,amount) into --records first",
+    )
+    parser.add_argument(
+        "--token",
+        type=str,
+        default=None,
+        help="Address of the ERC20 token transferred (ETH if omitted)",
+    )
+    args, _ = parser.parse_known_args()
+    if args.from_csv is not None:
+        written = records_from_csv(args.from_csv, args.records)
+        log.info(f"wrote {written} records to {args.records}")
+
+    context = chain_context(args.chain)
+    parent = get_safe(args.parent, context.client)
+    token = to_checksum_address(args.token) if args.token else None
+    nonce = parent.retrieve_nonce()
+    nonces = []
+    with open_records(args.records) as mapped_records:
+        log.info(f"sending {len(mapped_records) // RECORD_SIZE} transfers")
+        for i, calldata in enumerate(iter_multisend_calldata(mapped_records, token)):
+            safe_tx = sign_multisend_data(
+                parent, calldata, os.environ["PROPOSER_PK"], nonce + i
+            )
+            nonces.append(
+                post_safe_tx(safe_tx, context.tx_service, confirm=not args.yes)
+            )
+    log.info(f"Transfers posted with nonce(s) {nonces}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Nested Safe trees (parent -> team Safes -> project Safes -> ...).
+Every Safe of the tree is operated by its direct owner: the operations of a node's
+children are packed into inner MultiSend batches executed by that node (one
+pre-validated execTransaction wrapper per batch of siblings), recursively up to the
+top-level children of the parent. The resulting top-level transactions are then
+packed into the fewest parent batches by their weight (number of operations carried).
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping
+
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress
+from gnosis.eth import EthereumClient
+from gnosis.safe import Safe, SafeOperation
+from gnosis.safe.multi_send import MultiSendTx
+
+from src.child_safe import ChildSafe
+from src.multisend import (
+    BATCH_SIZE_LIMIT,
+    MULTISEND_CONTRACT,
+    build_multisend_from_data,
+    multisend_calldata,
+)
+from src.safe import SafeTransaction, encode_exec_transaction
+from src.util import to_checksum_address
+
+
+@dataclass
+class SafeTree:
+    """Safe along with the (nested) Safes it owns"""
+
+    address: ChecksumAddress
+    children: list[SafeTree] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, address: str, children: Mapping[str, Any]) -> SafeTree:
+        """Tree rooted at `address` from nested mappings {child: {grandchild: {}}}"""
+        return cls(
+            to_checksum_address(address),
+            [cls.from_dict(child, nested or {}) for child, nested in children.items()],
+        )
+
+    @classmethod
+    def read(cls, path: Path, root: str) -> SafeTree:
+        """Tree of `root` from a JSON file of nested mappings keyed by root address"""
+        with open(path, "r", encoding="utf-8") as file:
+            content: dict[str, Any] = json.load(file)
+        by_root = {to_checksum_address(key): value for key, value in content.items()}
+        if to_checksum_address(root) not in by_root:
+            raise ValueError(f"no tree for {root} in {path}")
+        return cls.from_dict(root, by_root[to_checksum_address(root)])
+
+    def descendants(self) -> Iterator[SafeTree]:
+        """All nodes below this one (depth first)"""
+        for child in self.children:
+            yield child
+            yield from child.descendants()
+
+
+@dataclass
+class WeightedTx:
+    """MultiSend transaction along with the number of operations it carries"""
+
+    transaction: MultiSendTx
+    weight: int = 1
+
+
+Builder = Callable[[Safe, list[ChildSafe]], list[MultiSendTx]]
+
+
+def chunk_by_weight(items: list[WeightedTx], capacity: int) -> list[list[WeightedTx]]:
+    """Splits `items` (in order) into consecutive chunks of total weight <= capacity"""
+    chunks: list[list[WeightedTx]] = []
+    load = 0
+    for item in items:
+        if not chunks or load + item.weight > capacity:
+            chunks.append([])
+            load = 0
+        chunks[-1].append(item)
+        load += item.weight
+    return chunks
+
+
+def wrap_batch(
+    node: ChildSafe, owner: ChecksumAddress, items: list[WeightedTx]
+) -> WeightedTx:
+    """execTransaction on `node` (pre-validated by `owner`) delegate-calling MultiSend"""
+    packed = b"".join(item.transaction.encoded_data for item in items)
+    transaction = SafeTransaction(
+        to=to_checksum_address(MULTISEND_CONTRACT),
+        value=0,
+        data=HexStr("0x" + multisend_calldata(packed).hex()),
+        operation=SafeOperation.DELEGATE_CALL,
+    )
+    return WeightedTx(
+        build_multisend_from_data(
+            node, encode_exec_transaction(node, owner, transaction)
+        ),
+        weight=sum(item.weight for item in items),
+    )
+
+
+def subtree_transactions(
+    owner: Safe,
+    node: SafeTree,
+    build: Builder,
+    client: EthereumClient,
+    capacity: int = BATCH_SIZE_LIMIT,
+) -> list[WeightedTx]:
+    """
+    Transactions executed by `owner` applying `build` to `node` and all of its
+    descendants. Those of the subtree come first, so that they are executed before
+    the node's own operations (which may e.g. change its owners).
+    """
+    handle = ChildSafe(node.address, client)
+    inner: list[WeightedTx] = []
+    for child in node.children:
+        inner += subtree_transactions(handle.as_safe(), child, build, client, capacity)
+    transactions = [
+        wrap_batch(handle, owner.address, chunk)
+        for chunk in chunk_by_weight(inner, capacity)
+    ]
+    return transactions + [WeightedTx(tx) for tx in build(owner, [handle])]
+
+
+def pack_batches(
+    units: list[list[WeightedTx]], capacity: int = BATCH_SIZE_LIMIT
+) -> list[list[MultiSendTx]]:
+    """
+    First fit decreasing packing of `units` (the transactions of each top-level
+    subtree) into batches of total weight <= capacity. Transactions of a unit
+    are never placed in an earlier batch than their predecessors in that unit.
+    """
+    batches: list[list[MultiSendTx]] = []
+    loads: list[int] = []
+    for unit in sorted(units, key=lambda u: sum(tx.weight for tx in u), reverse=True):
+        start = 0
+        for item in unit:
+            index = next(
+                (
+                    i
+                    for i in range(start, len(batches))
+                    if loads[i] + item.weight <= capacity
+                ),
+                len(batches),
+            )
+            if index == len(batches):
+                batches.append([])
+                loads.append(0)
+            batches[index].append(item.transaction)
+            loads[index] += item.weight
+            start = index
+    return batches
+
+
+def tree_batches(
+    parent: Safe,
+    tree: SafeTree,
+    build: Builder,
+    client: EthereumClient,
+    capacity: int = BATCH_SIZE_LIMIT,
+) -> list[list[MultiSendTx]]:
+    """Parent batches applying `build` to every Safe below the parent in `tree`"""
+    return pack_batches(
+        [
+            subtree_transactions(parent, child, build, client, capacity)
+            for child in tree.children
+        ],
+        capacity,
+    )
@@ -1,5 +1,13 @@
 """Some reusable generic helper functions"""
-from typing import Any
+import functools
+import re
+from typing import Any, Iterable
+
+from eth_hash.auto import keccak
+from eth_typing.encoding import HexStr
+from eth_typing.evm import ChecksumAddress, HexAddress
+
+HEX_ADDRESS = re.compile(r"^(0x)?[0-9a-fA-F]{40}$")
 
 
 def partition_array(arr: list[Any], part_size: int) -> list[list[Any]]:
@@ -7,3 +15,27 @@ def partition_array(arr: list[Any], part_size: int) -> list[list[Any]]:
     if part_size <= 0:
         raise ValueError(f"Can't partition array into parts of size {part_size}")
     return [arr[i : i + part_size] for i in range(0, len(arr), part_size)]
+
+
+@functools.lru_cache(maxsize=2**17)
+def to_checksum_address(address: str) -> ChecksumAddress:
+    """
+    EIP-55 checksum address of hex `address` (with or without 0x prefix).
+    Results are memoized, invalid addresses raise ValueError.
+    """
+    if HEX_ADDRESS.match(address) is None:
+        raise ValueError(f"invalid address {address!r}")
+    lower = address[-40:].lower()
+    digest = keccak(lower.encode()).hex()
+    checksum = "".join(
+        char.upper() if nibble in "89abcdef" else char
+        for char, nibble in zip(lower, digest)
+    )
+    return ChecksumAddress(HexAddress(HexStr("0x" + checksum)))
+
+
+def to_checksum_addresses(addresses: Iterable[str]) -> list[ChecksumAddress]:
+    """Checksums all `addresses` (in order), each distinct value only once"""
+    addresses = list(addresses)
+    unique = {address: to_checksum_address(address) for address in set(addresses)}
+    return [unique[address] for address in addresses]
@@ -0,0 +1,6 @@
+from web3 import Web3
+
+
+def address(i: int) -> str:
+    """Checksum address with integer value `i` (distinct test addresses)"""
+    return Web3.to_checksum_address(f"0x{i:040x}")
@@ -0,0 +1,38 @@
+import unittest
+
+from web3 import Web3
+
+from src.abis.load import get_contract, load_abi, load_contract_abi
+
+
+class TestAbiRegistry(unittest.TestCase):
+    def test_parsed_once(self):
+        self.assertIs(load_abi("erc20"), load_abi("erc20"))
+        self.assertIs(load_contract_abi("erc20"), load_abi("erc20").abi)
+
+    def test_precomputed_encoders(self):
+        erc20 = load_abi("erc20")
+        transfer = erc20.encoder("transfer")
+        self.assertEqual(transfer.selector.hex(), "a9059cbb")
+        self.assertIs(erc20.encoder("transfer(address,uint256)"), transfer)
+        receiver = Web3.to_checksum_address("0x" + "12" * 20)
+        expected = (
+            Web3().eth.contract(abi=erc20.abi).encodeABI("transfer", [receiver, 7])
+        )
+        self.assertEqual(transfer.encode([receiver, 7]), expected)
+        with self.assertRaises(ValueError):
+            erc20.encoder("allowance")
+
+    def test_contract_cache(self):
+        w3 = Web3()
+        address = "0x5afe3855358e112b5647b952709e6165e1c1eeee"
+        contract = get_contract(w3, "erc20", address)
+        self.assertIs(
+            contract, get_contract(w3, "erc20", Web3.to_checksum_address(address))
+        )
+        self.assertIsNot(contract, get_contract(Web3(), "erc20", address))
+        self.assertEqual(contract.address, Web3.to_checksum_address(address))
+
+
+if __name__ == "__main__":
+    unittest.main()
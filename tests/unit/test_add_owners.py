@@ -10,7 +10,7 @@ from src.add_owner import (
     AddOwnerArgs,
 )
 from src.multisend import build_and_sign_multisend
-from src.safe import get_safe
+from src.safe import get_child, get_safe
 
 
 class TestMultiAddOwner(unittest.TestCase):
@@ -25,7 +25,7 @@ class TestMultiAddOwner(unittest.TestCase):
 
         self.sub_safes = list(
             map(
-                lambda a: get_safe(a, self.client),
+                lambda a: get_child(a, self.client),
                 [
                     "0x8baf303407eb4ea42f18bdec84f7d3bbe48c9046",
                     "0xabe0ce1df666042e950f6f3984522d88e158a50d",
@@ -35,7 +35,7 @@ class TestMultiAddOwner(unittest.TestCase):
         )
 
     def test_build_add_owner_singleton_fails_with_invalid_transaction(self):
-        invalid_sub_safe = get_safe(
+        invalid_sub_safe = get_child(
             "0xef7fe7fb0e281d82d49b22c6d05d2ce22bb6801f", self.client
         )
         with self.assertRaises(AssertionError) as err:
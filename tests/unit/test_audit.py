@@ -0,0 +1,190 @@
+import csv
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from web3 import Web3
+
+from src.airdrop.allocation import Allocation
+from src.audit import (
+    ChildReport,
+    audit_fleet,
+    read_child_states,
+    vesting_summaries,
+    write_audit_csv,
+)
+from src.chains import Chain
+from src.constants import ZERO_ADDRESS
+from helpers import address
+
+
+def allocation(vesting: int, amount: int) -> Allocation:
+    return Allocation(
+        tag="user",
+        account=address(0),
+        chainId=1,
+        contract=address(99),
+        vestingId=f"0x{vesting:064x}",
+        durationWeeks=416,
+        startDate=0,
+        amount=str(amount),
+        curve=0,
+        proof=[],
+    )
+
+
+def vesting_tuple(account: str, claimed: int) -> tuple:
+    # (account, curveType, managed, durationWeeks, startDate, amount, amountClaimed, ...)
+    return (account, 0, False, 416, 0, 100, claimed, 0, False)
+
+
+class FakeClient:
+    """Answers batch calls from `results` keyed by (function name, first argument)"""
+
+    def __init__(self, results):
+        self.w3 = Web3()
+        self.results = results
+        self.batches = []
+
+    def _result(self, name, arg):
+        return self.results.get((name, arg))
+
+    def batch_call(self, functions, raise_exception=True):
+        self.batches.append(len(functions))
+        return [
+            self._result(f.fn_name, f.args[0] if f.args else None) for f in functions
+        ]
+
+    def batch_call_same_function(self, function, addresses, raise_exception=True):
+        self.batches.append(len(addresses))
+        return [self._result(function.fn_name, a) for a in addresses]
+
+
+class TestAudit(unittest.TestCase):
+    def test_vesting_summaries(self):
+        client = FakeClient(
+            {
+                ("vestings", bytes.fromhex(f"{1:064x}")): vesting_tuple(address(1), 30),
+                ("calculateVestedAmount", bytes.fromhex(f"{1:064x}")): (50, 30),
+                # Not redeemed: the vesting account is empty.
+                ("vestings", bytes.fromhex(f"{2:064x}")): vesting_tuple(
+                    ZERO_ADDRESS, 0
+                ),
+                # Redeemed, but the vested amount could not be read (None).
+                ("vestings", bytes.fromhex(f"{3:064x}")): vesting_tuple(address(2), 7),
+            }
+        )
+        summaries = vesting_summaries(
+            client,
+            {
+                address(1): [allocation(1, 100), allocation(2, 20)],
+                address(2): [allocation(3, 10), allocation(4, 5)],
+                address(3): [],
+            },
+        )
+        # All vestings in a single batch request.
+        self.assertEqual(client.batches, [8])
+        self.assertEqual(summaries[address(1)].allocations, 2)
+        self.assertEqual(summaries[address(1)].allocated, 120)
+        self.assertEqual(summaries[address(1)].redeemed, 1)
+        self.assertEqual(summaries[address(1)].claimed, 30)
+        self.assertEqual(summaries[address(1)].vested_unclaimed, 20)
+        self.assertEqual(summaries[address(2)].redeemed, 1)
+        self.assertEqual(summaries[address(2)].claimed, 7)
+        self.assertEqual(summaries[address(2)].vested_unclaimed, 0)
+        self.assertEqual(summaries[address(3)].allocations, 0)
+
+    def test_read_child_states(self):
+        children = [address(1), address(2), address(3)]
+        client = FakeClient(
+            {
+                ("getOwners", address(1)): [address(9)],
+                ("getThreshold", address(1)): 1,
+                ("nonce", address(1)): 4,
+                ("delegation", address(1)): address(8),
+                ("balanceOf", address(1)): 10,
+                ("getOwners", address(3)): [address(9), address(7)],
+                ("getThreshold", address(3)): 2,
+                ("nonce", address(3)): 0,
+                ("balanceOf", address(3)): 0,
+            }
+        )
+        with patch("src.audit.READ_CHUNK", 2):
+            states = read_child_states(client, children)
+        # Owners, threshold and nonce per 2 children, then 6 token reads per 2.
+        self.assertEqual(client.batches, [2, 1, 2, 1, 2, 1, 2, 2, 2])
+        self.assertEqual(states[0], ([address(9)], 1, 4, address(8), 10))
+        # Non-Safe addresses (failing calls) read as None.
+        self.assertEqual(states[1], (None, None, None, None, None))
+        self.assertEqual(states[2], ([address(9), address(7)], 2, 0, None, 0))
+
+    def test_read_child_states_off_mainnet(self):
+        client = FakeClient({("getThreshold", address(1)): 1})
+        states = read_child_states(client, [address(1)], mainnet=False)
+        self.assertEqual(client.batches, [1, 1, 1])
+        self.assertEqual(states, [(None, 1, None, None, None)])
+
+    def test_audit_fleet(self):
+        parent = address(9)
+        client = FakeClient(
+            {
+                ("getOwners", address(1)): [parent],
+                ("getThreshold", address(1)): 1,
+                ("nonce", address(1)): 4,
+                ("getOwners", address(2)): [address(7)],
+                ("vestings", bytes.fromhex(f"{1:064x}")): vesting_tuple(address(1), 3),
+                ("calculateVestedAmount", bytes.fromhex(f"{1:064x}")): (8, 3),
+            }
+        )
+        family = SimpleNamespace(
+            parent=parent, children=[address(1), address(2)], chain=Chain.GNOSIS
+        )
+        with patch(
+            "src.audit.fetch_allocations",
+            return_value={address(1): [allocation(1, 10)], address(2): []},
+        ):
+            reports = audit_fleet(client, family)
+
+        self.assertEqual([r.safe for r in reports], family.children)
+        self.assertEqual(reports[0].owners, parent)
+        self.assertTrue(reports[0].parent_is_owner)
+        self.assertEqual((reports[0].threshold, reports[0].nonce), (1, 4))
+        self.assertEqual((reports[0].claimed, reports[0].vested_unclaimed), (3, 5))
+        self.assertFalse(reports[1].parent_is_owner)
+        self.assertEqual(reports[1].allocations, 0)
+        # Mainnet only columns
+        self.assertIsNone(reports[0].delegate)
+        self.assertIsNone(reports[0].safe_balance)
+
+    def test_write_audit_csv(self):
+        report = ChildReport(
+            safe="0x8baf303407eB4eA42f18bDEC84f7d3BbE48C9046",
+            owners="0x206a9EAa7d0f9637c905F2Bf86aCaB363Abb418c",
+            threshold=1,
+            nonce=3,
+            parent_is_owner=True,
+            delegate="0x206a9EAa7d0f9637c905F2Bf86aCaB363Abb418c",
+            safe_balance=10**18,
+            allocations=2,
+            redeemed=1,
+            allocated=3 * 10**18,
+            claimed=10**18,
+            vested_unclaimed=5,
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "audit.csv"
+            write_audit_csv([report], path)
+            with open(path, encoding="utf-8") as file:
+                rows = list(csv.DictReader(file))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["safe"], report.safe)
+        self.assertEqual(rows[0]["threshold"], "1")
+        self.assertEqual(rows[0]["parent_is_owner"], "True")
+        self.assertEqual(rows[0]["allocated"], str(3 * 10**18))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+
+from src.chains import Chain
+
+
+class TestChain(unittest.TestCase):
+    def test_from_str(self):
+        self.assertEqual(Chain.from_str("gnosis"), Chain.GNOSIS)
+        self.assertEqual(Chain.from_str("Ethereum"), Chain.ETHEREUM)
+        with self.assertRaises(ValueError):
+            Chain.from_str("solana")
+
+    def test_from_chain_id(self):
+        self.assertEqual(Chain.from_chain_id(100), Chain.GNOSIS)
+        with self.assertRaises(ValueError):
+            Chain.from_chain_id(5)
+
+    def test_chain_identifiers(self):
+        self.assertEqual(str(Chain.ARBITRUM), "arbitrum")
+        self.assertEqual(Chain.GNOSIS.dune_name, "gnosis")
+        self.assertEqual(Chain.GNOSIS.short_name, "gno")
+        self.assertEqual(
+            Chain.ETHEREUM.transaction_service_url,
+            "https://safe-transaction-mainnet.safe.global",
+        )
+        self.assertEqual(
+            Chain.GNOSIS.transaction_service_url,
+            "https://safe-transaction-gnosis-chain.safe.global",
+        )
+        for chain in Chain:
+            # All properties are defined for every chain.
+            self.assertTrue(chain.short_name and chain.default_node_url)
+
+
+if __name__ == "__main__":
+    unittest.main()
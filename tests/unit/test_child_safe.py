@@ -0,0 +1,56 @@
+import sys
+import unittest
+from types import SimpleNamespace
+
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from gnosis.safe import Safe, SafeOperation
+from web3 import Web3
+
+from src.child_safe import ChildSafe
+from src.constants import ZERO_ADDRESS
+from src.safe import SafeTransaction, encode_exec_transaction
+from helpers import address
+
+
+class TestChildSafe(unittest.TestCase):
+    def setUp(self) -> None:
+        self.address = address(10)
+        self.owner = address(1)
+        self.contract = get_safe_V1_3_0_contract(Web3())
+
+    def test_slots(self):
+        child = ChildSafe(self.address, None)
+        self.assertFalse(hasattr(child, "__dict__"))
+        self.assertLess(sys.getsizeof(child), 100)
+        self.assertEqual(str(child), f"Safe={self.address}")
+
+    def test_encode_matches_web3(self):
+        child = ChildSafe(self.address, None)
+        self.assertEqual(
+            child.encode("addOwnerWithThreshold", [self.owner, 2]),
+            self.contract.encodeABI("addOwnerWithThreshold", [self.owner, 2]),
+        )
+
+    def test_encode_exec_transaction(self):
+        transaction = SafeTransaction(
+            to=self.owner, value=1, data="0x1234", operation=SafeOperation.CALL
+        )
+        data = encode_exec_transaction(
+            ChildSafe(self.address, None), self.owner, transaction
+        )
+        function, params = self.contract.decode_function_input(data)
+        self.assertEqual(function.fn_name, "execTransaction")
+        self.assertEqual(params["to"], self.owner)
+        self.assertEqual(params["data"], bytes.fromhex("1234"))
+        self.assertEqual(params["refundReceiver"], ZERO_ADDRESS)
+        self.assertEqual(params["signatures"][12:32], bytes.fromhex(self.owner[2:]))
+
+    def test_as_safe_is_built_once(self):
+        child = ChildSafe(self.address, SimpleNamespace(w3=Web3()))
+        safe = child.as_safe()
+        self.assertIsInstance(safe, Safe)
+        self.assertIs(child.as_safe(), safe)
+
+
+if __name__ == "__main__":
+    unittest.main()
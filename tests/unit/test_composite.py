@@ -0,0 +1,76 @@
+import unittest
+
+from gnosis.safe import SafeOperation
+from gnosis.safe.multi_send import MultiSend, MultiSendOperation
+
+from src.child_safe import SAFE_ABI, ChildSafe
+from src.composite import composite_transactions, unwrap
+from src.multisend import MULTISEND_CONTRACT, build_multisend_from_data
+from src.safe import SafeTransaction, encode_exec_transaction
+from helpers import address
+
+
+def call_builder(target, data, only=None):
+    """Builder calling `target` with `data` from every child (or only from `only`)"""
+
+    def build(parent, children):
+        transaction = SafeTransaction(
+            to=target, value=0, data=data, operation=SafeOperation.CALL
+        )
+        return [
+            build_multisend_from_data(
+                child, encode_exec_transaction(child, parent.address, transaction)
+            )
+            for child in children
+            if only is None or child.address == only
+        ]
+
+    return build
+
+
+class TestComposite(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parent = ChildSafe(address(1), None)
+        self.children = [ChildSafe(address(10 + i), None) for i in range(3)]
+
+    def test_unwrap(self):
+        wrapper = call_builder(address(5), "0xabcd")(self.parent, self.children)[0]
+        call = unwrap(wrapper)
+        self.assertEqual(call.to, address(5))
+        self.assertEqual(call.data, bytes.fromhex("abcd"))
+        self.assertEqual(call.operation, MultiSendOperation.CALL)
+        with self.assertRaises(ValueError):
+            SAFE_ABI.encoder("execTransaction").decode(bytes.fromhex("abcd") * 2)
+
+    def test_one_transaction_per_child(self):
+        first = call_builder(address(5), "0x01")
+        second = call_builder(address(6), "0x02", only=self.children[0].address)
+        transactions = composite_transactions(
+            self.parent, self.children, [first, second]
+        )
+        self.assertEqual(
+            [tx.to for tx in transactions], [c.address for c in self.children]
+        )
+        # Single operations keep their plain wrapper
+        self.assertEqual(transactions[1:], first(self.parent, self.children)[1:])
+        args = SAFE_ABI.encoder("execTransaction").decode(transactions[0].data)
+        self.assertEqual(args[0], MULTISEND_CONTRACT.lower())
+        self.assertEqual(args[3], SafeOperation.DELEGATE_CALL.value)
+        inner = MultiSend.from_transaction_data(args[2])
+        self.assertEqual(
+            [(tx.to, tx.data) for tx in inner],
+            [(address(5), b"\x01"), (address(6), b"\x02")],
+        )
+
+    def test_foreign_target(self):
+        outsider = call_builder(address(5), "0x01")
+        with self.assertRaises(ValueError):
+            composite_transactions(
+                self.parent,
+                self.children,
+                [lambda p, _: outsider(p, [ChildSafe(address(99), None)])],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+from web3 import Web3
+
+from src.abis.encoder import MethodEncoder, normalize_arg
+from src.abis.load import load_contract_abi
+from src.contract_call import substitute
+
+
+class TestMethodEncoder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.receiver = Web3.to_checksum_address(
+            "0xde786877a10dbb7eba25a4da65aecf47654f08ab"
+        )
+
+    def test_encode_matches_web3(self):
+        for abi_name, method, args in [
+            ("erc20", "transfer", [self.receiver, 15]),
+            (
+                "delegate_registry",
+                "setDelegate",
+                [
+                    "0x736166652e657468000000000000000000000000000000000000000000000000",
+                    self.receiver,
+                ],
+            ),
+            (
+                "airdrop",
+                "redeem",
+                [0, 416, 1538042400, "1854720164105111994368", ["0x" + "11" * 32]],
+            ),
+        ]:
+            abi = load_contract_abi(abi_name)
+            encoder = MethodEncoder.from_abi(abi, method)
+            contract = Web3().eth.contract(abi=abi)
+            expected = contract.encodeABI(
+                method,
+                [normalize_arg(t, a) for t, a in zip(encoder.input_types, args)],
+            )
+            self.assertEqual(encoder.encode(args), expected)
+
+    def test_selector_and_signature(self):
+        encoder = MethodEncoder.from_abi(load_contract_abi("erc20"), "transfer")
+        self.assertEqual(encoder.signature, "transfer(address,uint256)")
+        self.assertEqual(encoder.selector.hex(), "a9059cbb")
+        self.assertEqual(
+            MethodEncoder.from_abi(
+                load_contract_abi("erc20"), "transfer(address,uint256)"
+            ),
+            encoder,
+        )
+
+    def test_invalid_usage(self):
+        encoder = MethodEncoder.from_abi(load_contract_abi("erc20"), "transfer")
+        with self.assertRaises(ValueError):
+            encoder.encode([self.receiver])
+        with self.assertRaises(ValueError):
+            MethodEncoder.from_abi(load_contract_abi("erc20"), "allowance")
+
+    def test_normalize_arg(self):
+        self.assertEqual(normalize_arg("uint256", "0x10"), 16)
+        self.assertEqual(normalize_arg("uint256[]", ["1", 2]), [1, 2])
+        self.assertEqual(normalize_arg("bytes32", "0x01"), b"\x01")
+        self.assertEqual(normalize_arg("bool", "True"), True)
+        self.assertEqual(normalize_arg("address", self.receiver), self.receiver)
+
+    def test_substitute(self):
+        self.assertEqual(
+            substitute(["{parent}", ["{child}", 1], 2], "0xP", "0xC"),
+            ["0xP", ["0xC", 1], 2],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,242 @@
+import json
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from http.client import HTTPConnection
+from pathlib import Path
+from unittest.mock import patch
+
+from src.chains import Chain
+from src.daemon import (
+    JobQueue,
+    JobStatus,
+    lane_lock,
+    parse_job,
+    queued_nonce,
+    run_exec_job,
+    serve,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+
+class UnixConnection(HTTPConnection):
+    """HTTP connection over the Unix socket at `path`"""
+
+    def __init__(self, path):
+        super().__init__("localhost", timeout=5)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self) -> None:
+        self.release = threading.Event()
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+        self.jobs = JobQueue(runner=self.runner, workers=2)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket = Path(self.tmp.name) / "daemon" / "daemon.sock"
+        self.server = serve(self.jobs, self.socket)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.release.set()
+        self.server.shutdown()
+        self.server.server_close()
+        self.jobs.shutdown()
+        self.tmp.cleanup()
+
+    def runner(self, args):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.release.wait(timeout=5)
+        with self.lock:
+            self.running -= 1
+        if args == ["--fail"]:
+            raise ValueError("bad job")
+        return [len(args)]
+
+    def request(self, path, body=None, content_type="application/json"):
+        connection = UnixConnection(str(self.socket))
+        try:
+            if body is None:
+                connection.request("GET", path)
+            else:
+                data = json.dumps(body).encode()
+                connection.request(
+                    "POST", path, data, headers={"Content-Type": content_type}
+                )
+            response = connection.getresponse()
+            content = json.loads(response.read())
+        finally:
+            connection.close()
+        if response.status >= 400:
+            raise HTTPError(response.status)
+        return response.status, content
+
+    def wait_for(self, job_id):
+        for _ in range(100):
+            _, job = self.request(f"/jobs/{job_id}")
+            if job["status"] in ("done", "failed"):
+                return job
+            time.sleep(0.05)
+        self.fail(f"job {job_id} did not finish")
+
+    def test_job_lifecycle(self):
+        status, job = self.request("/jobs", {"args": ["--command", "CLAIM"]})
+        self.assertEqual(status, 202)
+        self.assertIn(job["status"], [str(JobStatus.QUEUED), str(JobStatus.RUNNING)])
+        self.release.set()
+        job = self.wait_for(job["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertEqual(job["nonces"], [2])
+        self.assertIsNotNone(job["finished"])
+
+        _, failing = self.request("/jobs", {"args": ["--fail"]})
+        failing = self.wait_for(failing["id"])
+        self.assertEqual(failing["status"], "failed")
+        self.assertEqual(failing["error"], "bad job")
+
+        _, jobs = self.request("/jobs")
+        self.assertEqual([j["id"] for j in jobs], [job["id"], failing["id"]])
+
+    def test_bounded_concurrency(self):
+        ids = [self.request("/jobs", {"args": [str(i)]})[1]["id"] for i in range(5)]
+        time.sleep(0.2)
+        self.assertEqual(self.max_running, 2)
+        self.release.set()
+        for job_id in ids:
+            self.assertEqual(self.wait_for(job_id)["status"], "done")
+        self.assertEqual(self.max_running, 2)
+
+    def test_pending_limit(self):
+        with patch("src.daemon.MAX_PENDING_JOBS", 1):
+            self.request("/jobs", {"args": []})
+            with self.assertRaises(HTTPError) as err:
+                self.request("/jobs", {"args": []})
+            self.assertEqual(err.exception.code, 503)
+
+    def test_invalid_requests(self):
+        with self.assertRaises(HTTPError) as err:
+            self.request("/jobs/unknown")
+        self.assertEqual(err.exception.code, 404)
+        with self.assertRaises(HTTPError) as err:
+            self.request("/jobs", {"arguments": []})
+        self.assertEqual(err.exception.code, 400)
+        with self.assertRaises(HTTPError) as err:
+            self.request("/other", {"args": []})
+        self.assertEqual(err.exception.code, 404)
+
+    def test_content_type_required(self):
+        for content_type in ["text/plain", "application/x-www-form-urlencoded"]:
+            with self.assertRaises(HTTPError) as err:
+                self.request("/jobs", {"args": []}, content_type=content_type)
+            self.assertEqual(err.exception.code, 415)
+        status, _ = self.request(
+            "/jobs", {"args": []}, content_type="application/json; charset=utf-8"
+        )
+        self.assertEqual(status, 202)
+
+    def test_unsupported_arguments(self):
+        for args in [["--yes"], ["--plan=plan.json"], ["--gas-ceiling", "5"]]:
+            with self.assertRaises(HTTPError) as err:
+                self.request("/jobs", {"args": ["--command", "CLAIM", *args]})
+            self.assertEqual(err.exception.code, 400)
+        self.assertEqual(self.jobs.all(), [])
+
+    def test_socket_private(self):
+        mode = self.socket.stat().st_mode
+        self.assertTrue(stat.S_ISSOCK(mode))
+        self.assertEqual(stat.S_IMODE(mode), 0o600)
+        self.assertEqual(stat.S_IMODE(self.socket.parent.stat().st_mode), 0o700)
+
+    def test_finished_jobs_evicted(self):
+        self.release.set()
+        with patch("src.daemon.MAX_FINISHED_JOBS", 2):
+            ids = [self.request("/jobs", {"args": [str(i)]})[1]["id"] for i in range(4)]
+            for job_id in ids[-2:]:
+                self.wait_for(job_id)
+            for _ in range(100):
+                if len(self.jobs.all()) == 2:
+                    break
+                time.sleep(0.05)
+        self.assertEqual(len(self.jobs.all()), 2)
+        self.assertTrue(all(j["status"] == "done" for j in self.jobs.all()))
+
+
+class TestExecJob(unittest.TestCase):
+    def test_invalid_arguments(self):
+        with self.assertRaisesRegex(ValueError, "invalid job arguments"):
+            run_exec_job(["--command", "NOT_A_COMMAND"])
+
+    def test_parse_without_argv(self):
+        argv = list(sys.argv)
+        families, _ = parse_job(
+            [
+                "--command",
+                "CLAIM",
+                "--parent",
+                "0x0000000000000000000000000000000000000001",
+                "--sub-safes",
+                "0x0000000000000000000000000000000000000002",
+            ]
+        )
+        self.assertEqual(sys.argv, argv)
+        self.assertEqual(
+            families[0].children, ["0x0000000000000000000000000000000000000002"]
+        )
+
+    def test_queued_nonce(self):
+        safe = SimpleNamespace(address="0xSafe", retrieve_nonce=lambda: 5)
+        queued = [
+            {"nonce": 7, "isExecuted": False},
+            {"nonce": 6, "isExecuted": False},
+            {"nonce": 4, "isExecuted": True},
+        ]
+        service = SimpleNamespace(get_transactions=lambda address: queued)
+        self.assertEqual(queued_nonce(safe, service), 8)
+        queued.clear()
+        self.assertEqual(queued_nonce(safe, service), 5)
+
+    def test_lane_lock(self):
+        parent, other = "0x" + "01" * 20, "0x" + "02" * 20
+        self.assertIs(lane_lock(Chain.GNOSIS, parent), lane_lock(Chain.GNOSIS, parent))
+        self.assertIsNot(
+            lane_lock(Chain.GNOSIS, parent), lane_lock(Chain.GNOSIS, other)
+        )
+        self.assertIsNot(
+            lane_lock(Chain.GNOSIS, parent), lane_lock(Chain.ETHEREUM, parent)
+        )
+
+    def test_audit_rejected(self):
+        with self.assertRaisesRegex(ValueError, "AUDIT"):
+            run_exec_job(
+                [
+                    "--command",
+                    "AUDIT",
+                    "--parent",
+                    "0x0000000000000000000000000000000000000001",
+                    "--sub-safes",
+                    "0x0000000000000000000000000000000000000002",
+                ]
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,24 @@
+import json
+import tempfile
 import unittest
-from src.snapshot.delegate_registry import DelegationId
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from web3 import Web3
+
+from src.child_safe import ChildSafe
+from src.snapshot.delegate_registry import DELEGATION_CONTRACT, DelegationId
+from src.snapshot.tx import SnapshotArgs, SnapshotCommand, transactions_for
+from helpers import address
+
+
+def fake_safe(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        address=address(i),
+        contract=get_safe_V1_3_0_contract(Web3()),
+    )
 
 
 class MyTestCase(unittest.TestCase):
@@ -26,5 +45,87 @@ class MyTestCase(unittest.TestCase):
         )
 
 
+class TestSnapshotTransactions(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parent = fake_safe(1)
+        self.children = [ChildSafe(fake_safe(i).address, None) for i in (10, 11)]
+        self.delegate = address(99)
+
+    def test_from_args(self):
+        with tempfile.TemporaryDirectory() as directory:
+            delegates_file = Path(directory) / "delegates.json"
+            delegates_file.write_text(
+                json.dumps({self.children[0].address.lower(): self.delegate.lower()})
+            )
+            argv = ["exec", "--spaces", "safe.eth,cow.eth"]
+            argv += ["--delegates-file", str(delegates_file)]
+            with mock.patch("sys.argv", argv):
+                args = SnapshotArgs.from_args()
+        self.assertEqual(
+            args.spaces,
+            [DelegationId.from_str("safe.eth"), DelegationId.from_str("cow.eth")],
+        )
+        self.assertEqual(
+            args.delegate_for(self.parent, self.children[0]), self.delegate
+        )
+        self.assertEqual(
+            args.delegate_for(self.parent, self.children[1]), self.parent.address
+        )
+
+    def inner_calls(self, transactions):
+        safe = self.parent.contract
+        calls = []
+        for transaction in transactions:
+            _, exec_params = safe.decode_function_input(transaction.data)
+            function, params = DELEGATION_CONTRACT.decode_function_input(
+                exec_params["data"]
+            )
+            calls.append((transaction.to, function.fn_name, params))
+        return calls
+
+    def test_set_delegate_matrix(self):
+        spaces = [DelegationId.from_str("safe.eth"), DelegationId.from_str("cow.eth")]
+        args = SnapshotArgs(
+            spaces=spaces,
+            delegate=self.delegate,
+            delegates_by_child={self.children[1].address: self.parent.address},
+        )
+        calls = self.inner_calls(
+            transactions_for(
+                self.parent, self.children, SnapshotCommand.SET_DELEGATE, args
+            )
+        )
+        self.assertEqual(
+            calls,
+            [
+                (
+                    child.address,
+                    "setDelegate",
+                    {"id": space.bytes, "delegate": delegate},
+                )
+                for child, delegate in zip(
+                    self.children, [self.delegate, self.parent.address]
+                )
+                for space in spaces
+            ],
+        )
+
+    def test_clear_delegate_defaults(self):
+        calls = self.inner_calls(
+            transactions_for(self.parent, self.children, SnapshotCommand.CLEAR_DELEGATE)
+        )
+        self.assertEqual(
+            [(to, name, params["id"]) for to, name, params in calls],
+            [
+                (
+                    child.address,
+                    "clearDelegate",
+                    DelegationId.from_str("safe.eth").bytes,
+                )
+                for child in self.children
+            ],
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+from web3 import Web3
+
+from src.disperse import (
+    DISPERSE_BATCH_SIZE,
+    DISPERSE_CONTRACT,
+    DISPERSE_ETHER,
+    DISPERSE_TOKEN,
+    ERC20_APPROVE,
+    TransferBackend,
+    distribution_batches,
+)
+from src.multisend import BATCH_SIZE_LIMIT
+from src.token_transfer import Token, Transfer
+from helpers import address
+
+
+class TestDisperse(unittest.TestCase):
+    def setUp(self) -> None:
+        self.token = Token(address(1), decimals=18)
+
+    def transfers(self, count, token=None):
+        return [Transfer(token, address(1000 + i), 10**18 + i) for i in range(count)]
+
+    def test_auto_backend(self):
+        # A single transfer is cheaper as a plain call ...
+        single = distribution_batches(self.transfers(1, self.token))
+        self.assertEqual(single, [[self.transfers(1, self.token)[0].as_multisend_tx()]])
+        # ... while many transfers of a token go through one Disperse call.
+        transfers = self.transfers(100, self.token)
+        [[approve, disperse]] = distribution_batches(transfers)
+        self.assertEqual(approve.to, self.token.address)
+        total = sum(t.amount_wei for t in transfers)
+        self.assertEqual(
+            ERC20_APPROVE.decode(approve.data), (DISPERSE_CONTRACT.lower(), total)
+        )
+        self.assertEqual(disperse.to, DISPERSE_CONTRACT)
+        token, receivers, amounts = DISPERSE_TOKEN.decode(disperse.data)
+        self.assertEqual(token, self.token.address.lower())
+        self.assertEqual(
+            [Web3.to_checksum_address(r) for r in receivers],
+            [t.receiver for t in transfers],
+        )
+        self.assertEqual(list(amounts), [t.amount_wei for t in transfers])
+
+    def test_ether(self):
+        transfers = self.transfers(50)
+        # disperseEther is only used on request (receivers may be contracts).
+        self.assertEqual(
+            distribution_batches(transfers),
+            [[transfer.as_multisend_tx() for transfer in transfers]],
+        )
+        [[disperse]] = distribution_batches(transfers, TransferBackend.DISPERSE)
+        self.assertEqual(disperse.value, sum(t.amount_wei for t in transfers))
+        self.assertEqual(len(DISPERSE_ETHER.decode(disperse.data)[0]), 50)
+
+    def test_batch_sizes(self):
+        count = 2 * DISPERSE_BATCH_SIZE + 10
+        batches = distribution_batches(
+            self.transfers(count, self.token), TransferBackend.DISPERSE
+        )
+        # One (approve, disperse) pair per batch of at most DISPERSE_BATCH_SIZE.
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 2])
+        self.assertEqual(
+            [len(DISPERSE_TOKEN.decode(batch[1].data)[1]) for batch in batches],
+            [DISPERSE_BATCH_SIZE, DISPERSE_BATCH_SIZE, 10],
+        )
+        multisend = distribution_batches(
+            self.transfers(count, self.token), TransferBackend.MULTISEND
+        )
+        self.assertEqual(len(multisend), 5)
+
+    def test_many_small_groups(self):
+        # Transfers of many tokens, each through an (approve, disperse) pair.
+        transfers = [
+            transfer
+            for i in range(BATCH_SIZE_LIMIT)
+            for transfer in self.transfers(2, Token(address(2000 + i), decimals=18))
+        ]
+        batches = distribution_batches(transfers, TransferBackend.DISPERSE)
+        self.assertEqual(sum(len(batch) for batch in batches), 2 * BATCH_SIZE_LIMIT)
+        self.assertLessEqual(max(len(batch) for batch in batches), BATCH_SIZE_LIMIT)
+        # Approvals stay in order before their Disperse call.
+        flat = [tx for batch in batches for tx in batch]
+        self.assertEqual(
+            [tx.to for tx in flat[1::2]], [DISPERSE_CONTRACT] * BATCH_SIZE_LIMIT
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
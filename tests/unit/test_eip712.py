@@ -0,0 +1,79 @@
+import unittest
+
+from eth_account import Account
+from gnosis.safe import SafeOperation, SafeTx
+from gnosis.safe.safe_signature import SafeSignature
+
+from src.eip712 import HashedSafeTx, SafeTxHasher, domain_separator
+from helpers import address
+
+
+def reference_hash(safe, chain_id, version, to, value, data, operation, nonce):
+    """Hash of safe-eth-py's generic EIP-712 encoding"""
+    return SafeTx(
+        None,
+        safe,
+        to,
+        value,
+        data,
+        operation,
+        0,
+        0,
+        0,
+        None,
+        None,
+        safe_nonce=nonce,
+        safe_version=version,
+        chain_id=chain_id,
+    ).safe_tx_hash
+
+
+class TestSafeTxHasher(unittest.TestCase):
+    def setUp(self) -> None:
+        self.safe = address(0xABCDEF)
+        self.payloads = [
+            (address(1), 0, b"", SafeOperation.CALL.value, 0),
+            (address(2), 10**18, bytes(range(200)), SafeOperation.CALL.value, 7),
+            (
+                address(3),
+                0,
+                b"\x8d\x80\xff\x0a" * 50,
+                SafeOperation.DELEGATE_CALL.value,
+                2**40,
+            ),
+        ]
+
+    def test_matches_safe_tx_hash(self):
+        for version in ["1.4.1", "1.3.0", "1.3.0+L2", "1.1.1", "0.1.0"]:
+            for chain_id in [1, 100]:
+                hasher = SafeTxHasher(chain_id, self.safe, version)
+                expected = [
+                    bytes(reference_hash(self.safe, chain_id, version, *payload))
+                    for payload in self.payloads
+                ]
+                self.assertEqual(hasher.hash_many(self.payloads), expected, version)
+
+    def test_domain_separator_is_cached(self):
+        domain_separator.cache_clear()
+        for _ in range(3):
+            SafeTxHasher(1, self.safe, "1.3.0")
+        info = domain_separator.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 2))
+
+    def test_sign(self):
+        account = Account.create()
+        hasher = SafeTxHasher(1, self.safe, "1.3.0")
+        safe_tx = HashedSafeTx(hasher, *self.payloads[1])
+        self.assertEqual(
+            safe_tx.safe_tx_hash,
+            reference_hash(self.safe, 1, "1.3.0", *self.payloads[1]),
+        )
+        safe_tx.sign(account.key.hex())
+        [signature] = SafeSignature.parse_signature(
+            safe_tx.signatures, safe_tx.safe_tx_hash
+        )
+        self.assertEqual(signature.owner, account.address)
+
+
+if __name__ == "__main__":
+    unittest.main()
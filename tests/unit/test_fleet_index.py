@@ -0,0 +1,208 @@
+import unittest
+
+from eth_abi.abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.chains import Chain
+from src.fleet_index import (
+    ADDED_OWNER_TOPIC,
+    CHANGED_THRESHOLD_TOPIC,
+    REMOVED_OWNER_TOPIC,
+    SAFE_SETUP_TOPIC,
+    FleetIndex,
+    SafeState,
+    decode_owner_event,
+    discover_children,
+    update_index,
+)
+from helpers import address
+
+
+def owner_log(safe, topic, value, block, indexed=False):
+    word = HexBytes(value).rjust(32, b"\x00")
+    return {
+        "address": safe.lower(),
+        "topics": [topic, word] if indexed else [topic],
+        "data": b"" if indexed else word,
+        "blockNumber": hex(block),
+        "logIndex": "0x0",
+    }
+
+
+def setup_log(safe, owners, block):
+    return {
+        "address": safe.lower(),
+        "topics": [SAFE_SETUP_TOPIC, HexBytes(32)],
+        "data": encode(
+            ["address[]", "uint256", "address", "address"],
+            [owners, 1, address(0), address(0)],
+        ),
+        "blockNumber": hex(block),
+        "logIndex": "0x0",
+    }
+
+
+class FakeChain:
+    """Answers log scans and Safe state reads of the fleet index"""
+
+    def __init__(self, setups, owner_logs, states):
+        self.w3 = Web3()
+        self.current_block_number = 200
+        self.setups = setups
+        self.owner_logs = owner_logs
+        self.states = {state.address: state for state in states}
+
+    def raw_batch_request(self, payload):
+        # Discovery scans are not restricted to addresses.
+        return [
+            self.owner_logs if "address" in request["params"][0] else self.setups
+            for request in payload
+        ]
+
+    def batch_call_same_function(self, function, addresses, raise_exception=True):
+        field = {"getOwners": "owners", "getThreshold": "threshold"}.get(
+            function.fn_name, "version"
+        )
+        return [
+            getattr(self.states[a], field) if a in self.states else None
+            for a in addresses
+        ]
+
+
+class TestFleetIndex(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parent = address(1)
+        self.other = address(2)
+        self.children = [address(10 + i) for i in range(4)]
+        self.index = FleetIndex(":memory:")
+        self.index.add_edges(Chain.ETHEREUM, self.parent, self.children)
+        self.index.record_states(
+            Chain.ETHEREUM,
+            [
+                SafeState(self.children[0], [self.parent], 1, "1.3.0"),
+                SafeState(self.children[1], [self.parent, self.other], 1, "1.3.0"),
+                SafeState(self.children[2], [self.parent], 2, "1.3.0"),
+                SafeState(self.children[3], [self.other], 1, "1.4.1"),
+            ],
+            block=100,
+        )
+
+    def test_queries(self):
+        chain = Chain.ETHEREUM
+        # Not the last child: the parent is no longer one of its owners.
+        self.assertEqual(self.index.children(chain, self.parent), self.children[:3])
+        self.assertEqual(
+            self.index.children(chain, self.parent, threshold=1, sole_owner=True),
+            [self.children[0]],
+        )
+        self.assertEqual(
+            self.index.children(chain, self.parent, sole_owner=True),
+            [self.children[0], self.children[2]],
+        )
+        self.assertEqual(
+            self.index.owned_by(chain, self.other), [self.children[1], self.children[3]]
+        )
+        self.assertEqual(self.index.children(Chain.GNOSIS, self.parent), [])
+        self.assertEqual(self.index.synced_block(chain), 100)
+
+    def test_decode_owner_event(self):
+        legacy = decode_owner_event(
+            owner_log(self.children[0], ADDED_OWNER_TOPIC, self.other, 101)
+        )
+        indexed = decode_owner_event(
+            owner_log(self.children[0], ADDED_OWNER_TOPIC, self.other, 101, True)
+        )
+        self.assertEqual(legacy, indexed)
+        self.assertEqual(legacy.value, self.other)
+        self.assertEqual(legacy.block, 101)
+        threshold = decode_owner_event(
+            owner_log(self.children[0], CHANGED_THRESHOLD_TOPIC, 2, 102)
+        )
+        self.assertEqual(threshold.value, 2)
+        self.assertIsNone(
+            decode_owner_event(owner_log(self.children[0], HexBytes(32), 2, 102))
+        )
+
+    def test_apply_events(self):
+        chain = Chain.ETHEREUM
+        events = [
+            decode_owner_event(entry)
+            for entry in [
+                # already reflected in the recorded state
+                owner_log(self.children[0], REMOVED_OWNER_TOPIC, self.parent, 100),
+                owner_log(self.children[1], REMOVED_OWNER_TOPIC, self.other, 101),
+                owner_log(self.children[2], CHANGED_THRESHOLD_TOPIC, 1, 102),
+                owner_log(self.children[0], ADDED_OWNER_TOPIC, self.other, 103),
+                # not indexed
+                owner_log(address(99), ADDED_OWNER_TOPIC, self.other, 103),
+            ]
+        ]
+        self.assertEqual(self.index.apply_events(chain, events), 3)
+        self.assertEqual(
+            self.index.children(chain, self.parent, threshold=1, sole_owner=True),
+            [self.children[1], self.children[2]],
+        )
+        # Children leave (and rejoin) the family with the parent's ownership.
+        removed = decode_owner_event(
+            owner_log(self.children[2], REMOVED_OWNER_TOPIC, self.parent, 104)
+        )
+        self.index.apply_events(chain, [removed])
+        self.assertEqual(self.index.children(chain, self.parent), self.children[:2])
+        added = decode_owner_event(
+            owner_log(self.children[2], ADDED_OWNER_TOPIC, self.parent, 105)
+        )
+        self.index.apply_events(chain, [added])
+        self.assertEqual(self.index.children(chain, self.parent), self.children[:3])
+        state = self.index.state(chain, self.children[0])
+        self.assertEqual(state.owners, sorted([self.parent, self.other]))
+        self.assertEqual(state.version, "1.3.0")
+
+    def test_discover_children(self):
+        entries = [
+            setup_log(address(20), [self.other, self.parent], 101),
+            owner_log(address(21), ADDED_OWNER_TOPIC, self.parent, 102, True),
+            owner_log(address(22), ADDED_OWNER_TOPIC, self.parent, 102),
+            owner_log(address(23), REMOVED_OWNER_TOPIC, self.parent, 103),
+            owner_log(address(24), ADDED_OWNER_TOPIC, address(99), 103),
+            owner_log(address(20), ADDED_OWNER_TOPIC, self.parent, 104),
+        ]
+        self.assertEqual(
+            discover_children(entries, [self.parent, self.other]),
+            {
+                self.parent: [address(20), address(21), address(22)],
+                self.other: [address(20)],
+            },
+        )
+
+    def test_update_discovers_new_children(self):
+        chain = Chain.ETHEREUM
+        new, removed_again, known = address(20), address(21), self.children[0]
+        client = FakeChain(
+            setups=[
+                setup_log(new, [self.parent], 150),
+                owner_log(removed_again, ADDED_OWNER_TOPIC, self.parent, 151),
+                owner_log(known, ADDED_OWNER_TOPIC, self.parent, 152),
+            ],
+            owner_logs=[
+                # Already reflected in the state of the new child.
+                owner_log(new, ADDED_OWNER_TOPIC, self.other, 160),
+                owner_log(known, ADDED_OWNER_TOPIC, self.other, 161),
+            ],
+            states=[
+                SafeState(new, [self.parent, self.other], 1, "1.3.0"),
+                SafeState(removed_again, [self.other], 1, "1.3.0"),
+            ],
+        )
+        self.assertEqual(update_index(self.index, client, chain), 1)
+        self.assertEqual(
+            self.index.children(chain, self.parent), self.children[:3] + [new]
+        )
+        self.assertEqual(
+            self.index.state(chain, new).owners, sorted([self.parent, self.other])
+        )
+        self.assertEqual(self.index.synced_block(chain), 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
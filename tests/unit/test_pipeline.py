@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from src.pipeline import PipelineStages, run_pipeline
+from src.util import partition_array
+
+
+class Recorder:
+    """Fake stages recording the order in which work was done"""
+
+    def __init__(self, delay: float = 0.0, fail_on: str = ""):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.events: list[tuple[str, object]] = []
+        self.lock = threading.Lock()
+
+    def record(self, stage: str, item: object) -> None:
+        time.sleep(self.delay)
+        if item == self.fail_on:
+            raise RuntimeError(f"{stage} failed for {item}")
+        with self.lock:
+            self.events.append((stage, item))
+
+    def stages(self) -> PipelineStages:
+        def load(chunk):
+            for child in chunk:
+                self.record("load", child)
+            self.loads.append(list(chunk))
+            return chunk
+
+        def build(chunk):
+            for child in chunk:
+                self.record("build", child)
+            self.builds.append(list(chunk))
+            return [tx for child in chunk for tx in (f"{child}-a", f"{child}-b")]
+
+        def sign(batch, nonce):
+            self.record("sign", nonce)
+            return nonce, batch
+
+        def post(signed):
+            nonce, batch = signed
+            self.record("post", nonce)
+            self.posted.append(batch)
+            return nonce
+
+        self.posted: list[list[str]] = []
+        self.loads: list[list[str]] = []
+        self.builds: list[list[str]] = []
+        return PipelineStages(load=load, build=build, sign=sign, post=post)
+
+
+class TestPipeline(unittest.TestCase):
+    def test_batches_match_sequential_partition(self):
+        children = [f"c{i}" for i in range(7)]
+        recorder = Recorder()
+        nonces = asyncio.run(
+            run_pipeline(
+                children, recorder.stages(), nonce=5, batch_size=3, chunk_size=2
+            )
+        )
+        expected = partition_array(
+            [tx for child in children for tx in (f"{child}-a", f"{child}-b")], 3
+        )
+        self.assertEqual(recorder.posted, expected)
+        self.assertEqual(nonces, [5, 6, 7, 8, 9])
+        # Children are loaded and encoded per chunk (keeping batched reads).
+        self.assertCountEqual(recorder.loads, partition_array(children, 2))
+        self.assertEqual(recorder.builds, partition_array(children, 2))
+
+    def test_stages_overlap(self):
+        children = [f"c{i}" for i in range(20)]
+        recorder = Recorder(delay=0.005)
+        asyncio.run(
+            run_pipeline(
+                children,
+                recorder.stages(),
+                nonce=0,
+                batch_size=2,
+                load_concurrency=2,
+                chunk_size=2,
+            )
+        )
+        stages = [stage for stage, _ in recorder.events]
+        # The first batch is posted before the last child is loaded.
+        self.assertLess(stages.index("post"), len(stages) - stages[::-1].index("load"))
+
+    def test_empty(self):
+        recorder = Recorder()
+        self.assertEqual(asyncio.run(run_pipeline([], recorder.stages(), 0)), [])
+
+    def test_failing_stage_aborts(self):
+        recorder = Recorder(fail_on="c3")
+        with self.assertRaises(RuntimeError):
+            asyncio.run(
+                run_pipeline(
+                    [f"c{i}" for i in range(10)], recorder.stages(), 0, batch_size=2
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
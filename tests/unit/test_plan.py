@@ -0,0 +1,69 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+from eth_account import Account
+from eth_typing import HexStr
+from web3 import Web3
+
+from src.chains import Chain
+from src.plan import Plan, PlannedBatch
+
+
+class TestPlan(unittest.TestCase):
+    def setUp(self) -> None:
+        self.plan = Plan(
+            command="CLAIM",
+            chain=Chain.GNOSIS,
+            safe=Web3.to_checksum_address("0x206a9eaa7d0f9637c905f2bf86acab363abb418c"),
+            safe_version="1.3.0",
+        )
+        for nonce in (7, 8):
+            batch = PlannedBatch(
+                nonce=nonce,
+                data=HexStr("0x8d80ff0a" + f"{nonce:064x}"),
+                safe_tx_hash=HexStr(""),
+                transactions=1,
+            )
+            batch.safe_tx_hash = HexStr(
+                self.plan.safe_tx(batch, None).safe_tx_hash.hex()
+            )
+            self.plan.batches.append(batch)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "plan.json"
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        self.plan.write(self.path)
+        loaded = Plan.read(self.path)
+        self.assertEqual(loaded, self.plan)
+        self.assertEqual(loaded.digest, self.plan.digest)
+        self.assertEqual(json.loads(self.path.read_text())["chain"], "gnosis")
+
+    def test_tampered_plan_rejected(self):
+        self.plan.write(self.path)
+        content = json.loads(self.path.read_text())
+        content["batches"][0]["nonce"] = 6
+        self.path.write_text(json.dumps(content))
+        with self.assertRaises(ValueError):
+            Plan.read(self.path)
+
+    def test_offline_safe_tx(self):
+        first, second = (self.plan.safe_tx(b, None) for b in self.plan.batches)
+        self.assertNotEqual(first.safe_tx_hash, second.safe_tx_hash)
+        # Hash depends on the chain (EIP-712 domain of Safe >= 1.3.0).
+        self.plan.chain = Chain.ETHEREUM
+        self.assertNotEqual(
+            self.plan.safe_tx(self.plan.batches[0], None).safe_tx_hash,
+            first.safe_tx_hash,
+        )
+        account = Account.create()
+        first.sign(account.key.hex())
+        self.assertEqual(first.signers, [account.address])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from src.provider import PooledAdapter, RateLimiter, coalescing_key, pooled_client
+
+DEAD_URL = "http://127.0.0.1:1"
+
+
+class StubNode(BaseHTTPRequestHandler):
+    """JSON-RPC node answering chain id 1 and a (slow) eth_call"""
+
+    requests: list = []
+
+    def do_POST(self):  # pylint:disable=invalid-name
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append(body)
+        batch = body if isinstance(body, list) else [body]
+        results = []
+        for request in batch:
+            if request["method"] == "eth_call":
+                time.sleep(0.2)
+                result = "0x" + "00" * 31 + "2a"
+            else:
+                result = "0x1"
+            results.append({"jsonrpc": "2.0", "id": request["id"], "result": result})
+        content = json.dumps(results if isinstance(body, list) else results[0])
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(content.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestProvider(unittest.TestCase):
+    def setUp(self) -> None:
+        StubNode.requests = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubNode)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_coalescing_key(self):
+        call = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_call",
+            "params": [{}, "latest"],
+        }
+        same_call = dict(call, id=2)
+        self.assertEqual(
+            coalescing_key(json.dumps(call)), coalescing_key(json.dumps(same_call))
+        )
+        self.assertIsNone(coalescing_key(json.dumps(dict(call, method="eth_chainId"))))
+        self.assertIsNone(coalescing_key(json.dumps([call])))
+        self.assertIsNone(coalescing_key(None))
+
+    def test_failover(self):
+        client = pooled_client([DEAD_URL, self.url])
+        self.assertEqual(client.get_chain_id(), 1)
+        dead, alive = client.adapter.endpoints
+        self.assertFalse(dead.healthy)
+        self.assertTrue(alive.healthy)
+
+    def test_retry_count(self):
+        client = pooled_client([self.url], retry_count=3)
+        self.assertEqual(client.adapter.max_retries.total, 3)
+        self.assertEqual(pooled_client([self.url]).adapter.max_retries.total, 1)
+
+    def test_all_endpoints_down(self):
+        session = requests.Session()
+        session.mount(DEAD_URL, PooledAdapter([DEAD_URL], max_attempts=2))
+        with self.assertRaises(requests.ConnectionError):
+            session.post(DEAD_URL, json={"method": "eth_chainId"})
+
+    def test_coalesces_concurrent_calls_across_threads(self):
+        client = pooled_client([self.url])
+        StubNode.requests = []
+        call = {"to": "0x" + "11" * 20, "data": "0x"}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: client.w3.eth.call(call), range(4)))
+        self.assertEqual(len({bytes(r) for r in results}), 1)
+        calls = [r for r in StubNode.requests if r["method"] == "eth_call"]
+        self.assertEqual(len(calls), 1)
+
+    def test_batch_requests_are_pooled(self):
+        client = pooled_client([DEAD_URL, self.url])
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": "eth_chainId", "params": []}
+            for i in range(3)
+        ]
+        results = list(client.raw_batch_request(payload))
+        self.assertEqual(results, ["0x1"] * 3)
+
+    def test_rate_limiter(self):
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 4 / 20 - 0.01)
+
+        unlimited = RateLimiter(0)
+        start = time.monotonic()
+        for _ in range(100):
+            unlimited.acquire()
+        self.assertLess(time.monotonic() - start, 0.1)
+
+
+if __name__ == "__main__":
+    unittest.main()
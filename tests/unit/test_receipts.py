@@ -0,0 +1,99 @@
+import unittest
+
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.receipts import (
+    EXECUTION_FAILURE_TOPIC,
+    EXECUTION_SUCCESS_TOPIC,
+    ChildOutcome,
+    decode_execution_logs,
+    outcome_table,
+)
+
+
+def execution_log(address, topic, safe_tx_hash, block=1, tx_hash="0x" + "ab" * 32):
+    return {
+        "address": address,
+        "topics": [topic],
+        "data": HexBytes(safe_tx_hash).rjust(32, b"\x00") + b"\x00" * 32,
+        "blockNumber": block,
+        "transactionHash": tx_hash,
+    }
+
+
+class TestReceipts(unittest.TestCase):
+    def setUp(self) -> None:
+        self.children = [
+            Web3.to_checksum_address("0x8baf303407eb4ea42f18bdec84f7d3bbe48c9046"),
+            Web3.to_checksum_address("0xabe0ce1df666042e950f6f3984522d88e158a50d"),
+            Web3.to_checksum_address("0xea0e39ebcd62e7d9dd659ab936f4fd480ae8594c"),
+        ]
+        self.parent = "0x206a9EAa7d0f9637c905F2Bf86aCaB363Abb418c"
+
+    def test_event_topics(self):
+        self.assertEqual(
+            EXECUTION_SUCCESS_TOPIC.hex(),
+            "0x442e715f626346e8c54381002da614f62bee8d27386535b2521ec8540898556e",
+        )
+        self.assertEqual(
+            EXECUTION_FAILURE_TOPIC.hex(),
+            "0x23428b18acfb3ea64b08dc0c1d296ea9c09702c09083ca5272e64d115b687d23",
+        )
+
+    def test_decode_execution_logs(self):
+        logs = [
+            execution_log(self.children[0].lower(), EXECUTION_SUCCESS_TOPIC, "0x01"),
+            # Parent's outer execution is not a child outcome.
+            execution_log(self.parent, EXECUTION_SUCCESS_TOPIC, "0x02"),
+            execution_log(self.children[1], EXECUTION_FAILURE_TOPIC, "0x03", block=2),
+            # Unrelated event on a child
+            execution_log(self.children[2], HexBytes("0x" + "11" * 32), "0x04"),
+        ]
+        self.assertEqual(
+            decode_execution_logs(logs, self.children),
+            [
+                ChildOutcome(
+                    child=self.children[0],
+                    success=True,
+                    safe_tx_hash="0x" + "00" * 31 + "01",
+                    tx_hash="0x" + "ab" * 32,
+                    block_number=1,
+                ),
+                ChildOutcome(
+                    child=self.children[1],
+                    success=False,
+                    safe_tx_hash="0x" + "00" * 31 + "03",
+                    tx_hash="0x" + "ab" * 32,
+                    block_number=2,
+                ),
+            ],
+        )
+
+    def test_decode_raw_rpc_logs(self):
+        raw = execution_log(self.children[0], EXECUTION_SUCCESS_TOPIC.hex(), "0x01")
+        raw["data"] = raw["data"].hex()
+        raw["blockNumber"] = "0x10"
+        [outcome] = decode_execution_logs([raw], self.children)
+        self.assertTrue(outcome.success)
+        self.assertEqual(outcome.block_number, 16)
+
+    def test_outcome_table(self):
+        outcomes = [
+            ChildOutcome(self.children[0], True, "0x01", "0xaa", 1),
+            ChildOutcome(self.children[0], True, "0x02", "0xaa", 1),
+            ChildOutcome(self.children[1], True, "0x03", "0xaa", 1),
+            ChildOutcome(self.children[1], False, "0x04", "0xaa", 1),
+        ]
+        self.assertEqual(
+            outcome_table(self.children, outcomes),
+            [
+                (self.children[0], 2, 0, "OK"),
+                (self.children[1], 1, 1, "PARTIAL"),
+                (self.children[2], 0, 0, "MISSING"),
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
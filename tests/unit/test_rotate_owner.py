@@ -0,0 +1,64 @@
+import unittest
+from types import SimpleNamespace
+
+from web3 import Web3
+
+from src.child_safe import SAFE_ABI, ChildSafe
+from src.rotate_owner import (
+    SENTINEL_OWNERS,
+    RotateArgs,
+    rotate_transactions,
+    rotation_call,
+)
+from helpers import address
+
+
+class TestRotateOwner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.old, self.new, self.other = address(2), address(3), address(4)
+        self.params = RotateArgs(self.old, self.new)
+        self.child = ChildSafe(address(10), None)
+
+    def decode(self, method, data):
+        return SAFE_ABI.encoder(method).decode(bytes.fromhex(data[2:]))
+
+    def test_swap_owner(self):
+        first = rotation_call(self.child, [self.old, self.other], 1, self.params)
+        self.assertEqual(
+            self.decode("swapOwner", first),
+            (SENTINEL_OWNERS.lower(), self.old.lower(), self.new.lower()),
+        )
+        later = rotation_call(self.child, [self.other, self.old], 1, self.params)
+        self.assertEqual(self.decode("swapOwner", later)[0], self.other.lower())
+
+    def test_remove_owner(self):
+        data = rotation_call(self.child, [self.new, self.old], 2, self.params)
+        self.assertEqual(
+            self.decode("removeOwner", data), (self.new.lower(), self.old.lower(), 1)
+        )
+
+    def test_skips(self):
+        # already rotated (idempotent) or not owned by the old owner
+        self.assertIsNone(rotation_call(self.child, [self.new], 1, self.params))
+        self.assertIsNone(rotation_call(self.child, [self.other], 1, self.params))
+
+    def test_rotate_transactions(self):
+        states = {
+            "getOwners": [[self.old], [self.new], None],
+            "getThreshold": [1, 1, 1],
+        }
+
+        def batch_call_same_function(function, addresses, raise_exception=True):
+            return states[function.fn_name][: len(addresses)]
+
+        client = SimpleNamespace(
+            w3=Web3(), batch_call_same_function=batch_call_same_function
+        )
+        parent = SimpleNamespace(address=address(1), ethereum_client=client)
+        children = [ChildSafe(address(10 + i), client) for i in range(3)]
+        transactions = rotate_transactions(parent, children, self.params)
+        self.assertEqual([tx.to for tx in transactions], [address(10)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from eth_account import Account
+from gnosis.eth import EthereumClient
+
+from src.scheduler import (
+    GWEI,
+    FeeSchedule,
+    base_fee_reader,
+    check_executor,
+    run_schedule,
+)
+
+
+class FeeNode(BaseHTTPRequestHandler):
+    """Stand-in node whose latest blocks have the base fees of `fees` (in gwei)"""
+
+    fees: list = []
+
+    def do_POST(self):  # pylint:disable=invalid-name
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request["method"] == "eth_getBlockByNumber":
+            fee = self.fees.pop(0) if len(self.fees) > 1 else self.fees[0]
+            result = {"number": "0x1", "baseFeePerGas": hex(fee * GWEI)}
+        else:
+            result = "0x1"
+        content = json.dumps({"jsonrpc": "2.0", "id": request["id"], "result": result})
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(content.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FeeNode)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = EthereumClient(f"http://127.0.0.1:{self.server.server_port}")
+        self.now = 0.0
+        self.submitted = []
+        self.failing = None
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+    def submit(self, safe_tx):
+        if safe_tx.safe_nonce == self.failing:
+            raise ValueError("execution reverted")
+        self.submitted.append((safe_tx.safe_nonce, self.now))
+        return 100_000
+
+    def test_waits_for_ceiling_and_deadline(self):
+        FeeNode.fees = [30, 25, 8, 9, 40]
+        batches = [SimpleNamespace(safe_nonce=n) for n in [7, 5, 6]]
+        report = run_schedule(
+            batches,
+            FeeSchedule(ceiling=10 * GWEI, deadline=60, poll_interval=12),
+            base_fee_reader(self.client),
+            self.submit,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+        )
+        # Two batches below the ceiling, the last one at the deadline.
+        self.assertEqual(self.submitted, [(5, 24), (6, 24), (7, 60)])
+        self.assertEqual(
+            [e.base_fee for e in report.executions], [8 * GWEI, 9 * GWEI, 40 * GWEI]
+        )
+        self.assertEqual(report.reference_fee, 30 * GWEI)
+        self.assertEqual(report.savings, 100_000 * (3 * 30 - 57) * GWEI)
+
+    def test_immediate(self):
+        FeeNode.fees = [5]
+        report = run_schedule(
+            [SimpleNamespace(safe_nonce=1)],
+            FeeSchedule(ceiling=10 * GWEI, deadline=60),
+            base_fee_reader(self.client),
+            self.submit,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+        )
+        self.assertEqual(self.submitted, [(1, 0)])
+        self.assertEqual(report.savings, 0)
+
+    def test_failed_execution_reported(self):
+        FeeNode.fees = [5]
+        self.failing = 2
+        report = run_schedule(
+            [SimpleNamespace(safe_nonce=n) for n in [1, 2, 3]],
+            FeeSchedule(ceiling=10 * GWEI, deadline=60),
+            base_fee_reader(self.client),
+            self.submit,
+            clock=lambda: self.now,
+            sleep=self.sleep,
+        )
+        self.assertEqual(self.submitted, [(1, 0)])
+        self.assertEqual([e.nonce for e in report.executions], [1])
+        self.assertEqual(
+            report.failures, [(2, "execution reverted"), (3, "nonce 2 failed")]
+        )
+        self.assertIn("nonce 2 NOT executed: execution reverted", str(report))
+
+
+class TestCheckExecutor(unittest.TestCase):
+    def setUp(self) -> None:
+        self.account = Account.create()
+
+    def safe(self, threshold, owners):
+        return SimpleNamespace(
+            address="0xSafe",
+            retrieve_threshold=lambda: threshold,
+            retrieve_owners=lambda: owners,
+        )
+
+    def test_sole_owner(self):
+        executor = check_executor(
+            self.safe(1, [self.account.address]), self.account.key
+        )
+        self.assertEqual(executor, self.account.address)
+
+    def test_threshold(self):
+        with self.assertRaisesRegex(ValueError, "threshold 1"):
+            check_executor(self.safe(2, [self.account.address]), self.account.key)
+
+    def test_not_owner(self):
+        with self.assertRaisesRegex(ValueError, "not an owner"):
+            check_executor(self.safe(1, []), self.account.key)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import sys
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from hexbytes import HexBytes
+
+from src.chains import Chain
+from src.multisend import DECLINED, post_safe_tx
+from src.safe import SafeFamily
+from src.shard import assign_children, format_lane_report, run_lanes
+from helpers import address
+
+
+class TestShard(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parents = [address(1), address(2)]
+        self.children = [address(10 + i) for i in range(5)]
+
+    def test_assign_children(self):
+        owners = [
+            [self.parents[0]],
+            [address(99), self.parents[1]],
+            [self.parents[1], self.parents[0]],
+            None,
+            [address(99)],
+        ]
+        shards, orphans = assign_children(self.parents, self.children, owners)
+        self.assertEqual(
+            shards,
+            {
+                self.parents[0]: [self.children[0], self.children[2]],
+                self.parents[1]: [self.children[1]],
+            },
+        )
+        self.assertEqual(orphans, self.children[3:])
+
+    def test_run_lanes(self):
+        families = [
+            SafeFamily(self.parents[0], self.children[:2], Chain.ETHEREUM),
+            SafeFamily(self.parents[1], self.children[2:], Chain.ETHEREUM),
+            SafeFamily(self.parents[0], self.children[:1], Chain.GNOSIS),
+        ]
+
+        def run(family):
+            if family.chain == Chain.GNOSIS:
+                sys.exit()
+            return [len(family.children)]
+
+        results = run_lanes(run, families)
+        self.assertEqual([r.family for r in results], families)
+        self.assertEqual([r.nonces for r in results], [[2], [3], []])
+        self.assertEqual([r.status for r in results], ["OK", "OK", "FAILED"])
+        self.assertIn("SystemExit", results[2].error)
+
+        report = format_lane_report(results)
+        self.assertIn(self.parents[1], report)
+        self.assertTrue(report.endswith("2/3 lanes succeeded"))
+
+    def test_declined_lane_cancels_others(self):
+        families = [
+            SafeFamily(self.parents[0], self.children[:2], Chain.ETHEREUM),
+            SafeFamily(self.parents[1], self.children[2:], Chain.ETHEREUM),
+            SafeFamily(self.parents[0], self.children[:1], Chain.GNOSIS),
+        ]
+        service = mock.Mock()
+        posted = threading.Event()
+
+        def safe_tx(nonce):
+            return SimpleNamespace(
+                signatures=b"signed",
+                safe_address=self.parents[0],
+                safe_tx_hash=HexBytes(nonce.to_bytes(32, "big")),
+                safe_nonce=nonce,
+            )
+
+        def run(family):
+            if family.chain == Chain.GNOSIS:
+                nonce = post_safe_tx(safe_tx(1), service, confirm=False)
+                posted.set()
+                return [nonce]
+            if family.parent == self.parents[0]:
+                posted.wait(timeout=5)
+                with mock.patch("builtins.input", return_value="n"):
+                    return [post_safe_tx(safe_tx(2), service)]
+            # Reaches its prompt only after the other lane declined.
+            DECLINED.wait(timeout=5)
+            return [post_safe_tx(safe_tx(3), service, confirm=False)]
+
+        try:
+            results = run_lanes(run, families)
+        finally:
+            DECLINED.clear()
+        self.assertEqual([r.error for r in results], ["declined", "declined", None])
+        self.assertEqual([r.nonces for r in results], [[], [], [1]])
+        service.post_transaction.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+from eth_account import Account
+from eth_typing import HexStr
+from hexbytes import HexBytes
+from web3 import Web3
+
+from src.chains import Chain
+from src.plan import Plan, PlannedBatch
+from src.signer import add_signature, run_signer, sign_requests, signing_requests
+
+
+class TestExternalSigner(unittest.TestCase):
+    def setUp(self) -> None:
+        self.plan = Plan(
+            command="CLAIM",
+            chain=Chain.ETHEREUM,
+            safe=Web3.to_checksum_address("0x206a9eaa7d0f9637c905f2bf86acab363abb418c"),
+            safe_version="1.3.0",
+        )
+        for nonce in range(3):
+            batch = PlannedBatch(nonce, HexStr("0x8d80ff0a"), HexStr(""), 1)
+            batch.safe_tx_hash = HexStr(
+                self.plan.safe_tx(batch, None).safe_tx_hash.hex()
+            )
+            self.plan.batches.append(batch)
+        self.accounts = [Account.create() for _ in range(2)]
+
+    def test_sign_and_import(self):
+        requests = signing_requests(self.plan)
+        self.assertEqual([r.nonce for r in requests], [0, 1, 2])
+        signatures = [sign_requests(requests, a.key.hex()) for a in self.accounts]
+
+        for batch in self.plan.batches:
+            external = self.plan.safe_tx(batch, None)
+            for account, account_signatures in zip(self.accounts, signatures):
+                signer = add_signature(
+                    external, HexBytes(account_signatures[batch.safe_tx_hash])
+                )
+                self.assertEqual(signer, account.address)
+            # Same as signing in process.
+            internal = self.plan.safe_tx(batch, None)
+            for account in self.accounts:
+                internal.sign(account.key.hex())
+            self.assertEqual(external.signatures, internal.signatures)
+            # Importing twice does not duplicate signatures.
+            add_signature(external, HexBytes(signatures[0][batch.safe_tx_hash]))
+            self.assertEqual(len(external.signatures), 2 * 65)
+
+    def test_invalid_signature(self):
+        safe_tx = self.plan.safe_tx(self.plan.batches[0], None)
+        with self.assertRaises(ValueError):
+            add_signature(safe_tx, b"\x00" * 130)
+
+    def test_run_signer(self):
+        requests = signing_requests(self.plan)
+        account = self.accounts[0]
+        with mock.patch.dict(os.environ, {"SIGNER_PK": account.key.hex()}):
+            signatures = run_signer(f"{sys.executable} -m src.signer sign", requests)
+        self.assertEqual(signatures, sign_requests(requests, account.key.hex()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from types import SimpleNamespace
+
+from gnosis.safe import SafeOperation
+from gnosis.safe.multi_send import MultiSend
+from web3 import Web3
+
+from src.child_safe import SAFE_ABI, ChildSafe
+from src.sweep import SweepArgs, sweep_transactions
+from src.token_transfer import ERC20_TRANSFER, Token
+from helpers import address
+
+
+class TestSweep(unittest.TestCase):
+    def setUp(self) -> None:
+        self.token = Token(address(2), decimals=18)
+        self.calls = []
+        # (ETH, token) balances of each child
+        balances = [5, 0, 3, 7, 0, None]
+
+        def batch_call(functions, raise_exception=True):
+            self.calls.append(len(functions))
+            return balances[: len(functions)]
+
+        client = SimpleNamespace(w3=Web3(), batch_call=batch_call)
+        self.parent = SimpleNamespace(address=address(1), ethereum_client=client)
+        self.children = [ChildSafe(address(10 + i), client) for i in range(3)]
+
+    def test_sweep(self):
+        transactions = sweep_transactions(
+            self.parent, self.children, SweepArgs([None, self.token])
+        )
+        # All balances in one batch request and no transaction for empty children.
+        self.assertEqual(self.calls, [6])
+        self.assertEqual([tx.to for tx in transactions], [address(10), address(11)])
+
+        execute = SAFE_ABI.encoder("execTransaction")
+        to, value, data, operation, *_ = execute.decode(transactions[0].data)
+        self.assertEqual((to, value, data), (address(1).lower(), 5, b""))
+        self.assertEqual(operation, SafeOperation.CALL.value)
+
+        _, _, data, operation, *_ = execute.decode(transactions[1].data)
+        self.assertEqual(operation, SafeOperation.DELEGATE_CALL.value)
+        [eth, token] = MultiSend.from_transaction_data(data)
+        self.assertEqual((eth.to, eth.value), (address(1), 3))
+        self.assertEqual(token.to, self.token.address)
+        self.assertEqual(
+            token.data, bytes.fromhex(ERC20_TRANSFER.encode([address(1), 7])[2:])
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.token_transfer import Token, Transfer, aggregate_transfers, load_transfers
+from helpers import address
+
+
+class TestTransferAggregation(unittest.TestCase):
+    def setUp(self) -> None:
+        self.token = Token(address(1), decimals=18)
+        self.other_token = Token(address(2), decimals=6)
+
+    def test_aggregate_transfers(self):
+        transfers = [
+            Transfer(self.other_token, address(11), 1),
+            Transfer(self.token, address(10), 2),
+            Transfer(None, address(10), 3),
+            Transfer(self.token, address(10), 4),
+            Transfer(self.token, address(11), 5),
+            Transfer(None, address(10), 6),
+            Transfer(self.token, address(10), 7),
+        ]
+        aggregated, report = aggregate_transfers(transfers)
+        self.assertEqual(
+            [(t.token, t.receiver, t.amount_wei) for t in aggregated],
+            [
+                (None, address(10), 9),
+                (self.token, address(10), 13),
+                (self.token, address(11), 5),
+                (self.other_token, address(11), 1),
+            ],
+        )
+        self.assertEqual((report.rows, report.transfers), (7, 4))
+        self.assertEqual(
+            report.merged,
+            {(None, address(10)): 2, (self.token.address, address(10)): 3},
+        )
+        # Inputs are left untouched.
+        self.assertEqual(transfers[1].amount_wei, 2)
+
+    def test_load_transfers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "transfers.csv"
+            path.write_text(
+                "receiver,amount,token_address\n"
+                f"{address(10).lower()},100,{address(1).lower()}\n"
+                f"{address(11).lower()},200,\n"
+                f"{address(10).lower()},300,{address(1).lower()}\n",
+                encoding="utf-8",
+            )
+            transfers = load_transfers(path)
+        self.assertEqual(
+            [t.receiver for t in transfers], [address(i) for i in (10, 11, 10)]
+        )
+        self.assertEqual([t.amount_wei for t in transfers], [100, 200, 300])
+        self.assertIsNone(transfers[1].token)
+        # Single token instance per token address.
+        self.assertIs(transfers[0].token, transfers[2].token)
+        aggregated, _ = aggregate_transfers(transfers)
+        self.assertEqual([t.amount_wei for t in aggregated], [200, 400])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from eth_typing import HexStr
+from gnosis.safe.multi_send import MultiSendOperation, MultiSendTx
+from web3 import Web3
+
+from src.abis.load import load_abi
+from src.transfer_records import (
+    RECORD_SIZE,
+    iter_multisend_calldata,
+    multisend_calldata,
+    open_records,
+    pack_transfers,
+    records_from_csv,
+    write_records,
+)
+from helpers import address
+
+
+class TestTransferRecords(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "transfers.bin"
+        self.transfers = [(address(100 + i), 10**18 + i) for i in range(5)]
+        self.token = Web3.to_checksum_address("0x" + "ab" * 20)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def expected_packed(self, token=None) -> bytes:
+        transfer = load_abi("erc20").encoder("transfer")
+        return b"".join(
+            MultiSendTx(
+                operation=MultiSendOperation.CALL,
+                to=receiver if token is None else token,
+                value=amount if token is None else 0,
+                data=HexStr("0x")
+                if token is None
+                else transfer.encode([receiver, amount]),
+            ).encoded_data
+            for receiver, amount in self.transfers
+        )
+
+    def test_pack_transfers(self):
+        self.assertEqual(write_records(self.path, self.transfers), 5)
+        self.assertEqual(self.path.stat().st_size, 5 * RECORD_SIZE)
+        with open_records(self.path) as records:
+            self.assertEqual(pack_transfers(records), self.expected_packed())
+            self.assertEqual(
+                pack_transfers(records, self.token), self.expected_packed(self.token)
+            )
+
+    def test_chunked_calldata(self):
+        write_records(self.path, self.transfers)
+        with open_records(self.path) as records:
+            chunks = list(iter_multisend_calldata(records, batch_size=2))
+        self.assertEqual(len(chunks), 3)
+        packed = self.expected_packed()
+        tx_size = len(packed) // 5
+        self.assertEqual(chunks[0], multisend_calldata(packed[: 2 * tx_size]))
+        self.assertEqual(chunks[2], multisend_calldata(packed[4 * tx_size :]))
+        # Same as web3's encoding of multiSend(bytes).
+        multisend = Web3().eth.contract(
+            abi=[
+                {
+                    "inputs": [{"name": "transactions", "type": "bytes"}],
+                    "name": "multiSend",
+                    "outputs": [],
+                    "type": "function",
+                }
+            ]
+        )
+        self.assertEqual(
+            "0x" + chunks[1].hex(),
+            multisend.encodeABI("multiSend", [packed[2 * tx_size : 4 * tx_size]]),
+        )
+
+    def test_from_csv_and_validation(self):
+        csv_path = Path(self.directory.name) / "transfers.csv"
+        csv_path.write_text(
+            "receiver,amount\n"
+            + "".join(f"{r.lower()},{a}\n" for r, a in self.transfers),
+            encoding="utf-8",
+        )
+        self.assertEqual(records_from_csv(csv_path, self.path), 5)
+        with open_records(self.path) as records:
+            self.assertEqual(pack_transfers(records), self.expected_packed())
+
+        self.path.write_bytes(b"\x00" * (RECORD_SIZE + 1))
+        with self.assertRaises(ValueError):
+            with open_records(self.path):
+                pass
+        self.path.write_bytes(b"")
+        with open_records(self.path) as records:
+            self.assertEqual(list(iter_multisend_calldata(records)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
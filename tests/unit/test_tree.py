@@ -0,0 +1,103 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+
+from gnosis.eth.contracts import get_safe_V1_3_0_contract
+from gnosis.safe import Safe, SafeOperation
+from gnosis.safe.multi_send import MultiSend, MultiSendOperation, MultiSendTx
+from web3 import Web3
+
+from src.multisend import MULTISEND_CONTRACT
+from src.tree import SafeTree, WeightedTx, chunk_by_weight, pack_batches, tree_batches
+from helpers import address
+
+
+def marker(safe) -> MultiSendTx:
+    """Dummy operation on `safe` (identifiable by its data)"""
+    return MultiSendTx(MultiSendOperation.CALL, safe.address, 0, b"\x01")
+
+
+def fake_builder(owner, children):
+    return [marker(child) for child in children]
+
+
+class TestSafeTree(unittest.TestCase):
+    def setUp(self) -> None:
+        self.parent = address(1)
+        self.layout = {
+            address(10): {address(100): {}, address(101): {address(1000): {}}},
+            address(11): {},
+        }
+        self.tree = SafeTree.from_dict(self.parent, self.layout)
+        self.contract = get_safe_V1_3_0_contract(Web3())
+
+    def test_read(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "tree.json"
+            path.write_text(json.dumps({self.parent.lower(): self.layout}))
+            self.assertEqual(SafeTree.read(path, self.parent), self.tree)
+            with self.assertRaises(ValueError):
+                SafeTree.read(path, address(2))
+        self.assertEqual(
+            [node.address for node in self.tree.descendants()],
+            [address(i) for i in [10, 100, 101, 1000, 11]],
+        )
+
+    def test_chunk_by_weight(self):
+        items = [WeightedTx(None, w) for w in [2, 2, 3, 1, 4]]
+        chunks = chunk_by_weight(items, 4)
+        self.assertEqual(
+            [[item.weight for item in chunk] for chunk in chunks], [[2, 2], [3, 1], [4]]
+        )
+        # Weightless items (even leading ones) join the current chunk.
+        chunks = chunk_by_weight([WeightedTx(None, w) for w in [0, 4, 0, 1]], 4)
+        self.assertEqual(
+            [[item.weight for item in chunk] for chunk in chunks], [[0, 4, 0], [1]]
+        )
+
+    def test_pack_batches(self):
+        units = [
+            [WeightedTx("a1", 3), WeightedTx("a2", 1)],
+            [WeightedTx("b1", 2)],
+            [WeightedTx("c1", 1), WeightedTx("c2", 2), WeightedTx("c3", 1)],
+        ]
+        batches = pack_batches(units, capacity=4)
+        # Fewest batches for a total weight of 10 ...
+        self.assertEqual(len(batches), 3)
+        # ... with every unit's transactions in (non-decreasing) batch order.
+        position = {tx: i for i, batch in enumerate(batches) for tx in batch}
+        for unit in units:
+            indices = [position[item.transaction] for item in unit]
+            self.assertEqual(indices, sorted(indices))
+
+    def test_nested_encoding(self):
+        client = SimpleNamespace(w3=Web3())
+        parent = Safe(self.parent, client)
+        batches = tree_batches(parent, self.tree, fake_builder, client)
+        self.assertEqual(len(batches), 1)
+        top = batches[0]
+        # Wrapper of the subtree of child 10, then the operations on 10 and 11.
+        self.assertEqual([tx.to for tx in top], [address(i) for i in [10, 10, 11]])
+        self.assertEqual(top[1].data, b"\x01")
+
+        function, params = self.contract.decode_function_input(top[0].data)
+        self.assertEqual(function.fn_name, "execTransaction")
+        self.assertEqual(params["to"], MULTISEND_CONTRACT)
+        self.assertEqual(params["operation"], SafeOperation.DELEGATE_CALL.value)
+        # pre-validated by the parent
+        self.assertEqual(params["signatures"][12:32], bytes.fromhex(self.parent[2:]))
+        inner = MultiSend.from_transaction_data(params["data"])
+        # 101's wrapper for 1000 comes before the operation on 101 itself.
+        self.assertEqual([tx.to for tx in inner], [address(i) for i in [100, 101, 101]])
+        _, nested = self.contract.decode_function_input(inner[1].data)
+        self.assertEqual(nested["signatures"][12:32], bytes.fromhex(address(10)[2:]))
+        self.assertEqual(
+            [tx.to for tx in MultiSend.from_transaction_data(nested["data"])],
+            [address(1000)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
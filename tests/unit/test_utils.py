@@ -1,6 +1,9 @@
+import os
 import unittest
 
-from src.util import partition_array
+from web3 import Web3
+
+from src.util import partition_array, to_checksum_address, to_checksum_addresses
 
 
 class MyTestCase(unittest.TestCase):
@@ -13,6 +16,25 @@ class MyTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             partition_array(arr, 0)
 
+    def test_to_checksum_address(self):
+        for address in ["0x" + os.urandom(20).hex() for _ in range(100)]:
+            expected = Web3.to_checksum_address(address)
+            self.assertEqual(to_checksum_address(address), expected)
+            self.assertEqual(to_checksum_address(address.upper()[2:]), expected)
+            self.assertEqual(to_checksum_address(expected), expected)
+        for invalid in ["", "0x123", "0x" + "g" * 40, "0x" + "1" * 41]:
+            with self.assertRaises(ValueError):
+                to_checksum_address(invalid)
+
+    def test_to_checksum_addresses(self):
+        addresses = ["0x" + os.urandom(20).hex() for _ in range(10)]
+        repeated = addresses + addresses[:3]
+        self.assertEqual(
+            to_checksum_addresses(repeated),
+            [Web3.to_checksum_address(a) for a in repeated],
+        )
+        self.assertEqual(to_checksum_addresses(iter([])), [])
+
 
 if __name__ == "__main__":
     unittest.main()